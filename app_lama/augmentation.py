@@ -0,0 +1,172 @@
+"""
+In-graph Data Augmentation
+Batched replacement for ImageDataGenerator.
+
+Same transforms, ranges and sampling as the old generator:
+    ImageDataGenerator(rotation_range=15, width_shift_range=0.1,
+                       height_shift_range=0.1, horizontal_flip=True,
+                       zoom_range=0.1, shear_range=0.1, fill_mode='nearest')
+
+Rotation, shift, shear and zoom are composed into one affine matrix per
+image (like apply_affine_transform) and applied to the whole batch with
+a single ImageProjectiveTransformV3 op, so every image is resampled once
+(stacking RandomRotation/RandomTranslation/RandomZoom resamples four
+times and blurs the images). Runs inside tf.data, no Python per image.
+"""
+
+import math
+import tensorflow as tf
+from tensorflow.keras import layers
+
+
+def affine_transforms(theta, tx, ty, shear, zx, zy, height, width):
+    """
+    ImageProjectiveTransformV3 parameters, one row per image
+
+    Same matrix as ImageDataGenerator's apply_affine_transform:
+    rotation · shift · shear · zoom around the image center, in (x=col,
+    y=row) coordinates. Angles in radians, shifts in pixels.
+    """
+    zeros, ones = tf.zeros_like(theta), tf.ones_like(theta)
+
+    def matrix(rows):
+        # (batch, 3, 3) dari 9 tensor (batch,)
+        return tf.reshape(tf.stack(rows, axis=1), (-1, 3, 3))
+
+    rotation = matrix([tf.cos(theta), -tf.sin(theta), zeros,
+                       tf.sin(theta), tf.cos(theta), zeros,
+                       zeros, zeros, ones])
+    shift = matrix([ones, zeros, tx,
+                    zeros, ones, ty,
+                    zeros, zeros, ones])
+    shear_matrix = matrix([ones, -tf.sin(shear), zeros,
+                           zeros, tf.cos(shear), zeros,
+                           zeros, zeros, ones])
+    zoom = matrix([zx, zeros, zeros,
+                   zeros, zy, zeros,
+                   zeros, zeros, ones])
+
+    # transform_matrix_offset_center
+    o_x, o_y = height / 2.0 - 0.5, width / 2.0 - 0.5
+    offset = tf.convert_to_tensor([[1.0, 0.0, o_x], [0.0, 1.0, o_y], [0.0, 0.0, 1.0]])
+    reset = tf.convert_to_tensor([[1.0, 0.0, -o_x], [0.0, 1.0, -o_y], [0.0, 0.0, 1.0]])
+
+    transform = offset @ rotation @ shift @ shear_matrix @ zoom @ reset
+    # Sumbu tidak perlu ditukar: apply_affine_transform menyusun matriks ini
+    # dalam koordinat (x=kolom, y=baris), lalu sendiri menukarnya (M' = PMP)
+    # sebelum scipy.ndimage yang memakai (baris, kolom). Urutan (x, y) itu
+    # sama dengan ImageProjectiveTransformV3. Termasuk keanehan Keras yang
+    # sengaja ditiru: tx (skala tinggi) menggeser kolom dan offset pusat x
+    # memakai tinggi gambar
+    return tf.reshape(transform, (-1, 9))[:, :8]
+
+
+class RandomAffine(layers.Layer):
+    """
+    Random rotation / shift / shear / zoom / horizontal flip of a batch
+
+    Parameters are drawn exactly like ImageDataGenerator.random_transform:
+        theta ~ U(-rotation, rotation) degrees
+        shift ~ U(-shift, shift) * image size (rows and columns)
+        shear ~ U(-shear, shear) degrees
+        zx, zy ~ U(1 - zoom, 1 + zoom) independently
+        flip with probability 0.5, after the transform
+    """
+
+    def __init__(self, rotation=15, shift=0.1, zoom=0.1, shear=0.1, horizontal_flip=True,
+                 fill_mode='nearest', interpolation='bilinear', seed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.rotation = rotation
+        self.shift = shift
+        self.zoom = zoom
+        self.shear = shear
+        self.horizontal_flip = horizontal_flip
+        self.fill_mode = fill_mode
+        self.interpolation = interpolation
+        self.seed = seed
+
+    def _uniform(self, batch_size, low, high):
+        return tf.random.uniform([batch_size], low, high, seed=self.seed)
+
+    def call(self, inputs, training=None):
+        if not training:
+            return inputs
+
+        images = tf.convert_to_tensor(inputs)
+        unbatched = images.shape.rank == 3
+        if unbatched:
+            images = tf.expand_dims(images, 0)
+
+        shape = tf.shape(images)
+        batch_size = shape[0]
+        height = tf.cast(shape[1], tf.float32)
+        width = tf.cast(shape[2], tf.float32)
+        degrees = math.pi / 180.0
+
+        transforms = affine_transforms(
+            theta=self._uniform(batch_size, -self.rotation, self.rotation) * degrees,
+            tx=self._uniform(batch_size, -self.shift, self.shift) * height,
+            ty=self._uniform(batch_size, -self.shift, self.shift) * width,
+            shear=self._uniform(batch_size, -self.shear, self.shear) * degrees,
+            zx=self._uniform(batch_size, 1.0 - self.zoom, 1.0 + self.zoom),
+            zy=self._uniform(batch_size, 1.0 - self.zoom, 1.0 + self.zoom),
+            height=height,
+            width=width
+        )
+        output = tf.raw_ops.ImageProjectiveTransformV3(
+            images=tf.cast(images, tf.float32),
+            transforms=transforms,
+            output_shape=shape[1:3],
+            fill_value=0.0,
+            interpolation=self.interpolation.upper(),
+            fill_mode=self.fill_mode.upper()
+        )
+
+        if self.horizontal_flip:
+            flip = self._uniform(batch_size, 0.0, 1.0) < 0.5
+            output = tf.where(flip[:, None, None, None], tf.reverse(output, axis=[2]), output)
+
+        return output[0] if unbatched else output
+
+    def compute_output_shape(self, input_shape):
+        return input_shape
+
+    def get_config(self):
+        config = super().get_config()
+        config.update({
+            "rotation": self.rotation,
+            "shift": self.shift,
+            "zoom": self.zoom,
+            "shear": self.shear,
+            "horizontal_flip": self.horizontal_flip,
+            "fill_mode": self.fill_mode,
+            "interpolation": self.interpolation,
+            "seed": self.seed
+        })
+        return config
+
+
+def build_augmentation(rotation=15, shift=0.1, zoom=0.1, shear=0.1, horizontal_flip=True,
+                       fill_mode='nearest'):
+    """
+    Augmentation layer with ImageDataGenerator-equivalent ranges
+
+    Args:
+        rotation: Max rotation in degrees (rotation_range)
+        shift: Max shift as a fraction of width/height (width/height_shift_range)
+        zoom: Zoom range; each axis is scaled independently in [1-zoom, 1+zoom]
+        shear: Max shear angle in degrees (shear_range)
+        horizontal_flip: Random left-right flip
+
+    Returns:
+        RandomAffine, call with training=True on a batch of images
+    """
+    return RandomAffine(
+        rotation=rotation,
+        shift=shift,
+        zoom=zoom,
+        shear=shear,
+        horizontal_flip=horizontal_flip,
+        fill_mode=fill_mode,
+        name="augmentation"
+    )
@@ -0,0 +1,190 @@
+"""
+Augmentation Benchmark
+Old per-image ImageDataGenerator vs the batched in-graph RandomAffine layer.
+
+Reports, for the same training images:
+    - input pipeline epoch time (augment + batch only)
+    - model.fit epoch time with build_custom_cnn (--fit)
+    - augmentation statistics (mean/std of the output, mean absolute
+      change vs the original) to check the two produce matching transforms
+
+Usage:
+    python benchmark_augmentation.py                 # uses the dataset cache
+    python benchmark_augmentation.py --synthetic 4000 --fit
+"""
+
+import json
+import time
+import argparse
+import numpy as np
+from pathlib import Path
+from datetime import datetime
+
+import tensorflow as tf
+
+from train_model import (
+    Config, AUTOTUNE, create_data_augmentation, build_custom_cnn, load_cache
+)
+
+
+def legacy_generator():
+    """The ImageDataGenerator train_model used before the in-graph augmentation"""
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+    return ImageDataGenerator(
+        rotation_range=15,
+        width_shift_range=0.1,
+        height_shift_range=0.1,
+        horizontal_flip=True,
+        zoom_range=0.1,
+        shear_range=0.1,
+        fill_mode='nearest'
+    )
+
+
+def load_images(limit=None, synthetic=0):
+    """uint8 images + labels from the dataset cache (or random data)"""
+    shape = (Config.IMG_SIZE, Config.IMG_SIZE, Config.CHANNELS)
+    if synthetic:
+        rng = np.random.default_rng(42)
+        X = rng.integers(0, 256, size=(synthetic, *shape), dtype=np.uint8)
+        Y = rng.integers(0, Config.NUM_CLASSES, size=synthetic).astype(np.int32)
+        return X, Y
+    X, Y = load_cache('train').arrays(normalize=False)
+    if limit:
+        X, Y = X[:limit], Y[:limit]
+    return X, Y.astype(np.int32)
+
+
+def legacy_dataset(X, Y, datagen):
+    """Per-image numpy augmentation (tf.numpy_function), then batching"""
+    shape = (Config.IMG_SIZE, Config.IMG_SIZE, Config.CHANNELS)
+
+    def augment(img, label):
+        img = tf.numpy_function(
+            lambda x: datagen.random_transform(x).astype(np.float32),
+            [img], tf.float32
+        )
+        img.set_shape(shape)
+        return img, label
+
+    ds = tf.data.Dataset.from_tensor_slices((X, Y))
+    ds = ds.map(lambda img, label: (tf.cast(img, tf.float32) / 255.0, label), num_parallel_calls=AUTOTUNE)
+    ds = ds.map(augment, num_parallel_calls=AUTOTUNE, deterministic=False)
+    return ds.batch(Config.BATCH_SIZE).prefetch(AUTOTUNE)
+
+
+def ingraph_dataset(X, Y, augmentation):
+    """Batching, then one augmentation call per batch"""
+    ds = tf.data.Dataset.from_tensor_slices((X, Y))
+    ds = ds.map(lambda img, label: (tf.cast(img, tf.float32) / 255.0, label), num_parallel_calls=AUTOTUNE)
+    ds = ds.batch(Config.BATCH_SIZE)
+    ds = ds.map(
+        lambda img, label: (augmentation(img, training=True), label),
+        num_parallel_calls=AUTOTUNE, deterministic=False
+    )
+    return ds.prefetch(AUTOTUNE)
+
+
+def time_pipeline(ds, epochs):
+    """Seconds per epoch of iterating the pipeline (first epoch = warmup)"""
+    times = []
+    for _ in range(epochs + 1):
+        start = time.perf_counter()
+        for _ in ds:
+            pass
+        times.append(time.perf_counter() - start)
+    return float(np.mean(times[1:]))
+
+
+def time_fit(ds, epochs):
+    """Seconds per epoch of model.fit (first epoch = warmup/tracing)"""
+    model = build_custom_cnn()
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    times = []
+
+    class EpochTimer(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            times.append(time.perf_counter() - self.start)
+
+    model.fit(ds, epochs=epochs + 1, callbacks=[EpochTimer()], verbose=0)
+    return float(np.mean(times[1:]))
+
+
+def augmentation_stats(X, augment, repeats=5):
+    """Output mean/std and mean |augmented - original| over a fixed sample"""
+    originals = X.astype(np.float32) / 255.0
+    outputs = np.concatenate([augment(originals) for _ in range(repeats)])
+    reference = np.concatenate([originals] * repeats)
+    return {
+        "mean": float(outputs.mean()),
+        "std": float(outputs.std()),
+        "mean_abs_change": float(np.abs(outputs - reference).mean())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ImageDataGenerator vs in-graph augmentation")
+    parser.add_argument("--limit", type=int, default=None, help="Use only the first N cached images")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N random images instead of the dataset")
+    parser.add_argument("--epochs", type=int, default=2, help="Timed epochs (after one warmup epoch)")
+    parser.add_argument("--fit", action="store_true", help="Also time model.fit epochs")
+    parser.add_argument("--output", default=str(Path(Config.RESULTS_DIR) / "augmentation_benchmark.json"))
+    args = parser.parse_args()
+
+    X, Y = load_images(args.limit, args.synthetic)
+    print(f"\n📊 Benchmarking augmentation on {len(X)} images "
+          f"({Config.IMG_SIZE}x{Config.IMG_SIZE}, batch {Config.BATCH_SIZE})")
+
+    datagen = legacy_generator()
+    augmentation = create_data_augmentation()
+    pipelines = {
+        "ImageDataGenerator": legacy_dataset(X, Y, datagen),
+        "In-graph affine": ingraph_dataset(X, Y, augmentation)
+    }
+    augment = {
+        "ImageDataGenerator": lambda x: np.stack([datagen.random_transform(img) for img in x]),
+        "In-graph affine": lambda x: augmentation(x, training=True).numpy()
+    }
+    sample = X[:min(len(X), 256)]
+
+    results = {}
+    for name, ds in pipelines.items():
+        print(f"\n⏱️  {name}...")
+        result = {"pipeline_epoch_seconds": time_pipeline(ds, args.epochs)}
+        if args.fit:
+            result["fit_epoch_seconds"] = time_fit(ds, args.epochs)
+        result["stats"] = augmentation_stats(sample, augment[name])
+        results[name] = result
+
+    print(f"\n{'='*72}")
+    print(f"{'':20s} {'pipeline s/epoch':>17s} {'fit s/epoch':>12s} {'mean':>7s} {'std':>7s} {'|Δ|':>7s}")
+    for name, result in results.items():
+        fit = result.get("fit_epoch_seconds")
+        stats = result["stats"]
+        print(f"{name:20s} {result['pipeline_epoch_seconds']:17.2f} "
+              f"{(f'{fit:.2f}' if fit is not None else '-'):>12s} "
+              f"{stats['mean']:7.4f} {stats['std']:7.4f} {stats['mean_abs_change']:7.4f}")
+    old, new = results["ImageDataGenerator"], results["In-graph affine"]
+    print(f"\nPipeline speedup: {old['pipeline_epoch_seconds'] / new['pipeline_epoch_seconds']:.1f}x")
+    if args.fit:
+        print(f"model.fit speedup: {old['fit_epoch_seconds'] / new['fit_epoch_seconds']:.1f}x")
+    print(f"{'='*72}")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            "date": datetime.now().isoformat(),
+            "images": len(X),
+            "img_size": Config.IMG_SIZE,
+            "batch_size": Config.BATCH_SIZE,
+            "epochs": args.epochs,
+            "results": results
+        }, f, indent=2)
+    print(f"✓ Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Preprocessed Dataset Cache
+Resized RGB uint8 images + labels in memory-mapped .npy shards.
+
+The cache key is a hash of every source file's content (and label) plus
+the preprocessing config, so the shards are rebuilt only when an image is
+added, removed or changed, or when IMG_SIZE / face cropping changes. File
+digests are remembered per (size, mtime) so unchanged files are not re-read.
+
+With face cropping the images go through the serving pipeline
+(backend app/utils/face_detection.py: MediaPipe + 20% margin, center crop
+fallback, then BGR→RGB and resize like preprocess_for_model), and the
+crop bbox + face_detected flag of every image is stored next to the
+shards. Face detection therefore runs once per dataset version.
+
+Build/refresh manually:
+    python dataset_cache.py --split train test
+    python dataset_cache.py --no-crop-faces    # plain resize (old behaviour)
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import time
+import argparse
+import multiprocessing
+import numpy as np
+import cv2
+from pathlib import Path
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+
+CACHE_FORMAT = 2
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
+HASH_INDEX_FILE = "file_hashes.json"
+
+
+# ============================================================================
+# SOURCE FILES + KEY
+# ============================================================================
+
+def list_source_files(dataset_root, split, num_classes):
+    """(path, label) for every image of a split, in a stable order"""
+    data_path = Path(dataset_root) / split
+    if not data_path.exists():
+        raise ValueError(f"Dataset path not found: {data_path}")
+
+    files = []
+    for class_idx in range(1, num_classes + 1):
+        class_path = data_path / str(class_idx)
+        if not class_path.exists():
+            print(f"⚠ Warning: Folder {class_path} not found, skipping...")
+            continue
+        for img_file in sorted(class_path.glob('*')):
+            if img_file.suffix.lower() in IMAGE_EXTENSIONS:
+                files.append((str(img_file), class_idx - 1))
+    return files
+
+
+def _file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _load_hash_index(cache_dir):
+    try:
+        with open(Path(cache_dir) / HASH_INDEX_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_hash_index(cache_dir, index):
+    tmp = Path(cache_dir) / (HASH_INDEX_FILE + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, Path(cache_dir) / HASH_INDEX_FILE)
+
+
+def compute_cache_key(files, preprocess_config, cache_dir, dataset_root):
+    """
+    Hash of (path relative to dataset_root, label, content digest) of all
+    files + preprocessing config. Relative paths keep the key valid when the
+    dataset directory is moved, while renames inside it still change it.
+    """
+    index = _load_hash_index(cache_dir)
+    changed = False
+    h = hashlib.sha256()
+    h.update(json.dumps({"format": CACHE_FORMAT, **preprocess_config}, sort_keys=True).encode())
+
+    for path, label in files:
+        stat = os.stat(path)
+        entry = index.get(path)
+        if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            entry = [stat.st_size, stat.st_mtime_ns, _file_digest(path)]
+            index[path] = entry
+            changed = True
+        relative = Path(os.path.relpath(path, dataset_root)).as_posix()
+        h.update(f"{relative}|{label}|{entry[2]}\n".encode())
+
+    if changed:
+        _save_hash_index(cache_dir, index)
+    return h.hexdigest()
+
+
+# ============================================================================
+# PREPROCESSING
+# ============================================================================
+
+_serving_crop = None
+
+
+def _load_serving_crop(serving_dir):
+    """crop_face() of the backend (imported once per process)"""
+    global _serving_crop
+    if _serving_crop is None:
+        if serving_dir not in sys.path:
+            sys.path.insert(0, serving_dir)
+        from app.utils.face_detection import crop_face
+        _serving_crop = crop_face
+    return _serving_crop
+
+
+def decode_image(path, img_size, serving_dir=None):
+    """
+    Decode one file into a uint8 RGB image
+    
+    serving_dir=None: same preprocessing as load_dataset (cv2 read → resize → RGB).
+    Otherwise the serving face crop of the backend at serving_dir is applied first.
+    
+    Returns:
+        (image, bbox (x, y, w, h) in the original, face_detected), or None if unreadable
+    """
+    try:
+        img = cv2.imread(path)
+        if img is None:
+            return None
+        if serving_dir is None:
+            h, w = img.shape[:2]
+            img = cv2.resize(img, (img_size, img_size))
+            return cv2.cvtColor(img, cv2.COLOR_BGR2RGB), (0, 0, w, h), False
+        
+        face, detected, bbox = _load_serving_crop(serving_dir)(img)
+        # Urutan sama dengan preprocess_for_model: BGR → RGB, lalu resize
+        face = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)
+        return cv2.resize(face, (img_size, img_size)), tuple(int(v) for v in bbox), bool(detected)
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        return None
+
+
+def decode_files(paths, img_size, workers=None, chunk_size=64, desc="Decoding", serving_dir=None):
+    """
+    Decode + resize many files across a process pool
+    
+    Files are sent to the workers in chunks of `chunk_size`; results come
+    back in input order, so the output is deterministic whatever the
+    worker count. Unreadable files yield None (and are reported, like the
+    single-threaded loop did).
+    
+    Yields:
+        decode_image() result (image, bbox, face_detected) or None, one per path, in order
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    decode = partial(decode_image, img_size=img_size, serving_dir=serving_dir)
+
+    if workers == 1:
+        results = map(decode, paths)
+        pool = None
+    else:
+        # spawn, bukan fork: proses training sudah memuat TensorFlow (thread + state
+        # global) yang tidak aman di-fork. Jangan biarkan OpenCV membuat thread
+        # sendiri di tiap proses
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=cv2.setNumThreads, initargs=(1,)
+        )
+        results = pool.map(decode, paths, chunksize=chunk_size)
+
+    try:
+        for img in tqdm(results, total=len(paths), desc=desc, unit="img"):
+            yield img
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"   {len(paths)} files in {elapsed:.1f}s "
+          f"({len(paths) / elapsed if elapsed else 0:.0f} img/s, {workers} workers)")
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class DatasetCache:
+    """
+    Read-only view over the shards of one split.
+
+    images: list of memory-mapped (N, H, W, 3) uint8 arrays
+    labels: all labels (int32)
+    bboxes: (N, 4) int32 crop boxes (x, y, w, h) in the source images
+    face_detected: (N,) bool, False where the center crop fallback was used
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json") as f:
+            self.meta = json.load(f)
+        self.shard_size = self.meta["shard_size"]
+        self.images = [
+            np.load(self.directory / name, mmap_mode='r')
+            for name in self.meta["image_shards"]
+        ]
+        self.labels = np.load(self.directory / "labels.npy")
+        self.bboxes = np.load(self.directory / "bboxes.npy")
+        self.face_detected = np.load(self.directory / "face_detected.npy")
+
+    def __len__(self):
+        return len(self.labels)
+
+    def image(self, index):
+        """One uint8 image (a view into the mmap, no decode)"""
+        return self.images[index // self.shard_size][index % self.shard_size]
+
+    def arrays(self, normalize=True):
+        """Whole split in memory, like load_dataset: (X float32 in [0,1], Y)"""
+        X = np.concatenate(self.images) if self.images else np.empty((0,), dtype=np.uint8)
+        if normalize:
+            X = X.astype('float32') / 255.0
+        return X, self.labels
+
+
+def _write_cache(directory, files, img_size, shard_size, key, preprocess_config,
+                 workers=None, chunk_size=64, serving_dir=None):
+    """Decode all files into shards in a temp dir, then rename into place"""
+    tmp_dir = Path(str(directory) + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    labels, bboxes, face_detected, image_shards, skipped = [], [], [], [], 0
+    shard, shard_idx = [], 0
+
+    def flush():
+        nonlocal shard, shard_idx
+        if not shard:
+            return
+        name = f"images_{shard_idx:03d}.npy"
+        np.save(tmp_dir / name, np.stack(shard))
+        image_shards.append(name)
+        shard, shard_idx = [], shard_idx + 1
+
+    results = decode_files([path for path, _ in files], img_size, workers, chunk_size,
+                           desc=f"Caching {Path(directory).name}", serving_dir=serving_dir)
+    for result, (path, label) in zip(results, files):
+        if result is None:
+            skipped += 1
+            continue
+        img, bbox, detected = result
+        shard.append(img)
+        labels.append(label)
+        bboxes.append(bbox)
+        face_detected.append(detected)
+        if len(shard) == shard_size:
+            flush()
+    flush()
+
+    np.save(tmp_dir / "labels.npy", np.array(labels, dtype=np.int32))
+    np.save(tmp_dir / "bboxes.npy", np.array(bboxes, dtype=np.int32).reshape(-1, 4))
+    np.save(tmp_dir / "face_detected.npy", np.array(face_detected, dtype=bool))
+    with open(tmp_dir / "meta.json", 'w') as f:
+        json.dump({
+            "format": CACHE_FORMAT,
+            "key": key,
+            "config": preprocess_config,
+            "shard_size": shard_size,
+            "image_shards": image_shards,
+            "count": len(labels),
+            "skipped": skipped,
+            "faces_detected": int(sum(face_detected))
+        }, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+    return skipped
+
+
+def _crop_signature(serving_dir):
+    """Hash of the serving face detection code, so a crop change rebuilds the cache"""
+    source = Path(serving_dir) / "app" / "utils" / "face_detection.py"
+    if not source.exists():
+        raise ValueError(f"Serving face detection not found: {source}")
+    return {"pipeline": "serving-face", "source": _file_digest(source)}
+
+
+def get_dataset_cache(split, dataset_root, cache_dir, img_size, num_classes,
+                      shard_size=4096, rebuild=False, workers=None, chunk_size=64,
+                      serving_dir=None):
+    """
+    Open the cache of a split, building it first if the inputs changed
+    
+    serving_dir: backend directory whose face crop is applied (None = plain resize)
+
+    Returns:
+        DatasetCache
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    preprocess_config = {"img_size": img_size, "channels": 3, "color": "RGB", "resize": "cv2.INTER_LINEAR"}
+    if serving_dir is not None:
+        serving_dir = str(Path(serving_dir).resolve())
+        preprocess_config["crop"] = _crop_signature(serving_dir)
+    files = list_source_files(dataset_root, split, num_classes)
+    key = compute_cache_key(files, preprocess_config, cache_dir, dataset_root)
+    directory = Path(cache_dir) / f"{split}-{key[:16]}"
+
+    if not rebuild and (directory / "meta.json").exists():
+        print(f"✓ Dataset cache hit: {directory}")
+        return DatasetCache(directory)
+
+    print(f"🗂️  Building dataset cache for '{split}' ({len(files)} files) → {directory}")
+    skipped = _write_cache(directory, files, img_size, shard_size, key, preprocess_config,
+                           workers, chunk_size, serving_dir)
+
+    # Hapus cache lama dari split yang sama
+    for old in Path(cache_dir).glob(f"{split}-*"):
+        if old != directory and old.is_dir():
+            shutil.rmtree(old, ignore_errors=True)
+
+    cache = DatasetCache(directory)
+    print(f"✓ Dataset cache ready: {len(cache)} images ({skipped} skipped)")
+    if serving_dir is not None and len(cache):
+        print(f"   Face detected in {cache.face_detected.mean():.1%} (rest: center crop)")
+    return cache
+
+
+if __name__ == "__main__":
+    from train_model import Config
+
+    parser = argparse.ArgumentParser(description="Build the preprocessed dataset cache")
+    parser.add_argument("--split", nargs="+", default=["train", "test"])
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the key matches")
+    parser.add_argument("--workers", type=int, default=Config.LOAD_WORKERS,
+                        help="Decode processes (default: all cores)")
+    parser.add_argument("--crop-faces", action=argparse.BooleanOptionalAction, default=Config.CROP_FACES,
+                        help="Apply the serving face crop (default: Config.CROP_FACES)")
+    args = parser.parse_args()
+
+    for split in args.split:
+        get_dataset_cache(
+            split, Config.DATASET_ROOT, Config.CACHE_DIR, Config.IMG_SIZE,
+            Config.NUM_CLASSES, Config.CACHE_SHARD_SIZE, rebuild=args.rebuild,
+            workers=args.workers, chunk_size=Config.LOAD_CHUNK_SIZE,
+            serving_dir=Config.SERVING_DIR if args.crop_faces else None
+        )
@@ -0,0 +1,274 @@
+"""
+Knowledge Distillation Script
+Train a compact student CNN on the soft targets of the trained teacher
+(model/emotion_cnn.h5, build_custom_cnn) and compare both on the test set.
+
+The student architecture comes from the backend (ml/model_architecture.py),
+so the saved weights load in the API with:
+    MODEL_ARCHITECTURE=student_cnn
+    MODEL_PATH=<path to emotion_student.h5>
+
+Usage:
+    python distill_model.py
+    python distill_model.py --teacher model/emotion_cnn.h5 --epochs 30
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+from datetime import datetime
+
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from sklearn.metrics import accuracy_score, f1_score
+
+from train_model import Config, load_datasets, predict_dataset, build_serving_model
+
+# Target dari request: >= 3x lebih cepat, macro-F1 turun < 2 poin
+TARGET_SPEEDUP = 3.0
+MAX_F1_DROP = 0.02
+
+
+# ============================================================================
+# DISTILLATION
+# ============================================================================
+
+def soften(probs, temperature):
+    """Re-scale softmax outputs to a temperature: softmax(log(p) / T)"""
+    return tf.nn.softmax(tf.math.log(probs + 1e-7) / temperature)
+
+
+class Distiller(keras.Model):
+    """
+    Trains `student` on alpha * CE(labels) + (1 - alpha) * T² * KL(teacher_T || student_T)
+
+    Both models end in softmax, so the temperature is applied to the log
+    probabilities. The teacher is frozen; only the student is updated.
+    """
+
+    def __init__(self, student, teacher, temperature=4.0, alpha=0.1):
+        super().__init__()
+        self.student = student
+        self.teacher = teacher
+        self.teacher.trainable = False
+        self.temperature = temperature
+        self.alpha = alpha
+        self.hard_loss = keras.losses.SparseCategoricalCrossentropy()
+        self.soft_loss = keras.losses.KLDivergence()
+        self.loss_tracker = keras.metrics.Mean(name="loss")
+        self.accuracy_tracker = keras.metrics.SparseCategoricalAccuracy(name="accuracy")
+
+    @property
+    def metrics(self):
+        return [self.loss_tracker, self.accuracy_tracker]
+
+    def call(self, inputs, training=False):
+        return self.student(inputs, training=training)
+
+    def _loss(self, y, student_probs, teacher_probs):
+        hard = self.hard_loss(y, student_probs)
+        soft = self.soft_loss(
+            soften(teacher_probs, self.temperature),
+            soften(student_probs, self.temperature)
+        ) * self.temperature ** 2
+        return self.alpha * hard + (1.0 - self.alpha) * soft
+
+    def train_step(self, data):
+        x, y = data
+        teacher_probs = self.teacher(x, training=False)
+        with tf.GradientTape() as tape:
+            student_probs = self.student(x, training=True)
+            loss = self._loss(y, student_probs, teacher_probs)
+        variables = self.student.trainable_variables
+        self.optimizer.apply_gradients(zip(tape.gradient(loss, variables), variables))
+        return self._update_metrics(loss, y, student_probs)
+
+    def test_step(self, data):
+        x, y = data
+        student_probs = self.student(x, training=False)
+        loss = self._loss(y, student_probs, self.teacher(x, training=False))
+        return self._update_metrics(loss, y, student_probs)
+
+    def _update_metrics(self, loss, y, student_probs):
+        self.loss_tracker.update_state(loss)
+        self.accuracy_tracker.update_state(y, student_probs)
+        return {m.name: m.result() for m in self.metrics}
+
+
+class SaveBestStudent(keras.callbacks.Callback):
+    """ModelCheckpoint for the student only (the Distiller wrapper is not saved)"""
+
+    def __init__(self, student, filepath, monitor='val_accuracy'):
+        super().__init__()
+        self.student = student
+        self.filepath = filepath
+        self.monitor = monitor
+        self.best = -np.inf
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is not None and value > self.best:
+            print(f"\nEpoch {epoch + 1}: {self.monitor} improved from {self.best:.4f} to {value:.4f}, "
+                  f"saving student to {self.filepath}")
+            self.best = value
+            self.student.save(self.filepath)
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def measure_latency(model, runs=200, warmup=20):
+    """
+    Single-image CPU latency in ms (median / p95) of the graph forward
+    pass, the same call EmotionModel.predict makes per request
+    """
+    forward = tf.function(lambda x: model(x, training=False))
+    x = tf.random.uniform((1, *model.input_shape[1:]))
+    for _ in range(warmup):
+        forward(x).numpy()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        forward(x).numpy()
+        times.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": float(np.median(times)),
+        "p95_ms": float(np.percentile(times, 95))
+    }
+
+
+def evaluate(model, test_ds, path):
+    """Accuracy, macro-F1, latency, parameters and file size of one model"""
+    y_true, y_pred, _ = predict_dataset(model, test_ds)
+    return {
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "macro_f1": float(f1_score(y_true, y_pred, average='macro')),
+        "params": int(model.count_params()),
+        "size_mb": os.path.getsize(path) / (1024 * 1024),
+        "latency": measure_latency(model)
+    }
+
+
+def print_report(report):
+    teacher, student = report["teacher"], report["student"]
+    print("\n" + "="*72)
+    print("DISTILLATION REPORT (test set)")
+    print("="*72)
+    print(f"{'':10s} {'accuracy':>9s} {'macro-F1':>9s} {'params':>10s} {'size MB':>8s} "
+          f"{'median ms':>10s} {'p95 ms':>8s}")
+    for name, r in (("Teacher", teacher), ("Student", student)):
+        print(f"{name:10s} {r['accuracy']:9.4f} {r['macro_f1']:9.4f} {r['params']:10,d} {r['size_mb']:8.2f} "
+              f"{r['latency']['median_ms']:10.2f} {r['latency']['p95_ms']:8.2f}")
+
+    speedup = report["speedup"]
+    f1_drop = report["macro_f1_drop"]
+    print(f"\nSpeedup (CPU, batch of 1): {speedup:.1f}x  "
+          f"{'✓' if speedup >= TARGET_SPEEDUP else '⚠'} target >= {TARGET_SPEEDUP:.0f}x")
+    print(f"Macro-F1 drop: {f1_drop * 100:.2f} points  "
+          f"{'✓' if f1_drop < MAX_F1_DROP else '⚠'} target < {MAX_F1_DROP * 100:.0f}")
+    print("="*72)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def distill_model(teacher_path, epochs):
+    print("\n" + "="*60)
+    print("🎓 KNOWLEDGE DISTILLATION")
+    print("="*60)
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Teacher: {teacher_path}")
+    print(f"Student: {Config.STUDENT_ARCHITECTURE} (T={Config.DISTILL_TEMPERATURE}, alpha={Config.DISTILL_ALPHA})")
+    print("="*60)
+
+    if not os.path.exists(teacher_path):
+        print(f"❌ Teacher not found: {teacher_path}")
+        print("Please train the model first: python train_model.py")
+        return
+
+    teacher = tf.keras.models.load_model(teacher_path)
+
+    print("\n📊 LOADING DATA...")
+    train_ds, val_ds, test_ds = load_datasets()
+
+    student = build_serving_model(Config.STUDENT_ARCHITECTURE)
+    student.summary()
+
+    distiller = Distiller(student, teacher, Config.DISTILL_TEMPERATURE, Config.DISTILL_ALPHA)
+    distiller.compile(optimizer=keras.optimizers.Adam(learning_rate=Config.LEARNING_RATE))
+
+    student_path = os.path.join(Config.MODEL_DIR, 'emotion_student.h5')
+    callbacks = [
+        SaveBestStudent(student, student_path),
+        EarlyStopping(
+            monitor='val_accuracy',
+            mode='max',
+            patience=Config.PATIENCE_EARLY_STOP,
+            min_delta=Config.MIN_DELTA,
+            verbose=1,
+            restore_best_weights=True
+        ),
+        ReduceLROnPlateau(
+            monitor='val_loss',
+            factor=0.5,
+            patience=Config.PATIENCE_LR_REDUCE,
+            min_lr=1e-7,
+            verbose=1
+        )
+    ]
+
+    print("\n🚀 STARTING DISTILLATION...")
+    history = distiller.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=epochs,
+        callbacks=callbacks,
+        verbose=1
+    )
+    if os.path.exists(student_path):
+        # Evaluasi bobot yang tersimpan (epoch terbaik), bukan bobot epoch terakhir
+        student.load_weights(student_path)
+    else:
+        student.save(student_path)
+
+    print("\n📊 EVALUATING TEACHER VS STUDENT...")
+    report = {
+        "date": datetime.now().isoformat(),
+        "teacher_path": teacher_path,
+        "student_path": student_path,
+        "student_architecture": Config.STUDENT_ARCHITECTURE,
+        "temperature": Config.DISTILL_TEMPERATURE,
+        "alpha": Config.DISTILL_ALPHA,
+        "epochs_trained": len(history.history['loss']),
+        "teacher": evaluate(teacher, test_ds, teacher_path),
+        "student": evaluate(student, test_ds, student_path)
+    }
+    report["speedup"] = (
+        report["teacher"]["latency"]["median_ms"] / report["student"]["latency"]["median_ms"]
+    )
+    report["macro_f1_drop"] = report["teacher"]["macro_f1"] - report["student"]["macro_f1"]
+
+    with open(os.path.join(Config.RESULTS_DIR, 'distillation_report.json'), 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print_report(report)
+    print(f"Student saved: {student_path}")
+    print(f"Report saved: {Config.RESULTS_DIR}/distillation_report.json")
+    print(f"Serve it with MODEL_ARCHITECTURE={Config.STUDENT_ARCHITECTURE} MODEL_PATH=<{student_path}>")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distill emotion_cnn into a compact student")
+    parser.add_argument("--teacher", default=os.path.join(Config.MODEL_DIR, 'emotion_cnn.h5'))
+    parser.add_argument("--epochs", type=int, default=Config.EPOCHS)
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    tf.random.set_seed(42)
+
+    distill_model(args.teacher, args.epochs)
@@ -0,0 +1,299 @@
+"""
+Structured Channel Pruning Script
+Remove whole conv filters / dense units from the trained emotion_cnn down
+to a FLOP or CPU-latency budget, fine-tuning after every pruning step.
+
+Channels are ranked per layer by importance:
+    l1     L1 norm of the filter (conv) / input weights (dense)
+    bn     |gamma| of the BatchNormalization that follows
+    l1_bn  both multiplied (default)
+
+The result is a physically smaller dense model (fewer channels, no masks)
+built with the serving build_emotion_cnn(filters, dense_units), plus a
+sidecar JSON that tells EmotionModel which sizes to rebuild:
+    model/emotion_cnn_pruned.h5
+    model/emotion_cnn_pruned.json
+
+Usage:
+    python prune_model.py                      # Config.PRUNE_TARGET_FLOPS
+    python prune_model.py --flops 0.3
+    python prune_model.py --latency-ms 2.5
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+from datetime import datetime
+
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.layers import Conv2D, Dense, BatchNormalization
+from tensorflow.keras.callbacks import EarlyStopping
+from sklearn.metrics import accuracy_score, f1_score
+
+from train_model import Config, load_datasets, predict_dataset, build_serving_model
+from distill_model import measure_latency
+
+IMPORTANCE_METHODS = ("l1", "bn", "l1_bn")
+
+
+# ============================================================================
+# COST MODEL
+# ============================================================================
+
+def emotion_cnn_flops(filters, dense_units):
+    """FLOPs (2 x multiply-adds) of one forward pass of build_emotion_cnn"""
+    size, channels, macs = Config.IMG_SIZE, Config.CHANNELS, 0
+    for f in filters:
+        macs += size * size * 9 * channels * f  # 3x3 conv, padding 'same'
+        size, channels = size // 2, f           # MaxPooling 2x2
+    macs += size * size * channels * dense_units + dense_units * Config.NUM_CLASSES
+    return 2 * macs
+
+
+def model_spec(model):
+    """(filters of the 3 conv layers, units of the hidden dense layer)"""
+    convs = [layer for layer in model.layers if isinstance(layer, Conv2D)]
+    dense = [layer for layer in model.layers if isinstance(layer, Dense)][0]
+    return [int(layer.filters) for layer in convs], int(dense.units)
+
+
+def keep_counts(filters, dense_units, ratio):
+    """Channels kept per layer when keeping `ratio` of each"""
+    def keep(n):
+        return max(1, int(round(n * ratio)))
+    return [keep(f) for f in filters], keep(dense_units)
+
+
+def cost(filters, dense_units, target_latency_ms):
+    """Latency in ms (measured on a fresh model) or FLOPs, whichever is the budget"""
+    if target_latency_ms is not None:
+        return measure_latency(build_serving_model('emotion_cnn', filters=filters, dense_units=dense_units),
+                               runs=100)["median_ms"]
+    return emotion_cnn_flops(filters, dense_units)
+
+
+def find_keep_ratio(filters, dense_units, budget, target_latency_ms=None, iterations=10):
+    """Largest uniform keep ratio whose pruned topology fits the budget (binary search)"""
+    low, high = 0.0, 1.0
+    for _ in range(iterations):
+        ratio = (low + high) / 2
+        if cost(*keep_counts(filters, dense_units, ratio), target_latency_ms) <= budget:
+            low = ratio
+        else:
+            high = ratio
+    return max(low, 1.0 / max(filters + [dense_units]))
+
+
+# ============================================================================
+# PRUNING
+# ============================================================================
+
+def channel_importance(model, method):
+    """Importance score per output channel of each conv layer + the hidden dense layer"""
+    convs = [layer for layer in model.layers if isinstance(layer, Conv2D)]
+    dense = [layer for layer in model.layers if isinstance(layer, Dense)][0]
+    bns = [layer for layer in model.layers if isinstance(layer, BatchNormalization)]
+
+    scores = []
+    # Tiap Conv2D / Dense hidden diikuti tepat satu BatchNormalization
+    for layer, bn in zip(convs + [dense], bns):
+        kernel = layer.get_weights()[0]
+        l1 = np.abs(kernel).reshape(-1, kernel.shape[-1]).sum(axis=0)
+        gamma = np.abs(bn.get_weights()[0])
+        if method == "l1":
+            scores.append(l1)
+        elif method == "bn":
+            scores.append(gamma)
+        else:
+            scores.append(l1 * gamma)
+    return scores
+
+
+def prune_model(model, filters, dense_units, method):
+    """
+    Copy the most important channels into a smaller build_emotion_cnn
+
+    Every removed conv filter also removes the matching input channel of
+    the next conv (or the matching Flatten features of the dense layer),
+    so the result is an ordinary dense model.
+    """
+    scores = channel_importance(model, method)
+    keep = [np.sort(np.argsort(s)[::-1][:k]) for s, k in zip(scores, filters + [dense_units])]
+
+    convs = [layer for layer in model.layers if isinstance(layer, Conv2D)]
+    dense, output = [layer for layer in model.layers if isinstance(layer, Dense)]
+    bns = [layer for layer in model.layers if isinstance(layer, BatchNormalization)]
+
+    pruned = build_serving_model('emotion_cnn', filters=filters, dense_units=dense_units)
+    p_convs = [layer for layer in pruned.layers if isinstance(layer, Conv2D)]
+    p_dense, p_output = [layer for layer in pruned.layers if isinstance(layer, Dense)]
+    p_bns = [layer for layer in pruned.layers if isinstance(layer, BatchNormalization)]
+
+    in_idx = np.arange(Config.CHANNELS)
+    for conv, p_conv, bn, p_bn, out_idx in zip(convs, p_convs, bns, p_bns, keep):
+        kernel, bias = conv.get_weights()
+        p_conv.set_weights([kernel[:, :, in_idx][..., out_idx], bias[out_idx]])
+        p_bn.set_weights([w[out_idx] for w in bn.get_weights()])
+        in_idx = out_idx
+
+    # Flatten (H, W, C): pilih baris kernel dense dari channel yang tersisa
+    kernel, bias = dense.get_weights()
+    channels = convs[-1].filters
+    kernel = kernel.reshape(-1, channels, kernel.shape[-1])[:, in_idx, :]
+    units = keep[-1]
+    p_dense.set_weights([kernel.reshape(-1, kernel.shape[-1])[:, units], bias[units]])
+    p_bns[-1].set_weights([w[units] for w in bns[-1].get_weights()])
+
+    kernel, bias = output.get_weights()
+    p_output.set_weights([kernel[units], bias])
+    return pruned
+
+
+def finetune(model, train_ds, val_ds, epochs):
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=Config.LEARNING_RATE * 0.1),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    if epochs <= 0:
+        return
+    model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=epochs,
+        callbacks=[EarlyStopping(
+            monitor='val_accuracy',
+            mode='max',
+            patience=max(2, epochs // 2),
+            restore_best_weights=True,
+            verbose=1
+        )],
+        verbose=1
+    )
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def evaluate(model, test_ds):
+    y_true, y_pred, _ = predict_dataset(model, test_ds)
+    filters, dense_units = model_spec(model)
+    return {
+        "filters": filters,
+        "dense_units": dense_units,
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "macro_f1": float(f1_score(y_true, y_pred, average='macro')),
+        "params": int(model.count_params()),
+        "flops": emotion_cnn_flops(filters, dense_units),
+        "latency": measure_latency(model)
+    }
+
+
+def print_report(report):
+    print("\n" + "="*78)
+    print("PRUNING REPORT (test set)")
+    print("="*78)
+    print(f"{'':9s} {'filters':>14s} {'dense':>6s} {'accuracy':>9s} {'macro-F1':>9s} "
+          f"{'params':>9s} {'MFLOPs':>8s} {'ms':>6s}")
+    for name in ("original", "pruned"):
+        r = report[name]
+        print(f"{name:9s} {str(r['filters']):>14s} {r['dense_units']:6d} {r['accuracy']:9.4f} "
+              f"{r['macro_f1']:9.4f} {r['params']:9,d} {r['flops'] / 1e6:8.1f} {r['latency']['median_ms']:6.2f}")
+    original, pruned = report["original"], report["pruned"]
+    print(f"\nFLOPs kept: {pruned['flops'] / original['flops']:.1%}   "
+          f"Speedup: {original['latency']['median_ms'] / pruned['latency']['median_ms']:.1f}x   "
+          f"Macro-F1 change: {(pruned['macro_f1'] - original['macro_f1']) * 100:+.2f} points")
+    print("="*78)
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def run_pruning(model_path, target_flops=None, target_latency_ms=None):
+    print("\n" + "="*60)
+    print("✂️  STRUCTURED CHANNEL PRUNING")
+    print("="*60)
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if Config.PRUNE_IMPORTANCE not in IMPORTANCE_METHODS:
+        raise ValueError(f"Unknown PRUNE_IMPORTANCE '{Config.PRUNE_IMPORTANCE}' (choose from {IMPORTANCE_METHODS})")
+    if not os.path.exists(model_path):
+        print(f"❌ Model not found: {model_path}")
+        print("Please train the model first: python train_model.py")
+        return
+
+    model = tf.keras.models.load_model(model_path)
+    filters, dense_units = model_spec(model)
+
+    if target_latency_ms is not None:
+        budget = target_latency_ms
+        print(f"Budget: {budget:.2f} ms CPU latency (batch of 1)")
+    else:
+        budget = target_flops * emotion_cnn_flops(filters, dense_units)
+        print(f"Budget: {target_flops:.0%} of {emotion_cnn_flops(filters, dense_units) / 1e6:.1f} MFLOPs")
+    ratio = find_keep_ratio(filters, dense_units, budget, target_latency_ms)
+    final_filters, final_units = keep_counts(filters, dense_units, ratio)
+    print(f"Target topology: filters {final_filters}, dense {final_units} (keep ratio {ratio:.2f})")
+    print("="*60)
+
+    print("\n📊 LOADING DATA...")
+    train_ds, val_ds, test_ds = load_datasets()
+    original = evaluate(model, test_ds)
+
+    # Pruning bertahap: rasio geometris menuju target, fine-tune tiap langkah
+    steps = max(1, Config.PRUNE_STEPS)
+    for step in range(1, steps + 1):
+        step_filters, step_units = keep_counts(filters, dense_units, ratio ** (step / steps))
+        print(f"\n✂️  Step {step}/{steps}: filters {step_filters}, dense {step_units}")
+        model = prune_model(model, step_filters, step_units, Config.PRUNE_IMPORTANCE)
+        finetune(model, train_ds, val_ds, Config.PRUNE_FINETUNE_EPOCHS)
+
+    # Export: model padat yang lebih kecil + sidecar untuk EmotionModel
+    base = os.path.join(Config.MODEL_DIR, 'emotion_cnn_pruned')
+    model.save(base + '.h5')
+    with open(base + '.json', 'w') as f:
+        json.dump({
+            "architecture": "emotion_cnn",
+            "kwargs": {"filters": final_filters, "dense_units": final_units},
+            "source": model_path,
+            "importance": Config.PRUNE_IMPORTANCE
+        }, f, indent=4)
+
+    print("\n📊 EVALUATING ORIGINAL VS PRUNED...")
+    report = {
+        "date": datetime.now().isoformat(),
+        "source": model_path,
+        "target_flops": target_flops if target_latency_ms is None else None,
+        "target_latency_ms": target_latency_ms,
+        "importance": Config.PRUNE_IMPORTANCE,
+        "steps": steps,
+        "finetune_epochs": Config.PRUNE_FINETUNE_EPOCHS,
+        "original": original,
+        "pruned": evaluate(model, test_ds)
+    }
+    with open(os.path.join(Config.RESULTS_DIR, 'pruning_report.json'), 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print_report(report)
+    print(f"Pruned model saved: {base}.h5 (+ {base}.json)")
+    print(f"Report saved: {Config.RESULTS_DIR}/pruning_report.json")
+    print(f"Serve it by copying both files and setting MODEL_PATH to the .h5")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prune emotion_cnn channels to a FLOP or latency budget")
+    parser.add_argument("--model", default=os.path.join(Config.MODEL_DIR, 'emotion_cnn.h5'))
+    parser.add_argument("--flops", type=float, default=Config.PRUNE_TARGET_FLOPS,
+                        help="Fraction of the original FLOPs to keep")
+    parser.add_argument("--latency-ms", type=float, default=Config.PRUNE_TARGET_LATENCY_MS,
+                        help="CPU latency budget (overrides --flops)")
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    tf.random.set_seed(42)
+
+    run_pruning(args.model, args.flops, args.latency_ms)
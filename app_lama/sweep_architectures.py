@@ -0,0 +1,227 @@
+"""
+Architecture Sweep Script
+Train + evaluate every variant of the backend cnn_variant family
+(input size x width multiplier x separable convs x head) and write a
+Pareto table of CPU latency, model size and accuracy.
+
+Every variant is saved with its sidecar, so the chosen one can be served
+directly (MODEL_PATH=model/variants/<name>.h5):
+    model/variants/<name>.h5
+    model/variants/<name>.json
+
+Outputs:
+    results/architecture_sweep.json
+    results/architecture_sweep.csv
+    results/architecture_sweep.md   (Pareto-optimal rows marked ★)
+
+Usage:
+    python sweep_architectures.py
+    python sweep_architectures.py --sizes 64 80 --widths 0.5 --heads gap --epochs 20
+"""
+
+import os
+import csv
+import json
+import argparse
+import itertools
+import numpy as np
+from datetime import datetime
+
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from sklearn.metrics import accuracy_score, f1_score
+
+from train_model import Config, AUTOTUNE, load_datasets, predict_dataset, build_serving_model
+from distill_model import measure_latency
+
+VARIANT_DIR = os.path.join(Config.MODEL_DIR, 'variants')
+
+
+# ============================================================================
+# VARIANTS
+# ============================================================================
+
+def variant_grid(sizes, widths, separable, heads):
+    """All combinations as build_cnn_variant kwargs"""
+    return [
+        {"input_size": size, "width": width, "separable": sep, "head": head}
+        for size, width, sep, head in itertools.product(sizes, widths, separable, heads)
+    ]
+
+
+def variant_name(kwargs):
+    return (f"s{kwargs['input_size']}_w{kwargs['width']:g}_"
+            f"{'sep' if kwargs['separable'] else 'conv'}_{kwargs['head']}")
+
+
+def variant_flops(input_size, width=1.0, separable=False, head="flatten", dense_units=128):
+    """FLOPs (2 x multiply-adds) of one forward pass of build_cnn_variant"""
+    filters = [max(8, int(round(f * width))) for f in (64, 64, 32)]
+    size, channels, macs = input_size, Config.CHANNELS, 0
+    for i, f in enumerate(filters):
+        if separable and i > 0:
+            macs += size * size * (9 * channels + channels * f)
+        else:
+            macs += size * size * 9 * channels * f
+        size, channels = size // 2, f
+    features = size * size * channels if head == "flatten" else channels
+    macs += features * dense_units + dense_units * Config.NUM_CLASSES
+    return 2 * macs
+
+
+def resized(ds, size):
+    """Pipeline at another input resolution (cache/decoder produce IMG_SIZE)"""
+    if size == Config.IMG_SIZE:
+        return ds
+    return ds.map(
+        lambda img, label: (tf.image.resize(img, (size, size), antialias=True), label),
+        num_parallel_calls=AUTOTUNE
+    ).prefetch(AUTOTUNE)
+
+
+# ============================================================================
+# TRAIN + EVALUATE
+# ============================================================================
+
+def run_variant(kwargs, datasets, epochs):
+    name = variant_name(kwargs)
+    train_ds, val_ds, test_ds = (resized(ds, kwargs["input_size"]) for ds in datasets)
+
+    model = build_serving_model('cnn_variant', **kwargs)
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=Config.LEARNING_RATE),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    history = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=epochs,
+        callbacks=[
+            EarlyStopping(
+                monitor='val_accuracy',
+                mode='max',
+                patience=Config.PATIENCE_EARLY_STOP,
+                min_delta=Config.MIN_DELTA,
+                restore_best_weights=True
+            ),
+            ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=Config.PATIENCE_LR_REDUCE, min_lr=1e-7)
+        ],
+        verbose=2
+    )
+
+    path = os.path.join(VARIANT_DIR, name)
+    model.save(path + '.h5')
+    with open(path + '.json', 'w') as f:
+        json.dump({"architecture": "cnn_variant", "kwargs": kwargs}, f, indent=4)
+
+    y_true, y_pred, _ = predict_dataset(model, test_ds)
+    latency = measure_latency(model)
+    return {
+        "name": name,
+        **kwargs,
+        "epochs_trained": len(history.history['loss']),
+        "accuracy": float(accuracy_score(y_true, y_pred)),
+        "macro_f1": float(f1_score(y_true, y_pred, average='macro')),
+        "params": int(model.count_params()),
+        "size_mb": os.path.getsize(path + '.h5') / (1024 * 1024),
+        "mflops": variant_flops(**kwargs) / 1e6,
+        "latency_ms": latency["median_ms"],
+        "latency_p95_ms": latency["p95_ms"],
+        "path": path + '.h5'
+    }
+
+
+def mark_pareto(rows):
+    """A row is Pareto-optimal if no other row is at least as good on latency,
+    size and accuracy and strictly better on one of them"""
+    for row in rows:
+        row["pareto"] = not any(
+            other["latency_ms"] <= row["latency_ms"]
+            and other["size_mb"] <= row["size_mb"]
+            and other["accuracy"] >= row["accuracy"]
+            and (other["latency_ms"] < row["latency_ms"]
+                 or other["size_mb"] < row["size_mb"]
+                 or other["accuracy"] > row["accuracy"])
+            for other in rows if other is not row
+        )
+    return rows
+
+
+# ============================================================================
+# OUTPUT
+# ============================================================================
+
+COLUMNS = ["name", "input_size", "width", "separable", "head", "accuracy", "macro_f1",
+           "latency_ms", "latency_p95_ms", "size_mb", "params", "mflops", "epochs_trained", "pareto", "path"]
+
+
+def write_tables(rows):
+    rows = sorted(rows, key=lambda r: r["latency_ms"])
+    base = os.path.join(Config.RESULTS_DIR, 'architecture_sweep')
+
+    with open(base + '.json', 'w') as f:
+        json.dump({"date": datetime.now().isoformat(), "variants": rows}, f, indent=4)
+
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    lines = [
+        "| | variant | accuracy | macro-F1 | latency ms (p50 / p95) | size MB | params | MFLOPs |",
+        "|---|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    for r in rows:
+        lines.append(
+            f"| {'★' if r['pareto'] else ''} | {r['name']} | {r['accuracy']:.4f} | {r['macro_f1']:.4f} | "
+            f"{r['latency_ms']:.2f} / {r['latency_p95_ms']:.2f} | {r['size_mb']:.2f} | "
+            f"{r['params']:,} | {r['mflops']:.1f} |"
+        )
+    with open(base + '.md', 'w') as f:
+        f.write("# Architecture sweep\n\n★ = Pareto-optimal (latency, size, accuracy)\n\n")
+        f.write("\n".join(lines) + "\n")
+
+    print("\n" + "\n".join(lines))
+    print(f"\n✓ Saved: {base}.json / .csv / .md")
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def sweep(variants, epochs):
+    print("\n" + "="*60)
+    print(f"🧪 ARCHITECTURE SWEEP ({len(variants)} variants, {epochs} epochs max)")
+    print("="*60)
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+
+    print("\n📊 LOADING DATA...")
+    datasets = load_datasets()
+
+    rows = []
+    for i, kwargs in enumerate(variants, 1):
+        print(f"\n🏗️  [{i}/{len(variants)}] {variant_name(kwargs)}")
+        row = run_variant(kwargs, datasets, epochs)
+        print(f"   accuracy {row['accuracy']:.4f}  latency {row['latency_ms']:.2f} ms  size {row['size_mb']:.2f} MB")
+        rows.append(row)
+        keras.backend.clear_session()
+
+    write_tables(mark_pareto(rows))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train/evaluate cnn_variant architectures and write a Pareto table")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 80, 100])
+    parser.add_argument("--widths", type=float, nargs="+", default=[0.5, 1.0])
+    parser.add_argument("--separable", choices=["yes", "no", "both"], default="both")
+    parser.add_argument("--heads", nargs="+", choices=["flatten", "gap"], default=["flatten", "gap"])
+    parser.add_argument("--epochs", type=int, default=Config.EPOCHS)
+    args = parser.parse_args()
+
+    np.random.seed(42)
+    tf.random.set_seed(42)
+
+    separable = {"yes": [True], "no": [False], "both": [False, True]}[args.separable]
+    sweep(variant_grid(args.sizes, args.widths, separable, args.heads), args.epochs)
@@ -0,0 +1,507 @@
+"""
+Hyperparameter Sweep Script
+Grid / random search over train_model.Config fields (learning rate, batch
+size, dropout, patience, ...) with trials running concurrently.
+
+Every trial is a separate process (this script with --worker) that
+applies its Config overrides, trains build_custom_cnn and reports
+val_accuracy after each epoch. The parent:
+    - builds the preprocessed dataset cache once; trials only mmap it
+    - pins each trial's CPU threads (TF intra/inter-op, tf.data, OpenMP)
+      and optionally its cores (--pin-cores)
+    - kills trials that are clearly losing: after --grace-epochs, a trial
+      whose best val_accuracy so far is more than --kill-margin below the
+      median of the other trials at the same epoch (median stopping rule)
+
+Spec (JSON file, or --param NAME=v1,v2 on the command line):
+    {
+        "method": "random",              # grid | random
+        "trials": 16,                    # random only
+        "params": {
+            "LEARNING_RATE": {"log_uniform": [0.0001, 0.003]},
+            "BATCH_SIZE": [32, 64],
+            "CONV_DROPOUT": {"uniform": [0.1, 0.4]},
+            "PATIENCE_EARLY_STOP": {"int": [5, 20]}
+        }
+    }
+A list (or {"choice": [...]}) is sampled / enumerated as is; ranges are
+random search only.
+
+Outputs:
+    results/hparam_sweep/<trial>/   config.json, progress.json, result.json,
+                                    train.log, model.h5 (best epoch)
+    results/hparam_leaderboard.json
+    results/hparam_leaderboard.csv
+    results/hparam_leaderboard.md
+
+Usage:
+    python sweep_hyperparams.py --spec sweep.json --parallel 4
+    python sweep_hyperparams.py --param LEARNING_RATE=0.001,0.0003 --param BATCH_SIZE=32,64 --epochs 20
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+import subprocess
+import numpy as np
+from datetime import datetime
+
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
+
+from train_model import Config, load_cache, load_datasets, build_custom_cnn
+
+SWEEP_DIR = os.path.join(Config.RESULTS_DIR, 'hparam_sweep')
+
+# Field yang menentukan isi cache bersama: tidak boleh di-sweep
+SHARED_FIELDS = {
+    "DATASET_ROOT", "MODEL_DIR", "RESULTS_DIR", "USE_DATASET_CACHE", "CACHE_DIR",
+    "CACHE_SHARD_SIZE", "CROP_FACES", "SERVING_DIR", "IMG_SIZE", "CHANNELS",
+    "NUM_CLASSES", "EMOTIONS"
+}
+
+
+# ============================================================================
+# SEARCH SPACE
+# ============================================================================
+
+def parse_value(text):
+    """'0.001' -> 0.001, '32' -> 32, 'true' -> True, anything else stays a string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_params(items):
+    """['LEARNING_RATE=0.001,0.0003', ...] -> {"LEARNING_RATE": [0.001, 0.0003]}"""
+    params = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        if not values:
+            raise ValueError(f"Expected NAME=v1,v2,... got: {item}")
+        params[name.strip()] = [parse_value(v.strip()) for v in values.split(',')]
+    return params
+
+
+def validate_params(params):
+    for name in params:
+        if not name.isupper() or not hasattr(Config, name):
+            raise ValueError(f"Unknown Config field: {name}")
+        if name in SHARED_FIELDS:
+            raise ValueError(f"{name} changes the shared dataset cache and cannot be swept")
+
+
+def sample_value(space, rng):
+    if isinstance(space, list):
+        return space[rng.integers(len(space))]
+    (kind, args), = space.items()
+    if kind == "choice":
+        return args[rng.integers(len(args))]
+    low, high = args
+    if kind == "uniform":
+        return float(rng.uniform(low, high))
+    if kind == "log_uniform":
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    if kind == "int":
+        return int(rng.integers(low, high + 1))
+    raise ValueError(f"Unknown distribution: {kind}")
+
+
+def build_trials(spec):
+    """List of Config overrides, one dict per trial"""
+    params = spec["params"]
+    validate_params(params)
+    method = spec.get("method", "grid")
+
+    if method == "grid":
+        values = []
+        for name, space in params.items():
+            if isinstance(space, dict) and set(space) == {"choice"}:
+                space = space["choice"]
+            if not isinstance(space, list):
+                raise ValueError(f"Grid search needs a list of values for {name}, got {space}")
+            values.append(space)
+        return [dict(zip(params, combo)) for combo in itertools.product(*values)]
+
+    if method == "random":
+        rng = np.random.default_rng(spec.get("seed", 42))
+        return [
+            {name: sample_value(space, rng) for name, space in params.items()}
+            for _ in range(spec.get("trials", 10))
+        ]
+
+    raise ValueError(f"Unknown search method: {method}")
+
+
+def trial_name(index, overrides):
+    parts = []
+    for name, value in overrides.items():
+        parts.append(f"{name.lower()}{value:.3g}" if isinstance(value, float) else f"{name.lower()}{value}")
+    return f"t{index:03d}_" + "_".join(parts)
+
+
+# ============================================================================
+# WORKER (one trial, separate process)
+# ============================================================================
+
+def write_json(path, data):
+    """Atomic write, the parent polls these files while the trial runs"""
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp, path)
+
+
+class TrialReporter(keras.callbacks.Callback):
+    """Appends the epoch metrics to progress.json after every epoch"""
+
+    def __init__(self, trial_dir):
+        super().__init__()
+        self.path = os.path.join(trial_dir, 'progress.json')
+        self.epochs = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        self.epochs.append({
+            "epoch": epoch + 1,
+            "seconds": time.perf_counter() - self.start,
+            **{k: float(logs[k]) for k in ("loss", "accuracy", "val_loss", "val_accuracy") if k in logs}
+        })
+        write_json(self.path, {"epochs": self.epochs})
+
+
+def pin_threads(threads):
+    """
+    TF op thread pools of `threads` threads (before any op runs) and the
+    tf.data options giving every pipeline a private pool of the same size
+    """
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(min(2, threads))
+    options = tf.data.Options()
+    options.threading.private_threadpool_size = threads
+    return options
+
+
+def run_trial(trial_dir, threads, cores=None):
+    with open(os.path.join(trial_dir, 'config.json')) as f:
+        overrides = json.load(f)["overrides"]
+    for name, value in overrides.items():
+        setattr(Config, name, value)
+
+    if cores and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+
+    data_options = pin_threads(threads)
+    np.random.seed(42)
+    tf.random.set_seed(42)
+
+    train_ds, val_ds, test_ds = (ds.with_options(data_options) for ds in load_datasets())
+
+    model = build_custom_cnn()
+    model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=Config.LEARNING_RATE),
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy']
+    )
+
+    model_path = os.path.join(trial_dir, 'model.h5')
+    start = time.perf_counter()
+    history = model.fit(
+        train_ds,
+        validation_data=val_ds,
+        epochs=Config.EPOCHS,
+        callbacks=[
+            TrialReporter(trial_dir),
+            ModelCheckpoint(model_path, monitor='val_accuracy', mode='max', save_best_only=True),
+            EarlyStopping(
+                monitor='val_accuracy',
+                mode='max',
+                patience=Config.PATIENCE_EARLY_STOP,
+                min_delta=Config.MIN_DELTA,
+                restore_best_weights=True
+            ),
+            ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=Config.PATIENCE_LR_REDUCE, min_lr=1e-7)
+        ],
+        verbose=2
+    )
+    train_seconds = time.perf_counter() - start
+
+    # Skor test untuk model.h5 yang dicantumkan di leaderboard (epoch terbaik)
+    if os.path.exists(model_path):
+        model.load_weights(model_path)
+    test_loss, test_accuracy = model.evaluate(test_ds, verbose=0)
+    write_json(os.path.join(trial_dir, 'result.json'), {
+        "test_loss": float(test_loss),
+        "test_accuracy": float(test_accuracy),
+        "train_seconds": train_seconds,
+        "epochs_trained": len(history.history['loss'])
+    })
+
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+
+def read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def best_until(trial, epoch):
+    """Best val_accuracy of a trial within its first `epoch` epochs"""
+    return max(e["val_accuracy"] for e in trial["epochs"][:epoch])
+
+
+def should_kill(trial, trials, grace_epochs, margin, min_peers):
+    """Median stopping rule against every other trial that reached the same epoch"""
+    epoch = len(trial["epochs"])
+    if epoch < grace_epochs:
+        return False
+    peers = [best_until(t, epoch) for t in trials
+             if t is not trial and len(t["epochs"]) >= epoch]
+    if len(peers) < min_peers:
+        return False
+    return best_until(trial, epoch) < float(np.median(peers)) - margin
+
+
+def trial_env(threads):
+    env = dict(os.environ)
+    env.update({
+        "OMP_NUM_THREADS": str(threads),
+        "TF_NUM_INTRAOP_THREADS": str(threads),
+        "TF_NUM_INTEROP_THREADS": str(min(2, threads)),
+        "TF_CPP_MIN_LOG_LEVEL": env.get("TF_CPP_MIN_LOG_LEVEL", "2")
+    })
+    return env
+
+
+def start_trial(trial, slot, args):
+    command = [sys.executable, os.path.abspath(__file__), "--worker", trial["dir"],
+               "--threads", str(args.threads)]
+    if args.pin_cores:
+        cores = range(slot * args.threads, (slot + 1) * args.threads)
+        command += ["--cores", *(str(c % os.cpu_count()) for c in cores)]
+    trial["log"] = open(os.path.join(trial["dir"], 'train.log'), 'w')
+    trial["process"] = subprocess.Popen(
+        command, stdout=trial["log"], stderr=subprocess.STDOUT, env=trial_env(args.threads)
+    )
+    trial["slot"] = slot
+    trial["status"] = "running"
+    trial["started"] = time.perf_counter()
+    print(f"🚀 [{trial['name']}] started (slot {slot})")
+
+
+def finish_trial(trial, status):
+    trial["process"].wait()
+    trial["log"].close()
+    trial["status"] = status
+    progress = read_json(os.path.join(trial["dir"], 'progress.json'))
+    if progress:
+        trial["epochs"] = progress["epochs"]
+    trial["seconds"] = time.perf_counter() - trial["started"]
+    trial["result"] = read_json(os.path.join(trial["dir"], 'result.json')) or {}
+
+
+def run_sweep(trials, args):
+    pending = list(trials)
+    running = []
+    free_slots = list(range(args.parallel))
+
+    while pending or running:
+        while pending and free_slots:
+            trial = pending.pop(0)
+            start_trial(trial, free_slots.pop(0), args)
+            running.append(trial)
+
+        time.sleep(args.poll)
+
+        for trial in trials:
+            if trial["status"] != "pending":
+                progress = read_json(os.path.join(trial["dir"], 'progress.json'))
+                if progress:
+                    trial["epochs"] = progress["epochs"]
+
+        for trial in list(running):
+            if trial["process"].poll() is not None:
+                finish_trial(trial, "completed" if trial["process"].returncode == 0 else "failed")
+            elif should_kill(trial, trials, args.grace_epochs, args.kill_margin, args.min_peers):
+                trial["process"].terminate()
+                finish_trial(trial, "killed")
+            else:
+                continue
+            running.remove(trial)
+            free_slots.append(trial["slot"])
+            best = max((e["val_accuracy"] for e in trial["epochs"]), default=float('nan'))
+            icon = {"completed": "✓", "killed": "✂️ ", "failed": "❌"}[trial["status"]]
+            print(f"{icon} [{trial['name']}] {trial['status']} after {len(trial['epochs'])} epochs, "
+                  f"best val_accuracy {best:.4f}")
+
+
+# ============================================================================
+# LEADERBOARD
+# ============================================================================
+
+def leaderboard_rows(trials):
+    rows = []
+    for trial in trials:
+        model_path = os.path.join(trial["dir"], 'model.h5')
+        val = [e["val_accuracy"] for e in trial["epochs"]]
+        rows.append({
+            "trial": trial["name"],
+            "status": trial["status"],
+            **trial["overrides"],
+            "best_val_accuracy": max(val) if val else None,
+            "best_epoch": int(np.argmax(val)) + 1 if val else None,
+            "epochs": len(val),
+            "test_accuracy": trial["result"].get("test_accuracy"),
+            "seconds": trial.get("seconds"),
+            "path": model_path if os.path.exists(model_path) else None
+        })
+    # Trial yang selesai di atas, lalu urut val_accuracy terbaik
+    rows.sort(key=lambda r: (r["status"] != "completed", -(r["best_val_accuracy"] or 0.0)))
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+def write_leaderboard(rows, params, spec):
+    base = os.path.join(Config.RESULTS_DIR, 'hparam_leaderboard')
+    columns = ["rank", "trial", "status", *params, "best_val_accuracy", "best_epoch",
+               "epochs", "test_accuracy", "seconds", "path"]
+
+    with open(base + '.json', 'w') as f:
+        json.dump({"date": datetime.now().isoformat(), "spec": spec, "trials": rows}, f, indent=4)
+
+    with open(base + '.csv', 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+    def fmt(value, digits=4):
+        if value is None:
+            return "-"
+        return f"{value:.{digits}g}" if isinstance(value, float) else str(value)
+
+    lines = [
+        "| # | " + " | ".join(params) + " | status | best val acc | epoch | test acc | time s |",
+        "|---" * (len(params) + 1) + "|---|---:|---:|---:|---:|",
+    ]
+    for r in rows:
+        lines.append(
+            f"| {r['rank']} | " + " | ".join(fmt(r[p]) for p in params) +
+            f" | {r['status']} | {fmt(r['best_val_accuracy'])} | {fmt(r['best_epoch'])}/{r['epochs']} | "
+            f"{fmt(r['test_accuracy'])} | {fmt(r['seconds'], 3)} |"
+        )
+    with open(base + '.md', 'w') as f:
+        f.write("# Hyperparameter sweep\n\n")
+        f.write(f"{len(rows)} trials, ranked by best validation accuracy (completed trials first)\n\n")
+        f.write("\n".join(lines) + "\n")
+
+    print("\n" + "\n".join(lines))
+    print(f"\n✓ Saved: {base}.json / .csv / .md")
+
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def sweep(spec, args):
+    overrides = build_trials(spec)
+    if args.epochs is not None:
+        for o in overrides:
+            o.setdefault("EPOCHS", args.epochs)
+
+    print("\n" + "="*60)
+    print(f"🧪 HYPERPARAMETER SWEEP ({spec.get('method', 'grid')}, {len(overrides)} trials)")
+    print("="*60)
+    print(f"Parallel trials: {args.parallel} x {args.threads} threads"
+          f"{' (cores pinned)' if args.pin_cores else ''}")
+    print(f"Early kill: after {args.grace_epochs} epochs, {args.kill_margin:.3f} below the median "
+          f"of >= {args.min_peers} trials")
+
+    # Cache dibangun sekali di sini; trial hanya membaca shard (mmap)
+    if Config.USE_DATASET_CACHE:
+        print("\n📊 PREPARING SHARED DATASET CACHE...")
+        load_cache('train')
+        load_cache('test')
+    else:
+        print("⚠ Warning: USE_DATASET_CACHE is off, every trial decodes the dataset itself")
+
+    trials = []
+    for i, o in enumerate(overrides, 1):
+        name = trial_name(i, {k: v for k, v in o.items() if k in spec["params"]})
+        trial_dir = os.path.join(SWEEP_DIR, name)
+        os.makedirs(trial_dir, exist_ok=True)
+        for stale in ('progress.json', 'result.json', 'model.h5'):
+            if os.path.exists(os.path.join(trial_dir, stale)):
+                os.remove(os.path.join(trial_dir, stale))
+        write_json(os.path.join(trial_dir, 'config.json'), {"overrides": o})
+        trials.append({"name": name, "dir": trial_dir, "overrides": o,
+                       "status": "pending", "epochs": [], "result": {}})
+
+    print()
+    start = time.perf_counter()
+    try:
+        run_sweep(trials, args)
+    finally:
+        for trial in trials:
+            if trial["status"] == "running":
+                trial["process"].terminate()
+                finish_trial(trial, "failed")
+    print(f"\nSweep finished in {time.perf_counter() - start:.1f}s")
+
+    params = list(dict.fromkeys(name for o in overrides for name in o))
+    write_leaderboard(leaderboard_rows(trials), params, spec)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel grid/random search over train_model.Config")
+    parser.add_argument("--spec", help="JSON search spec (see module docstring)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=v1,v2",
+                        help="Values of one Config field (repeatable)")
+    parser.add_argument("--method", choices=["grid", "random"], help="Overrides the spec method")
+    parser.add_argument("--trials", type=int, help="Random search: number of trials")
+    parser.add_argument("--epochs", type=int, help="Config.EPOCHS for every trial (unless swept)")
+    parser.add_argument("--parallel", type=int, default=2, help="Concurrent trials")
+    parser.add_argument("--threads", type=int, default=None,
+                        help="CPU threads per trial (default: cpu_count / parallel)")
+    parser.add_argument("--pin-cores", action="store_true", help="Also pin every trial to its own cores")
+    parser.add_argument("--grace-epochs", type=int, default=3, help="Never kill before this epoch")
+    parser.add_argument("--kill-margin", type=float, default=0.02,
+                        help="Kill when this far below the median val_accuracy")
+    parser.add_argument("--min-peers", type=int, default=2, help="Trials needed at the same epoch to compare")
+    parser.add_argument("--poll", type=float, default=2.0, help="Seconds between progress checks")
+    parser.add_argument("--worker", metavar="TRIAL_DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--cores", type=int, nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_trial(args.worker, args.threads or 1, args.cores)
+        sys.exit(0)
+
+    spec = {"method": "grid", "params": {}}
+    if args.spec:
+        with open(args.spec) as f:
+            spec.update(json.load(f))
+    spec["params"].update(parse_params(args.param))
+    if args.method:
+        spec["method"] = args.method
+    if args.trials:
+        spec["trials"] = args.trials
+    if not spec["params"]:
+        parser.error("nothing to sweep: pass --spec and/or --param")
+
+    args.threads = args.threads or max(1, (os.cpu_count() or 1) // args.parallel)
+    sweep(spec, args)
@@ -17,7 +17,7 @@ import tensorflow as tf
 # Import from train_model
 import sys
 sys.path.append('.')
-from train_model import Config, load_dataset
+from train_model import Config, load_dataset, load_cache
 
 # ============================================================================
 # EVALUATION
@@ -43,7 +43,10 @@ def evaluate_model():
     
     # Load test data
     print("\nLoading test dataset...")
-    X_test, Y_test = load_dataset('test', verbose=False)
+    if Config.USE_DATASET_CACHE:
+        X_test, Y_test = load_cache('test').arrays()
+    else:
+        X_test, Y_test = load_dataset('test', verbose=False)
     print(f"✓ Test set: {len(X_test)} images")
     
     # Predictions
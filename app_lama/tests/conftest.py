@@ -0,0 +1,9 @@
+"""
+Shared test setup: the training scripts importable as modules
+"""
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
@@ -0,0 +1,60 @@
+"""
+In-graph affine augmentation vs ImageDataGenerator's apply_affine_transform
+"""
+import math
+
+import numpy as np
+import pytest
+import tensorflow as tf
+from tensorflow.keras.preprocessing.image import apply_affine_transform
+
+from augmentation import RandomAffine, affine_transforms
+
+HEIGHT, WIDTH = 40, 64  # tidak persegi: sumbu yang tertukar akan terlihat
+
+
+@pytest.fixture(scope="module")
+def image():
+    rng = np.random.default_rng(0)
+    coarse = rng.random((1, 8, 12, 3)).astype(np.float32)
+    return tf.image.resize(coarse, (HEIGHT, WIDTH)).numpy()[0]
+
+
+@pytest.mark.parametrize("theta, tx, ty, shear, zx, zy", [
+    (15, 0, 0, 0, 1, 1),
+    (0, 4, 0, 0, 1, 1),
+    (0, 0, 6, 0, 1, 1),
+    (0, 0, 0, 10, 1, 1),
+    (0, 0, 0, 0, 0.9, 1.1),
+    (-12, 3, -5, 8, 1.08, 0.93),
+])
+def test_matches_apply_affine_transform(image, theta, tx, ty, shear, zx, zy):
+    expected = apply_affine_transform(
+        image, theta=theta, tx=tx, ty=ty, shear=shear, zx=zx, zy=zy,
+        row_axis=0, col_axis=1, channel_axis=2, fill_mode='nearest', order=1
+    )
+
+    def param(value):
+        return tf.constant([float(value)])
+
+    degrees = math.pi / 180.0
+    transforms = affine_transforms(
+        param(theta * degrees), param(tx), param(ty), param(shear * degrees),
+        param(zx), param(zy), tf.constant(float(HEIGHT)), tf.constant(float(WIDTH))
+    )
+    output = tf.raw_ops.ImageProjectiveTransformV3(
+        images=image[None], transforms=transforms, output_shape=[HEIGHT, WIDTH],
+        fill_value=0.0, interpolation='BILINEAR', fill_mode='NEAREST'
+    )[0].numpy()
+
+    np.testing.assert_allclose(output, expected, atol=1e-5)
+
+
+def test_identity_when_not_training(image):
+    layer = RandomAffine()
+    np.testing.assert_array_equal(layer(image[None], training=False), image[None])
+
+
+def test_batch_shape_preserved(image):
+    batch = np.stack([image] * 4)
+    assert RandomAffine()(batch, training=True).shape == batch.shape
@@ -0,0 +1,158 @@
+"""
+Dataset cache: key follows file content, labels and preprocessing config;
+parallel decoding keeps the input order
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+import pytest
+
+import dataset_cache
+from dataset_cache import (
+    compute_cache_key, decode_files, decode_image, get_dataset_cache, list_source_files
+)
+
+NUM_CLASSES = 2
+
+
+def write_image(path, value):
+    cv2.imwrite(str(path), np.full((20, 20, 3), value, dtype=np.uint8))
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    root = tmp_path / "dataset"
+    for label, values in ((1, (10, 20)), (2, (30,))):
+        folder = root / "train" / str(label)
+        folder.mkdir(parents=True)
+        for i, value in enumerate(values):
+            write_image(folder / f"img{i}.png", value)
+    return root
+
+
+def key(dataset, cache_dir, **config):
+    files = list_source_files(dataset, "train", NUM_CLASSES)
+    return compute_cache_key(files, {"img_size": 16, **config}, cache_dir, dataset)
+
+
+def test_key_is_stable(dataset, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    assert key(dataset, cache_dir) == key(dataset, cache_dir)
+
+
+def test_key_changes_when_file_content_changes(dataset, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    before = key(dataset, cache_dir)
+
+    path = dataset / "train" / "1" / "img0.png"
+    stat = os.stat(path)
+    write_image(path, 200)
+    # Ukuran sama pun tetap terdeteksi karena mtime berubah
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert key(dataset, cache_dir) != before
+
+
+def test_key_ignores_touch_without_content_change(dataset, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    before = key(dataset, cache_dir)
+
+    path = dataset / "train" / "2" / "img0.png"
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert key(dataset, cache_dir) == before
+
+
+def test_key_changes_with_label_and_config(dataset, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    before = key(dataset, cache_dir)
+
+    assert key(dataset, cache_dir, img_size=32) != before
+
+    os.replace(dataset / "train" / "1" / "img1.png", dataset / "train" / "2" / "img1.png")
+    assert key(dataset, cache_dir) != before
+
+
+def test_key_follows_relative_path(dataset, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    before = key(dataset, cache_dir)
+
+    # Folder dataset dipindah: isi sama, key sama
+    moved = tmp_path / "pindah"
+    os.replace(dataset, moved)
+    assert key(moved, cache_dir) == before
+
+    # Rename di dalam dataset (label dan isi sama) tetap mengubah key
+    os.replace(moved / "train" / "1" / "img1.png", moved / "train" / "1" / "img9.png")
+    assert key(moved, cache_dir) != before
+
+
+def test_changed_file_rebuilds_cache(dataset, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = get_dataset_cache("train", dataset, cache_dir, 16, NUM_CLASSES, workers=1)
+    assert len(first) == 3 and (first.image(0) == 10).all()
+    assert get_dataset_cache("train", dataset, cache_dir, 16, NUM_CLASSES, workers=1).directory == first.directory
+
+    write_image(dataset / "train" / "1" / "img0.png", 200)
+    os.utime(dataset / "train" / "1" / "img0.png", ns=(0, 1))
+    second = get_dataset_cache("train", dataset, cache_dir, 16, NUM_CLASSES, workers=1)
+
+    assert second.directory != first.directory
+    assert not first.directory.exists()
+    assert (second.image(0) == 200).all()
+
+
+@pytest.fixture
+def many_files(tmp_path):
+    paths = []
+    for i in range(7):
+        path = tmp_path / f"img{i}.png"
+        write_image(path, 20 * i)
+        paths.append(str(path))
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"bukan png")
+    paths.insert(3, str(broken))
+    return paths
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(2, 1), (3, 2)])
+def test_parallel_decode_keeps_input_order(many_files, workers, chunk_size):
+    serial = list(decode_files(many_files, 8, workers=1))
+    parallel = list(decode_files(many_files, 8, workers=workers, chunk_size=chunk_size))
+
+    assert serial[3] is None and parallel[3] is None
+    for expected, got, path in zip(serial, parallel, many_files):
+        if expected is not None:
+            np.testing.assert_array_equal(got[0], expected[0])
+            assert got[1:] == expected[1:]
+            np.testing.assert_array_equal(got[0], decode_image(path, 8)[0])
+
+
+def test_workers_are_spawned_not_forked(many_files, monkeypatch):
+    contexts = []
+
+    class RecordingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            contexts.append(kwargs.get("mp_context"))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(dataset_cache, "ProcessPoolExecutor", RecordingPool)
+    decoded = list(decode_files(many_files, 8, workers=2))
+
+    assert len(decoded) == len(many_files)
+    # Proses training sudah memuat TensorFlow: fork tidak aman
+    assert [c.get_start_method() for c in contexts] == ["spawn"]
+
+
+def test_cache_identical_for_any_worker_count(dataset, tmp_path):
+    serial = get_dataset_cache("train", dataset, tmp_path / "a", 16, NUM_CLASSES, workers=1)
+    parallel = get_dataset_cache("train", dataset, tmp_path / "b", 16, NUM_CLASSES, workers=2, chunk_size=1)
+
+    np.testing.assert_array_equal(parallel.labels, serial.labels)
+    np.testing.assert_array_equal(np.concatenate(parallel.images), np.concatenate(serial.images))
@@ -0,0 +1,78 @@
+"""
+Knowledge distillation: softened targets and the Distiller loss / update
+"""
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from distill_model import Distiller, soften
+
+NUM_CLASSES = 4
+
+
+def tiny_model(seed):
+    keras.utils.set_random_seed(seed)
+    return keras.Sequential([
+        keras.Input((3,)),
+        keras.layers.Dense(NUM_CLASSES, activation="softmax"),
+    ])
+
+
+def batch():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(8, 3)).astype("float32"), rng.integers(0, NUM_CLASSES, 8).astype("int32")
+
+
+def test_soften_flattens_but_keeps_ranking():
+    probs = tf.constant([[0.7, 0.2, 0.1]])
+    assert np.allclose(soften(probs, 1.0), probs, atol=1e-5)
+
+    soft = soften(probs, 4.0).numpy()[0]
+    assert np.isclose(soft.sum(), 1.0)
+    assert soft[0] > soft[1] > soft[2]
+    assert soft.max() - soft.min() < 0.7 - 0.1
+
+
+def test_loss_combines_hard_and_soft_terms():
+    x, y = batch()
+    student, teacher = tiny_model(1), tiny_model(2)
+    distiller = Distiller(student, teacher, temperature=3.0, alpha=0.25)
+    s, t = student(x), teacher(x)
+
+    hard = keras.losses.SparseCategoricalCrossentropy()(y, s)
+    soft = keras.losses.KLDivergence()(soften(t, 3.0), soften(s, 3.0))
+    expected = 0.25 * hard + 0.75 * 9.0 * soft
+    assert np.isclose(distiller._loss(y, s, t), expected, rtol=1e-5)
+
+
+def test_identical_teacher_leaves_only_hard_loss():
+    x, y = batch()
+    student = tiny_model(1)
+    distiller = Distiller(student, tiny_model(1), alpha=0.5)
+    s = student(x)
+
+    hard = keras.losses.SparseCategoricalCrossentropy()(y, s)
+    assert np.isclose(distiller._loss(y, s, s), 0.5 * hard, atol=1e-5)
+
+
+def test_train_step_updates_student_only():
+    x, y = batch()
+    student, teacher = tiny_model(1), tiny_model(2)
+    distiller = Distiller(student, teacher)
+    distiller.compile(optimizer=keras.optimizers.SGD(0.1))
+    student_before = [w.copy() for w in student.get_weights()]
+    teacher_before = [w.copy() for w in teacher.get_weights()]
+
+    logs = distiller.fit(x, y, batch_size=8, epochs=1, verbose=0).history
+    assert set(logs) == {"loss", "accuracy"}
+
+    assert any(not np.allclose(a, b) for a, b in zip(student.get_weights(), student_before))
+    for a, b in zip(teacher.get_weights(), teacher_before):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_distiller_predicts_with_student():
+    x, _ = batch()
+    student = tiny_model(1)
+    distiller = Distiller(student, tiny_model(2))
+    np.testing.assert_allclose(distiller(x), student(x), rtol=1e-6)
@@ -0,0 +1,70 @@
+"""
+Channel pruning surgery: the pruned model computes what the original computes
+"""
+import numpy as np
+import pytest
+from tensorflow.keras.layers import BatchNormalization
+
+from prune_model import (
+    channel_importance, emotion_cnn_flops, find_keep_ratio, keep_counts, model_spec, prune_model
+)
+from train_model import build_serving_model
+
+FILTERS, DENSE_UNITS = [8, 8, 4], 16
+
+
+@pytest.fixture(scope="module")
+def model():
+    model = build_serving_model('emotion_cnn', filters=FILTERS, dense_units=DENSE_UNITS)
+    # Statistik BatchNorm acak, supaya channel yang tertukar pasti terlihat
+    rng = np.random.default_rng(0)
+    for layer in model.layers:
+        if isinstance(layer, BatchNormalization):
+            gamma, beta, mean, var = layer.get_weights()
+            layer.set_weights([
+                rng.uniform(0.5, 1.5, gamma.shape), rng.normal(0, 0.1, beta.shape),
+                rng.normal(0, 0.1, mean.shape), rng.uniform(0.5, 1.5, var.shape)
+            ])
+    return model
+
+
+@pytest.fixture(scope="module")
+def images():
+    return np.random.default_rng(1).random((4, 100, 100, 3)).astype(np.float32)
+
+
+@pytest.mark.parametrize("method", ["l1", "bn", "l1_bn"])
+def test_keeping_every_channel_is_identity(model, images, method):
+    pruned = prune_model(model, FILTERS, DENSE_UNITS, method)
+    assert model_spec(pruned) == (FILTERS, DENSE_UNITS)
+    np.testing.assert_allclose(pruned.predict(images, verbose=0), model.predict(images, verbose=0), atol=1e-5)
+
+
+def test_pruned_model_equals_original_with_channels_masked(model, images):
+    filters, dense_units = [6, 5, 3], 10
+    pruned = prune_model(model, filters, dense_units, "l1")
+
+    # Channel yang dibuang dibuat nol lewat BatchNorm (gamma = beta = 0):
+    # ReLU(0) = 0, jadi layer berikutnya tidak menerima apa pun darinya
+    scores = channel_importance(model, "l1")
+    masked = build_serving_model('emotion_cnn', filters=FILTERS, dense_units=DENSE_UNITS)
+    masked.set_weights(model.get_weights())
+    bns = [layer for layer in masked.layers if isinstance(layer, BatchNormalization)]
+    for bn, score, k in zip(bns, scores, filters + [dense_units]):
+        dropped = np.argsort(score)[::-1][k:]
+        gamma, beta, mean, var = bn.get_weights()
+        gamma[dropped] = 0
+        beta[dropped] = 0
+        bn.set_weights([gamma, beta, mean, var])
+
+    assert model_spec(pruned) == (filters, dense_units)
+    np.testing.assert_allclose(pruned.predict(images, verbose=0), masked.predict(images, verbose=0), atol=1e-5)
+
+
+def test_keep_ratio_fits_flop_budget():
+    filters, dense_units = [64, 64, 32], 128
+    budget = 0.3 * emotion_cnn_flops(filters, dense_units)
+    ratio = find_keep_ratio(filters, dense_units, budget)
+
+    assert emotion_cnn_flops(*keep_counts(filters, dense_units, ratio)) <= budget
+    assert emotion_cnn_flops(*keep_counts(filters, dense_units, ratio + 0.05)) > budget
@@ -0,0 +1,66 @@
+"""
+Architecture sweep: analytic FLOPs of the variant family and the Pareto marking
+"""
+import pytest
+from tensorflow.keras.layers import Conv2D, Dense, SeparableConv2D
+
+from sweep_architectures import mark_pareto, variant_flops, variant_grid, variant_name
+from train_model import build_serving_model
+
+
+def model_flops(model):
+    """2 x multiply-adds counted from the built layers' kernels and output sizes"""
+    macs = 0
+    for layer in model.layers:
+        if isinstance(layer, SeparableConv2D):
+            h, w = layer.output.shape[1:3]
+            depthwise, pointwise = layer.depthwise_kernel, layer.pointwise_kernel
+            macs += h * w * (depthwise.shape.num_elements() + pointwise.shape.num_elements())
+        elif isinstance(layer, Conv2D):
+            h, w = layer.output.shape[1:3]
+            macs += h * w * layer.kernel.shape.num_elements()
+        elif isinstance(layer, Dense):
+            macs += layer.kernel.shape.num_elements()
+    return 2 * macs
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"input_size": 100, "width": 1.0, "separable": False, "head": "flatten"},
+    {"input_size": 64, "width": 0.5, "separable": True, "head": "gap"},
+    {"input_size": 80, "width": 0.5, "separable": False, "head": "gap"},
+])
+def test_variant_flops_matches_built_model(kwargs):
+    model = build_serving_model('cnn_variant', **kwargs)
+    assert variant_flops(**kwargs) == model_flops(model)
+
+
+def test_cheaper_options_cost_fewer_flops():
+    base = variant_flops(100)
+    assert variant_flops(100, separable=True) < base
+    assert variant_flops(100, head="gap") < base
+    assert variant_flops(100, width=0.5) < base
+    assert variant_flops(64) < variant_flops(80) < base
+
+
+def test_variant_grid_and_names_are_unique():
+    grid = variant_grid([64, 100], [0.5, 1.0], [False, True], ["flatten", "gap"])
+    assert len(grid) == 16
+    assert len({variant_name(kwargs) for kwargs in grid}) == 16
+    assert variant_name(grid[0]) == "s64_w0.5_conv_flatten"
+
+
+def row(name, latency_ms, size_mb, accuracy):
+    return {"name": name, "latency_ms": latency_ms, "size_mb": size_mb, "accuracy": accuracy}
+
+
+def test_mark_pareto():
+    rows = mark_pareto([
+        row("cepat", 1.0, 1.0, 0.60),
+        row("akurat", 5.0, 4.0, 0.80),
+        row("kalah", 5.0, 4.0, 0.70),      # sama lambat dan besar, kurang akurat
+        row("kembar", 1.0, 1.0, 0.60),     # identik dengan "cepat": tidak saling menyingkirkan
+        row("kecil", 3.0, 0.5, 0.55),
+    ])
+    assert {r["name"]: r["pareto"] for r in rows} == {
+        "cepat": True, "akurat": True, "kalah": False, "kembar": True, "kecil": True,
+    }
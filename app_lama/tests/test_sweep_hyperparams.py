@@ -0,0 +1,85 @@
+"""
+Hyperparameter sweep: CLI params, trial generation and the median stopping rule
+"""
+import pytest
+
+from sweep_hyperparams import build_trials, parse_params, should_kill, trial_name
+
+
+def test_parse_params():
+    params = parse_params(["LEARNING_RATE=0.001, 0.0003", "BATCH_SIZE=32,64", "DISTILL_ALPHA=0.1"])
+    assert params == {"LEARNING_RATE": [0.001, 0.0003], "BATCH_SIZE": [32, 64], "DISTILL_ALPHA": [0.1]}
+
+    assert parse_params(["STUDENT_ARCHITECTURE=student_cnn,true"]) == {
+        "STUDENT_ARCHITECTURE": ["student_cnn", True]
+    }
+    with pytest.raises(ValueError):
+        parse_params(["LEARNING_RATE"])
+
+
+def test_grid_trials():
+    trials = build_trials({"params": {"LEARNING_RATE": [0.001, 0.0003], "BATCH_SIZE": {"choice": [32, 64]}}})
+    assert trials == [
+        {"LEARNING_RATE": 0.001, "BATCH_SIZE": 32},
+        {"LEARNING_RATE": 0.001, "BATCH_SIZE": 64},
+        {"LEARNING_RATE": 0.0003, "BATCH_SIZE": 32},
+        {"LEARNING_RATE": 0.0003, "BATCH_SIZE": 64},
+    ]
+    assert trial_name(3, trials[3]) == "t003_learning_rate0.0003_batch_size64"
+
+
+def test_random_trials_are_seeded_and_in_range():
+    spec = {
+        "method": "random", "trials": 20, "seed": 7,
+        "params": {
+            "LEARNING_RATE": {"log_uniform": [1e-4, 1e-2]},
+            "BATCH_SIZE": {"choice": [16, 32]},
+            "PATIENCE_LR_REDUCE": {"int": [2, 4]},
+            "DISTILL_ALPHA": {"uniform": [0.0, 0.5]},
+        },
+    }
+    trials = build_trials(spec)
+    assert len(trials) == 20
+    assert build_trials(spec) == trials
+    for t in trials:
+        assert 1e-4 <= t["LEARNING_RATE"] <= 1e-2
+        assert t["BATCH_SIZE"] in (16, 32)
+        assert t["PATIENCE_LR_REDUCE"] in (2, 3, 4)
+        assert 0.0 <= t["DISTILL_ALPHA"] <= 0.5
+
+
+@pytest.mark.parametrize("spec", [
+    {"params": {"learning_rate": [0.1]}},                  # bukan field Config
+    {"params": {"IMG_SIZE": [64, 100]}},                   # mengubah cache bersama
+    {"params": {"LEARNING_RATE": {"uniform": [0, 1]}}},    # grid butuh daftar nilai
+    {"method": "bayes", "params": {"LEARNING_RATE": [0.1]}},
+    {"method": "random", "params": {"LEARNING_RATE": {"normal": [0, 1]}}},
+])
+def test_invalid_specs_rejected(spec):
+    with pytest.raises(ValueError):
+        build_trials(spec)
+
+
+def trial(*val_accuracy):
+    return {"epochs": [{"val_accuracy": v} for v in val_accuracy]}
+
+
+def test_should_kill_below_median_after_grace():
+    loser = trial(0.30, 0.32, 0.33)
+    peers = [trial(0.50, 0.60, 0.62), trial(0.45, 0.55, 0.58), trial(0.40, 0.52)]
+    trials = [loser, *peers]
+
+    assert should_kill(loser, trials, grace_epochs=2, margin=0.01, min_peers=2)
+    # Masih dalam masa grace
+    assert not should_kill(loser, trials, grace_epochs=4, margin=0.01, min_peers=2)
+    # Hanya 2 peer yang sudah sampai epoch 3
+    assert not should_kill(loser, trials, grace_epochs=2, margin=0.01, min_peers=3)
+    # Margin lebar memberi kelonggaran
+    assert not should_kill(loser, trials, grace_epochs=2, margin=0.5, min_peers=2)
+
+
+def test_should_kill_uses_best_epoch_so_far():
+    # Sempat bagus di epoch 1, jadi tidak dihentikan walau epoch terakhir turun
+    dipped = trial(0.60, 0.30)
+    peers = [trial(0.50, 0.55), trial(0.52, 0.56)]
+    assert not should_kill(dipped, [dipped, *peers], grace_epochs=2, margin=0.0, min_peers=2)
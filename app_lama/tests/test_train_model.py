@@ -0,0 +1,107 @@
+"""
+Streaming input pipeline: file listing, tf.data batches and label alignment
+"""
+import cv2
+import numpy as np
+import pytest
+
+from train_model import Config, list_dataset_files, load_datasets, make_dataset, predict_dataset
+
+IMG_SIZE = 16
+CLASS_SIZES = {1: 5, 2: 3, 3: 4}  # folder -> jumlah gambar
+
+
+def class_value(label):
+    """Pixel value of every image of a class, so labels can be checked from pixels"""
+    return 40 * (label + 1)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    root = tmp_path / "DATASET"
+    for folder, count in CLASS_SIZES.items():
+        path = root / "train" / str(folder)
+        path.mkdir(parents=True)
+        for i in range(count):
+            image = np.full((24, 20, 3), class_value(folder - 1), dtype=np.uint8)
+            cv2.imwrite(str(path / f"img{i}.png"), image)
+        (path / "notes.txt").write_text("bukan gambar")
+    monkeypatch.setattr(Config, "DATASET_ROOT", str(root))
+    monkeypatch.setattr(Config, "IMG_SIZE", IMG_SIZE)
+    monkeypatch.setattr(Config, "BATCH_SIZE", 4)
+    return root
+
+
+def labels_from_pixels(images):
+    return np.round(images.reshape(len(images), -1).mean(axis=1) * 255 / 40).astype(int) - 1
+
+
+class PixelModel:
+    """Predicts the class encoded in the pixel values"""
+
+    def predict_on_batch(self, x):
+        return np.eye(Config.NUM_CLASSES)[labels_from_pixels(np.asarray(x))]
+
+
+def test_list_dataset_files(dataset):
+    paths, labels = list_dataset_files('train', verbose=False)
+
+    assert len(paths) == sum(CLASS_SIZES.values())
+    assert all(p.endswith(".png") for p in paths)
+    # Label = nama folder - 1, tetap sejajar dengan path setelah diacak
+    assert [int(p.split("/")[-2]) - 1 for p in paths] == labels.tolist()
+    assert labels.dtype == np.int32
+
+
+def test_eval_dataset_keeps_order_and_labels(dataset):
+    paths, labels = list_dataset_files('train', verbose=False)
+    batches = list(make_dataset(paths, labels))
+
+    assert [len(y) for _, y in batches] == [4, 4, 4]
+    x = np.concatenate([x.numpy() for x, _ in batches])
+    y = np.concatenate([y.numpy() for _, y in batches])
+    assert x.shape == (12, IMG_SIZE, IMG_SIZE, 3)
+    assert x.min() >= 0.0 and x.max() <= 1.0
+    assert y.tolist() == labels.tolist()
+    assert labels_from_pixels(x).tolist() == y.tolist()
+
+
+def test_training_dataset_reshuffles_same_files(dataset):
+    paths, labels = list_dataset_files('train', verbose=False)
+    ds = make_dataset(paths, labels, training=True)
+
+    epochs = [np.concatenate([y.numpy() for _, y in ds]) for _ in range(3)]
+    for y in epochs:
+        assert sorted(y.tolist()) == sorted(labels.tolist())
+    assert any(e.tolist() != epochs[0].tolist() for e in epochs[1:])
+
+
+def test_unreadable_file_skipped_and_labels_stay_aligned(dataset):
+    broken = dataset / "train" / "2" / "img0.png"
+    broken.write_bytes(b"bukan png")
+    paths, labels = list_dataset_files('train', verbose=False)
+
+    y_true, y_pred, x_sample = predict_dataset(PixelModel(), make_dataset(paths, labels))
+
+    assert len(y_true) == len(paths) - 1
+    assert y_pred.tolist() == y_true.tolist()
+    assert x_sample.shape[1:] == (IMG_SIZE, IMG_SIZE, 3)
+
+
+def test_validation_split_is_stratified_and_fixed(dataset, monkeypatch):
+    # Split test memakai folder yang sama dengan train
+    (dataset / "test").symlink_to(dataset / "train")
+    monkeypatch.setattr(Config, "USE_DATASET_CACHE", False)
+    monkeypatch.setattr(Config, "VALIDATION_SPLIT", 0.5)
+
+    def split():
+        _, val_ds, _ = load_datasets()
+        return np.concatenate([y.numpy() for _, y in val_ds]).tolist()
+
+    val_labels = split()
+    # Tiap kelas setengahnya di validation (5 -> 2/3, 3 -> 1/2, 4 -> 2)
+    assert len(val_labels) == 6
+    assert set(val_labels) == {0, 1, 2}
+    assert val_labels.count(2) == 2
+    # random_state tetap: urutan validation sama di setiap pemanggilan
+    assert split() == val_labels
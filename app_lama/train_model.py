@@ -4,6 +4,7 @@ Custom CNN Architecture with Complete Visualization
 """
 
 import os
+import sys
 import json
 import numpy as np
 import cv2
@@ -21,7 +22,6 @@ from tensorflow.keras.layers import (
 from tensorflow.keras.callbacks import (
     ModelCheckpoint, EarlyStopping, ReduceLROnPlateau, TensorBoard
 )
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.utils import plot_model
 
 # Visualization & Metrics
@@ -33,6 +33,9 @@ from sklearn.metrics import (
 )
 from sklearn.model_selection import train_test_split
 
+from augmentation import build_augmentation
+from dataset_cache import decode_files, get_dataset_cache, list_source_files
+
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -47,6 +50,21 @@ class Config:
     MODEL_DIR = "model"
     RESULTS_DIR = "results"
     
+    # Preprocessed uint8 shards (see dataset_cache.py)
+    USE_DATASET_CACHE = True
+    CACHE_DIR = "data/cache"
+    CACHE_SHARD_SIZE = 4096
+    
+    # Parallel decoding (load_dataset / cache build)
+    LOAD_WORKERS = None  # None = os.cpu_count()
+    LOAD_CHUNK_SIZE = 64
+    
+    # Serving face crop (MediaPipe + 20% margin) applied to the dataset,
+    # so training sees the same crops as the API. Cached with the shards;
+    # the on-the-fly tf.data path (USE_DATASET_CACHE = False) cannot crop.
+    CROP_FACES = True
+    SERVING_DIR = "../backend"
+    
     # Model params
     IMG_SIZE = 100
     CHANNELS = 3
@@ -57,12 +75,26 @@ class Config:
     EPOCHS = 50
     LEARNING_RATE = 0.001
     VALIDATION_SPLIT = 0.25
+    CONV_DROPOUT = 0.25  # after every conv block
+    DENSE_DROPOUT = 0.5  # before the softmax layer
     
     # Callbacks params
     PATIENCE_EARLY_STOP = 20
     PATIENCE_LR_REDUCE = 5
     MIN_DELTA = 0.001
     
+    # Knowledge distillation (distill_model.py)
+    STUDENT_ARCHITECTURE = "student_cnn"  # name in backend ml/model_architecture.py
+    DISTILL_TEMPERATURE = 4.0
+    DISTILL_ALPHA = 0.1  # weight of the hard-label loss (rest: teacher soft targets)
+    
+    # Structured channel pruning (prune_model.py)
+    PRUNE_TARGET_FLOPS = 0.5  # fraction of the original FLOPs to keep
+    PRUNE_TARGET_LATENCY_MS = None  # or a CPU latency budget (batch of 1) instead
+    PRUNE_IMPORTANCE = "l1_bn"  # l1 | bn | l1_bn
+    PRUNE_STEPS = 3  # prune gradually, fine-tuning after every step
+    PRUNE_FINETUNE_EPOCHS = 5
+    
     # Emotion labels
     EMOTIONS = {
         0: 'Surprise',
@@ -74,6 +106,9 @@ class Config:
         6: 'Neutral'
     }
 
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp']
+AUTOTUNE = tf.data.AUTOTUNE
+
 # Create directories
 os.makedirs(Config.MODEL_DIR, exist_ok=True)
 os.makedirs(Config.RESULTS_DIR, exist_ok=True)
@@ -94,19 +129,70 @@ def load_dataset(split='train', verbose=True):
         X: Images array
         Y: Labels array
     """
+    class_counts = {i: 0 for i in range(Config.NUM_CLASSES)}
+    
+    print(f"\n{'='*60}")
+    print(f"Loading {split.upper()} Dataset")
+    print(f"{'='*60}")
+    
+    # Decode images from each class folder across a process pool
+    files = list_source_files(Config.DATASET_ROOT, split, Config.NUM_CLASSES)
+    X = np.empty((len(files), Config.IMG_SIZE, Config.IMG_SIZE, Config.CHANNELS), dtype=np.uint8)
+    Y = np.empty(len(files), dtype=np.int64)
+    count = 0
+    
+    results = decode_files(
+        [path for path, _ in files], Config.IMG_SIZE,
+        workers=Config.LOAD_WORKERS, chunk_size=Config.LOAD_CHUNK_SIZE,
+        serving_dir=serving_dir()
+    )
+    for result, (path, label) in zip(results, files):
+        if result is not None:
+            X[count] = result[0]
+            Y[count] = label
+            class_counts[label] += 1
+            count += 1
+    X, Y = X[:count], Y[:count]
+    
+    # Shuffle data (deterministic under np.random.seed)
+    order = np.random.permutation(count)
+    X, Y = X[order], Y[order]
+    
+    # Normalize
+    X = X.astype('float32') / 255.0
+    
+    if verbose:
+        print(f"\nDataset Statistics:")
+        print(f"  Total images: {len(X)}")
+        print(f"  Image shape: {X.shape[1:]}")
+        print(f"\nClass Distribution:")
+        for label, count in class_counts.items():
+            emotion = Config.EMOTIONS[label]
+            print(f"  {emotion:12s} (class {label}): {count:5d} images")
+        print(f"{'='*60}\n")
+    
+    return X, Y
+
+def list_dataset_files(split='train', verbose=True):
+    """
+    List image files and labels without decoding anything
+    
+    Args:
+        split: 'train' or 'test'
+        verbose: Print statistics
+    
+    Returns:
+        paths: Image file paths (shuffled)
+        labels: Labels array (int32)
+    """
     data_path = Path(Config.DATASET_ROOT) / split
     
     if not data_path.exists():
         raise ValueError(f"Dataset path not found: {data_path}")
     
-    data = []
+    paths, labels = [], []
     class_counts = {i: 0 for i in range(Config.NUM_CLASSES)}
     
-    print(f"\n{'='*60}")
-    print(f"Loading {split.upper()} Dataset")
-    print(f"{'='*60}")
-    
-    # Load images from each class folder
     for class_idx in range(1, Config.NUM_CLASSES + 1):
         class_path = data_path / str(class_idx)
         
@@ -116,53 +202,204 @@ def load_dataset(split='train', verbose=True):
         
         label = class_idx - 1  # Convert to 0-indexed
         
-        for img_file in class_path.glob('*'):
-            if img_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.bmp']:
-                try:
-                    # Read and preprocess image
-                    img = cv2.imread(str(img_file))
-                    if img is not None:
-                        img = cv2.resize(img, (Config.IMG_SIZE, Config.IMG_SIZE))
-                        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                        data.append([img, label])
-                        class_counts[label] += 1
-                except Exception as e:
-                    print(f"Error loading {img_file}: {e}")
-    
-    # Shuffle data
-    np.random.shuffle(data)
-    
-    # Separate features and labels
-    X = np.array([item[0] for item in data])
-    Y = np.array([item[1] for item in data])
+        for img_file in sorted(class_path.glob('*')):
+            if img_file.suffix.lower() in IMAGE_EXTENSIONS:
+                paths.append(str(img_file))
+                labels.append(label)
+                class_counts[label] += 1
     
-    # Normalize
-    X = X.astype('float32') / 255.0
+    # Shuffle file list (cheap: strings only)
+    order = np.random.permutation(len(paths))
+    paths = [paths[i] for i in order]
+    labels = np.array(labels, dtype=np.int32)[order]
     
     if verbose:
-        print(f"\nDataset Statistics:")
-        print(f"  Total images: {len(X)}")
-        print(f"  Image shape: {X.shape[1:]}")
+        print(f"\n{'='*60}")
+        print(f"{split.upper()} Dataset (streamed)")
+        print(f"{'='*60}")
+        print(f"  Total files: {len(paths)}")
         print(f"\nClass Distribution:")
         for label, count in class_counts.items():
             emotion = Config.EMOTIONS[label]
             print(f"  {emotion:12s} (class {label}): {count:5d} images")
         print(f"{'='*60}\n")
     
-    return X, Y
+    return paths, labels
+
+def decode_image(path, label):
+    """Read + decode + resize + normalize one image (runs inside tf.data)"""
+    raw = tf.io.read_file(path)
+    img = tf.io.decode_image(raw, channels=Config.CHANNELS, expand_animations=False)
+    img = tf.image.resize(img, (Config.IMG_SIZE, Config.IMG_SIZE))
+    img = tf.cast(img, tf.float32) / 255.0
+    img.set_shape((Config.IMG_SIZE, Config.IMG_SIZE, Config.CHANNELS))
+    return img, label
+
+def make_dataset(paths, labels, training=False, augmentation=None):
+    """
+    Streaming tf.data pipeline: file list → parallel decode → batches
+    
+    Only the file names are held in memory; images are decoded on the fly
+    with AUTOTUNE parallelism and prefetched while the model trains.
+    Unreadable files are skipped (logged by tf.data).
+    
+    Args:
+        paths: Image file paths
+        labels: Labels array
+        training: Shuffle every epoch + apply augmentation
+        augmentation: In-graph augmentation layer (training only)
+    """
+    ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+    
+    if training:
+        # Shuffle nama file, bukan gambar: buffer tetap kecil
+        ds = ds.shuffle(len(paths), reshuffle_each_iteration=True)
+    
+    ds = ds.map(decode_image, num_parallel_calls=AUTOTUNE, deterministic=not training)
+    ds = ds.ignore_errors(log_warning=True)
+    
+    return _batch_pipeline(ds, training, augmentation)
+
+def serving_dir():
+    """Backend directory for the serving face crop (None when cropping is off)"""
+    return Config.SERVING_DIR if Config.CROP_FACES else None
+
+def load_cache(split):
+    """Open (building if needed) the preprocessed shard cache of a split"""
+    return get_dataset_cache(
+        split, Config.DATASET_ROOT, Config.CACHE_DIR, Config.IMG_SIZE,
+        Config.NUM_CLASSES, Config.CACHE_SHARD_SIZE,
+        workers=Config.LOAD_WORKERS, chunk_size=Config.LOAD_CHUNK_SIZE,
+        serving_dir=serving_dir()
+    )
+
+def make_cached_dataset(cache, indices, training=False, augmentation=None):
+    """
+    tf.data pipeline over the memory-mapped uint8 shards (no decoding)
+    
+    Args:
+        cache: DatasetCache
+        indices: Which images of the cache to use
+        training: Shuffle every epoch + apply augmentation
+        augmentation: In-graph augmentation layer (training only)
+    """
+    shape = (Config.IMG_SIZE, Config.IMG_SIZE, Config.CHANNELS)
+    
+    def generator():
+        order = np.random.permutation(indices) if training else indices
+        for i in order:
+            yield cache.image(i), cache.labels[i]
+    
+    ds = tf.data.Dataset.from_generator(
+        generator,
+        output_signature=(
+            tf.TensorSpec(shape, tf.uint8),
+            tf.TensorSpec((), tf.int32)
+        )
+    )
+    ds = ds.map(
+        lambda img, label: (tf.cast(img, tf.float32) / 255.0, label),
+        num_parallel_calls=AUTOTUNE
+    )
+    return _batch_pipeline(ds, training, augmentation)
+
+def _batch_pipeline(ds, training, augmentation):
+    """Batching + augmentation (training) + prefetch, shared by both pipelines"""
+    ds = ds.batch(Config.BATCH_SIZE)
+    
+    if training and augmentation is not None:
+        # Augmentasi per batch di dalam graph, paralel dengan training
+        ds = ds.map(
+            lambda img, label: (augmentation(img, training=True), label),
+            num_parallel_calls=AUTOTUNE, deterministic=False
+        )
+    
+    return ds.prefetch(AUTOTUNE)
+
+def predict_dataset(model, ds, sample_batches=2):
+    """
+    Predict a (non-shuffled) dataset batch by batch
+    
+    Returns:
+        y_true, y_pred: Label arrays (aligned even if files were skipped)
+        x_sample: Images of the first `sample_batches` batches for plots
+    """
+    y_true, y_pred, x_sample = [], [], []
+    for i, (x, y) in enumerate(ds):
+        y_true.append(y.numpy())
+        y_pred.append(np.argmax(model.predict_on_batch(x), axis=1))
+        if i < sample_batches:
+            x_sample.append(x.numpy())
+    return np.concatenate(y_true), np.concatenate(y_pred), np.concatenate(x_sample)
 
 def create_data_augmentation():
-    """Create ImageDataGenerator for data augmentation"""
-    return ImageDataGenerator(
-        rotation_range=15,
-        width_shift_range=0.1,
-        height_shift_range=0.1,
+    """Create batched in-graph augmentation (rotation, shift, flip, zoom, shear)"""
+    return build_augmentation(
+        rotation=15,
+        shift=0.1,
+        zoom=0.1,
+        shear=0.1,
         horizontal_flip=True,
-        zoom_range=0.1,
-        shear_range=0.1,
         fill_mode='nearest'
     )
 
+def load_datasets():
+    """
+    Train / validation / test pipelines (mmap shard cache, or files on the fly)
+    
+    Validation is a stratified Config.VALIDATION_SPLIT of train (fixed seed),
+    so every training script sees the same split.
+    
+    Returns:
+        train_ds (shuffled + augmented), val_ds, test_ds
+    """
+    datagen = create_data_augmentation()
+    
+    if Config.USE_DATASET_CACHE:
+        train_cache = load_cache('train')
+        test_cache = load_cache('test')
+        
+        # Split train into train + validation (by index)
+        train_idx, val_idx = train_test_split(
+            np.arange(len(train_cache)),
+            test_size=Config.VALIDATION_SPLIT,
+            stratify=train_cache.labels,
+            random_state=42
+        )
+        # Urutan test diacak sekali agar sample plot berisi banyak kelas
+        test_idx = np.random.permutation(len(test_cache))
+        
+        train_ds = make_cached_dataset(train_cache, train_idx, training=True, augmentation=datagen)
+        val_ds = make_cached_dataset(train_cache, val_idx)
+        test_ds = make_cached_dataset(test_cache, test_idx)
+        n_train, n_val, n_test = len(train_idx), len(val_idx), len(test_idx)
+    else:
+        if Config.CROP_FACES:
+            print("⚠ Warning: CROP_FACES needs USE_DATASET_CACHE, training on uncropped images")
+        train_paths_full, Y_train_full = list_dataset_files('train')
+        test_paths, Y_test = list_dataset_files('test')
+        
+        # Split train into train + validation
+        train_paths, val_paths, Y_train, Y_val = train_test_split(
+            train_paths_full, Y_train_full, 
+            test_size=Config.VALIDATION_SPLIT, 
+            stratify=Y_train_full,
+            random_state=42
+        )
+        
+        train_ds = make_dataset(train_paths, Y_train, training=True, augmentation=datagen)
+        val_ds = make_dataset(val_paths, Y_val)
+        test_ds = make_dataset(test_paths, Y_test)
+        n_train, n_val, n_test = len(train_paths), len(val_paths), len(test_paths)
+    
+    print(f"\nFinal Split:")
+    print(f"  Training:   {n_train} images")
+    print(f"  Validation: {n_val} images")
+    print(f"  Test:       {n_test} images")
+    
+    return train_ds, val_ds, test_ds
+
+
 # ============================================================================
 # MODEL ARCHITECTURE
 # ============================================================================
@@ -185,32 +422,45 @@ def build_custom_cnn():
         BatchNormalization(),
         Activation('relu'),
         MaxPooling2D(pool_size=(2, 2)),
-        Dropout(0.25),
+        Dropout(Config.CONV_DROPOUT),
         
         # Block 2
         Conv2D(64, (3, 3), padding='same'),
         BatchNormalization(),
         Activation('relu'),
         MaxPooling2D(pool_size=(2, 2)),
-        Dropout(0.25),
+        Dropout(Config.CONV_DROPOUT),
         
         # Block 3
         Conv2D(32, (3, 3), padding='same'),
         BatchNormalization(),
         Activation('relu'),
         MaxPooling2D(pool_size=(2, 2)),
-        Dropout(0.25),
+        Dropout(Config.CONV_DROPOUT),
         
         # Classifier
         Flatten(),
         Dense(128, activation='relu'),
         BatchNormalization(),
-        Dropout(0.5),
+        Dropout(Config.DENSE_DROPOUT),
         Dense(Config.NUM_CLASSES, activation='softmax')
     ])
     
     return model
 
+def build_serving_model(name, **kwargs):
+    """
+    Build an architecture registered in the backend (ml/model_architecture.py)
+    
+    Same code EmotionModel uses to rebuild the model before loading weights,
+    so layer names and shapes always match the API.
+    """
+    backend_dir = str(Path(Config.SERVING_DIR).resolve())
+    if backend_dir not in sys.path:
+        sys.path.insert(0, backend_dir)
+    from app.ml.model_architecture import build_model
+    return build_model(name, **kwargs)
+
 # ============================================================================
 # TRAINING
 # ============================================================================
@@ -225,23 +475,9 @@ def train_model():
     print(f"Device: {tf.config.list_physical_devices('GPU')}")
     print("="*60)
     
-    # Load datasets
+    # Load datasets: mmap shard cache, or decode files on the fly
     print("\n📊 LOADING DATA...")
-    X_train_full, Y_train_full = load_dataset('train')
-    X_test, Y_test = load_dataset('test')
-    
-    # Split train into train + validation
-    X_train, X_val, Y_train, Y_val = train_test_split(
-        X_train_full, Y_train_full, 
-        test_size=Config.VALIDATION_SPLIT, 
-        stratify=Y_train_full,
-        random_state=42
-    )
-    
-    print(f"\nFinal Split:")
-    print(f"  Training:   {len(X_train)} images")
-    print(f"  Validation: {len(X_val)} images")
-    print(f"  Test:       {len(X_test)} images")
+    train_ds, val_ds, test_ds = load_datasets()
     
     # Build model
     print("\n🏗️  BUILDING MODEL...")
@@ -308,16 +544,13 @@ def train_model():
     
     callbacks = [checkpoint, early_stop, reduce_lr, tensorboard]
     
-    # Data augmentation
-    datagen = create_data_augmentation()
-    
     # Training
     print("\n🚀 STARTING TRAINING...")
     print("="*60)
     
     history = model.fit(
-        datagen.flow(X_train, Y_train, batch_size=Config.BATCH_SIZE),
-        validation_data=(X_val, Y_val),
+        train_ds,
+        validation_data=val_ds,
         epochs=Config.EPOCHS,
         callbacks=callbacks,
         verbose=1
@@ -338,13 +571,12 @@ def train_model():
     
     # Evaluation on test set
     print("\n📊 EVALUATING ON TEST SET...")
-    test_loss, test_accuracy = model.evaluate(X_test, Y_test, verbose=0)
+    test_loss, test_accuracy = model.evaluate(test_ds, verbose=0)
     print(f"  Test Loss: {test_loss:.4f}")
     print(f"  Test Accuracy: {test_accuracy*100:.2f}%")
     
-    # Predictions
-    Y_pred = model.predict(X_test, verbose=0)
-    Y_pred_classes = np.argmax(Y_pred, axis=1)
+    # Predictions (labels taken from the stream so they stay aligned)
+    Y_test, Y_pred_classes, X_sample = predict_dataset(model, test_ds)
     
     # Generate visualizations
     print("\n📈 GENERATING VISUALIZATIONS...")
@@ -359,7 +591,7 @@ def train_model():
     save_classification_report(Y_test, Y_pred_classes)
     
     # 4. Sample predictions
-    plot_sample_predictions(X_test, Y_test, Y_pred_classes)
+    plot_sample_predictions(X_sample, Y_test[:len(X_sample)], Y_pred_classes[:len(X_sample)])
     
     # Summary
     print("\n" + "="*60)
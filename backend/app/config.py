@@ -2,7 +2,7 @@
 Application Configuration
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -15,20 +15,91 @@ class Settings(BaseSettings):
     
     # API Keys
     GEMINI_API_KEY: str
+
+    # AI Chat
+    CHAT_LLM_TIMEOUT_SECONDS: float = 8.0
+    CHAT_PROMPT_TOKEN_BUDGET: int = 1200  # system prompt + history + new message (estimated tokens)
+    CHAT_HISTORY_MESSAGE_MAX_TOKENS: int = 200  # longer history messages are cut
+    # Start an LLM opening reply at detection time, keyed by emotion_log_id
+    CHAT_SPECULATIVE_GREETING: bool = False
+    # Trade-off: if the user's first message arrives while the greeting is still
+    # generating, that turn waits up to this long (then the greeting is cancelled)
+    # so the greeting precedes it in the history. Lower = faster first reply,
+    # more greetings dropped.
+    CHAT_GREETING_MAX_WAIT_SECONDS: float = 3.0
+    CRISIS_LEXICON_PATH: Optional[str] = None  # one phrase per line; default: built-in list
+    CRISIS_FOLLOWUP_TTL_SECONDS: int = 300  # how long a finished crisis follow-up reply stays fetchable
+    CRISIS_FOLLOWUP_MAX_WAIT_SECONDS: float = 30.0  # long-poll cap for GET /api/chat/followup/{id}
+
+    # Conversation history kept server-side per session_id.
+    # "memory" = per-worker LRU/TTL ring, "database" = read from chat_logs (shared by all workers).
+    # Use "database" with more than one worker: "memory" only sees the turns its own
+    # worker served and is empty after a restart (the client's `history` is then used).
+    CONVERSATION_BACKEND: str = "memory"
+    CONVERSATION_MAX_TURNS: int = 10
+    CONVERSATION_MAX_SESSIONS: int = 10000
+    CONVERSATION_TTL_SECONDS: int = 3600
+
+    # LLM provider: "gemini" or "openai" (any OpenAI-compatible server).
+    # Point LLM_BASE_URL at llm_stub_server.py to run the chat path offline.
+    LLM_PROVIDER: str = "gemini"
+    LLM_MODEL: str = "gemini-2.0-flash"
+    LLM_BASE_URL: Optional[str] = None
+    LLM_API_KEY: Optional[str] = None  # default: GEMINI_API_KEY
+    LLM_HTTP_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+
+    # LLM circuit breaker (rolling window of recent calls)
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_ERROR_RATIO: float = 0.5
+    LLM_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    LLM_BREAKER_SLOW_CALL_RATIO: float = 0.8
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    LLM_BREAKER_HALF_OPEN_PROBES: int = 2
+
+    # Hedged LLM requests: fire a second call at the recent p95 latency
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ADMIN_PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PASSWORD_HASH_WORKERS: int = 2
     
     # CORS - will be parsed from comma-separated string in .env
     ALLOWED_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
     
     # Model
     MODEL_PATH: str = "app/ml/emotion_cnn_fixed.h5"
+    MODEL_ARCHITECTURE: str = "emotion_cnn"  # emotion_cnn | student_cnn (see ml/model_architecture.py)
     IMG_SIZE: int = 100
     MAX_IMAGE_SIZE_MB: int = 5
-    
+
+    # Recommendation catalog (versioned JSON, hot-reloaded when the file changes)
+    RECOMMENDATION_CATALOG_PATH: str = "app/data/recommendations.json"
+    RECOMMENDATION_CATALOG_POLL_SECONDS: float = 10.0  # 0 = only reload via the admin endpoint
+
+    # Recommendation bundles (pre-serialized, served with ETag)
+    RECOMMENDATION_CACHE_MAX_AGE_SECONDS: int = 300
+
+    # Recommendation ranking from clicks (Thompson sampling, in memory)
+    RECOMMENDATION_RANKING_ENABLED: bool = True
+    RECOMMENDATION_RANK_INTERVAL_SECONDS: float = 60.0  # reorder + recompile bundles
+    RECOMMENDATION_RANK_SNAPSHOT_SECONDS: float = 300.0  # write counters to the DB
+    RECOMMENDATION_RANK_MIN_CLICKS: int = 20  # per category before the curated order changes
+    RECOMMENDATION_RANK_EXPLORE_SLOTS: int = 1  # positions after the top item given to a Thompson draw
+    RECOMMENDATION_RANK_EXPLORE_SECONDS: float = 900.0  # how long one exploration draw is kept
+
+    # Recommendation click ingestion (batched writes)
+    CLICK_QUEUE_MAX_SIZE: int = 10000
+    CLICK_BATCH_SIZE: int = 500
+    CLICK_FLUSH_INTERVAL_SECONDS: float = 1.0
+
     # Emotions
     EMOTIONS: dict = {
         0: 'Surprise',
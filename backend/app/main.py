@@ -8,6 +8,11 @@ from .config import settings
 from .database import engine, Base
 from .routers import emotion, chat, recommendation, admin
 from .ml.model_loader import emotion_model
+from .services.click_ingestion import click_ingestion
+from .services.recommendation_ranker import recommendation_ranker
+from .services.recommendation_catalog import catalog_reloader
+from .services.llm_provider import llm_provider
+from .utils.metrics import metrics
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -49,11 +54,28 @@ async def startup_event():
         print("✓ Emotion detection model loaded")
     except Exception as e:
         print(f"⚠ Warning: Could not load model: {e}")
+
+    # Start batched click ingestion
+    await click_ingestion.start()
+
+    # Restore click-based recommendation ranking
+    await recommendation_ranker.start()
+
+    # Hot reload the recommendation catalog file
+    await catalog_reloader.start()
     
     print(f"\n✅ API ready at http://localhost:8000")
     print(f"📖 Docs at http://localhost:8000/api/docs")
     print("="*60 + "\n")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush background queues before the worker exits"""
+    await click_ingestion.stop()
+    await catalog_reloader.stop()
+    await recommendation_ranker.stop()
+    await llm_provider.aclose()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -73,6 +95,11 @@ async def health_check():
         "database": "connected"
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """In-process metrics for this worker"""
+    return metrics.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     
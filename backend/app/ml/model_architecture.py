@@ -4,43 +4,154 @@ Definisi Arsitektur Model (Sama Persis dengan train_model.py lama)
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import (
     Conv2D, MaxPooling2D, Flatten, Dense, Dropout, 
-    BatchNormalization, Activation
+    BatchNormalization, Activation, SeparableConv2D, GlobalAveragePooling2D
 )
 
-def build_emotion_cnn():
+def build_emotion_cnn(filters=(64, 64, 32), dense_units=128):
+    """
+    Teacher / default serving CNN.
+
+    filters + dense_units default to the original topology; smaller
+    values describe a channel-pruned export (see the .json sidecar read by
+    EmotionModel). Layer names are the ones Keras auto-generated when the
+    original model was trained, so load_weights(by_name=True) matches no
+    matter how many models were built before in this process.
+    """
     # Hardcoded values sesuai train_model.py lama
     IMG_SIZE = 100
     CHANNELS = 3
     NUM_CLASSES = 7
+    f1, f2, f3 = filters
 
     model = Sequential([
         # Block 1
-        Conv2D(64, (3, 3), input_shape=(IMG_SIZE, IMG_SIZE, CHANNELS), padding='same'),
-        BatchNormalization(),
-        Activation('relu'),
-        MaxPooling2D(pool_size=(2, 2)),
-        Dropout(0.25),
+        Conv2D(f1, (3, 3), input_shape=(IMG_SIZE, IMG_SIZE, CHANNELS), padding='same', name='conv2d'),
+        BatchNormalization(name='batch_normalization'),
+        Activation('relu', name='activation'),
+        MaxPooling2D(pool_size=(2, 2), name='max_pooling2d'),
+        Dropout(0.25, name='dropout'),
         
         # Block 2
-        Conv2D(64, (3, 3), padding='same'),
-        BatchNormalization(),
-        Activation('relu'),
-        MaxPooling2D(pool_size=(2, 2)),
-        Dropout(0.25),
+        Conv2D(f2, (3, 3), padding='same', name='conv2d_1'),
+        BatchNormalization(name='batch_normalization_1'),
+        Activation('relu', name='activation_1'),
+        MaxPooling2D(pool_size=(2, 2), name='max_pooling2d_1'),
+        Dropout(0.25, name='dropout_1'),
         
         # Block 3
-        Conv2D(32, (3, 3), padding='same'),
-        BatchNormalization(),
-        Activation('relu'),
-        MaxPooling2D(pool_size=(2, 2)),
-        Dropout(0.25),
+        Conv2D(f3, (3, 3), padding='same', name='conv2d_2'),
+        BatchNormalization(name='batch_normalization_2'),
+        Activation('relu', name='activation_2'),
+        MaxPooling2D(pool_size=(2, 2), name='max_pooling2d_2'),
+        Dropout(0.25, name='dropout_2'),
         
         # Classifier
-        Flatten(),
-        Dense(128, activation='relu'),
-        BatchNormalization(),
-        Dropout(0.5),
-        Dense(NUM_CLASSES, activation='softmax')
+        Flatten(name='flatten'),
+        Dense(dense_units, activation='relu', name='dense'),
+        BatchNormalization(name='batch_normalization_3'),
+        Dropout(0.5, name='dropout_3'),
+        Dense(NUM_CLASSES, activation='softmax', name='dense_1')
     ])
     
-    return model
\ No newline at end of file
+    return model
+
+
+def build_student_cnn():
+    """
+    Compact student (knowledge distillation dari build_emotion_cnn).
+
+    Strided conv stem + 3 depthwise-separable blocks + global average
+    pooling: ~15x fewer multiply-adds and ~45x fewer parameters than the
+    teacher.
+    Layer names are fixed so load_weights(by_name=True) always matches.
+    """
+    IMG_SIZE = 100
+    CHANNELS = 3
+    NUM_CLASSES = 7
+
+    model = Sequential([
+        # Stem
+        Conv2D(24, (3, 3), strides=(2, 2), input_shape=(IMG_SIZE, IMG_SIZE, CHANNELS), padding='same',
+               use_bias=False, name='stem_conv'),
+        BatchNormalization(name='stem_bn'),
+        Activation('relu', name='stem_relu'),
+
+        # Block 1
+        SeparableConv2D(48, (3, 3), padding='same', use_bias=False, name='block1_sepconv'),
+        BatchNormalization(name='block1_bn'),
+        Activation('relu', name='block1_relu'),
+        MaxPooling2D(pool_size=(2, 2), name='block1_pool'),
+
+        # Block 2
+        SeparableConv2D(64, (3, 3), padding='same', use_bias=False, name='block2_sepconv'),
+        BatchNormalization(name='block2_bn'),
+        Activation('relu', name='block2_relu'),
+        MaxPooling2D(pool_size=(2, 2), name='block2_pool'),
+
+        # Block 3
+        SeparableConv2D(96, (3, 3), padding='same', use_bias=False, name='block3_sepconv'),
+        BatchNormalization(name='block3_bn'),
+        Activation('relu', name='block3_relu'),
+
+        # Classifier
+        GlobalAveragePooling2D(name='gap'),
+        Dropout(0.3, name='head_dropout'),
+        Dense(NUM_CLASSES, activation='softmax', name='predictions')
+    ], name='student_cnn')
+
+    return model
+
+
+def build_cnn_variant(input_size=100, width=1.0, separable=False, head="flatten", dense_units=128):
+    """
+    Parameterized family around build_emotion_cnn (same 3 blocks of 64/64/32).
+
+    Args:
+        input_size: Square input resolution (e.g. 64, 80, 100)
+        width: Width multiplier applied to every block's filters
+        separable: Depthwise-separable convs in blocks 2-3 (block 1 sees RGB)
+        head: "flatten" (Flatten → Dense) or "gap" (GlobalAveragePooling2D → Dense)
+        dense_units: Hidden dense units of the classifier
+    """
+    CHANNELS = 3
+    NUM_CLASSES = 7
+    if head not in ("flatten", "gap"):
+        raise ValueError(f"Unknown head '{head}' (choose from flatten, gap)")
+    filters = [max(8, int(round(f * width))) for f in (64, 64, 32)]
+
+    layers = []
+    for i, f in enumerate(filters):
+        kwargs = {"input_shape": (input_size, input_size, CHANNELS)} if i == 0 else {}
+        conv = SeparableConv2D if separable and i > 0 else Conv2D
+        layers += [
+            conv(f, (3, 3), padding='same', name=f'block{i + 1}_conv', **kwargs),
+            BatchNormalization(name=f'block{i + 1}_bn'),
+            Activation('relu', name=f'block{i + 1}_relu'),
+            MaxPooling2D(pool_size=(2, 2), name=f'block{i + 1}_pool'),
+            Dropout(0.25, name=f'block{i + 1}_dropout'),
+        ]
+
+    layers += [
+        # Classifier
+        Flatten(name='flatten') if head == "flatten" else GlobalAveragePooling2D(name='gap'),
+        Dense(dense_units, activation='relu', name='head_dense'),
+        BatchNormalization(name='head_bn'),
+        Dropout(0.5, name='head_dropout'),
+        Dense(NUM_CLASSES, activation='softmax', name='predictions')
+    ]
+    return Sequential(layers, name='cnn_variant')
+
+
+# Dipilih lewat settings.MODEL_ARCHITECTURE
+ARCHITECTURES = {
+    "emotion_cnn": build_emotion_cnn,
+    "student_cnn": build_student_cnn,
+    "cnn_variant": build_cnn_variant,
+}
+
+
+def build_model(name: str = "emotion_cnn", **kwargs):
+    """Build a registered architecture by name (kwargs: its size parameters)"""
+    if name not in ARCHITECTURES:
+        raise ValueError(f"Unknown MODEL_ARCHITECTURE '{name}' (choose from {sorted(ARCHITECTURES)})")
+    return ARCHITECTURES[name](**kwargs)
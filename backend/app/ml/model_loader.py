@@ -2,21 +2,40 @@
 ML Model Loader - Weight Injection Strategy
 """
 import os
+import json
 import numpy as np
+import tensorflow as tf
 from ..config import settings
-from .model_architecture import build_emotion_cnn
+from .model_architecture import build_model
 
 class EmotionModel:
     """Singleton class for emotion detection model"""
     
     _instance = None
     _model = None
+    _forward = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(EmotionModel, cls).__new__(cls)
         return cls._instance
     
+    @staticmethod
+    def _architecture(model_path: str):
+        """
+        (architecture name, size kwargs) for a weights file.
+        
+        Exported variants (e.g. a channel-pruned model) ship a sidecar
+        <model>.json: {"architecture": ..., "kwargs": {...}}; without it
+        settings.MODEL_ARCHITECTURE with default sizes is used.
+        """
+        sidecar = os.path.splitext(model_path)[0] + ".json"
+        if not os.path.exists(sidecar):
+            return settings.MODEL_ARCHITECTURE, {}
+        with open(sidecar) as f:
+            spec = json.load(f)
+        return spec.get("architecture", settings.MODEL_ARCHITECTURE), spec.get("kwargs", {})
+    
     def load_model(self):
         """
         Load model using Architecture Reconstruction strategy 
@@ -34,12 +53,13 @@ class EmotionModel:
                 else:
                     raise FileNotFoundError(f"Model not found at {model_path}")
             
+            architecture, kwargs = self._architecture(model_path)
             print(f"🔧 Loading emotion model from {model_path}...")
-            print("   Strategy: Rebuild Architecture + Load Weights")
+            print(f"   Strategy: Rebuild Architecture ({architecture} {kwargs or ''}) + Load Weights")
             
             try:
                 # 1. Bangun ulang arsitektur bersih dari kode Python
-                self._model = build_emotion_cnn()
+                self._model = build_model(architecture, **kwargs)
                 
                 # 2. Inject bobot dari file h5 (mengabaikan config yang rusak)
                 # by_name=True & skip_mismatch=True membuat loading lebih fleksibel
@@ -52,6 +72,13 @@ class EmotionModel:
                     metrics=['accuracy']
                 )
                 
+                # Forward pass sebagai graph: model.predict punya overhead
+                # besar per panggilan untuk batch berisi 1 gambar
+                self._forward = tf.function(
+                    lambda x: self._model(x, training=False),
+                    input_signature=[tf.TensorSpec(self._model.input_shape, tf.float32)]
+                )
+                
                 print(f"✓ Model loaded successfully!")
                 print(f"   Input: {self._model.input_shape}")
                 print(f"   Output: {self._model.output_shape}")
@@ -71,8 +98,8 @@ class EmotionModel:
             self.load_model()
         
         # Predict
-        predictions = self._model.predict(image_array, verbose=0)
-        probs = predictions[0]
+        predictions = self._forward(tf.convert_to_tensor(image_array, tf.float32))
+        probs = predictions.numpy()[0]
         
         # Get predicted class
         predicted_class = np.argmax(probs)
@@ -83,6 +110,13 @@ class EmotionModel:
         
         return emotion, confidence, probs
     
+    @property
+    def input_size(self) -> int:
+        """Square input resolution of the loaded model (variants may use 64/80)"""
+        if self._model is None:
+            self.load_model()
+        return int(self._model.input_shape[1])
+    
     @property
     def is_loaded(self) -> bool:
         return self._model is not None
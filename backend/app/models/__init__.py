@@ -5,5 +5,6 @@ from .admin import Admin
 from .emotion_log import EmotionLog
 from .chat_log import ChatLog
 from .recommendation_click import RecommendationClick
+from .recommendation_rank_state import RecommendationRankState
 
-__all__ = ["Admin", "EmotionLog", "ChatLog", "RecommendationClick"]
\ No newline at end of file
+__all__ = ["Admin", "EmotionLog", "ChatLog", "RecommendationClick", "RecommendationRankState"]
\ No newline at end of file
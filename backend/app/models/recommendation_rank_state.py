@@ -0,0 +1,19 @@
+"""
+Recommendation Rank State Model (bandit snapshot)
+"""
+from sqlalchemy import Column, String, Float, DateTime
+from datetime import datetime
+from ..database import Base
+
+class RecommendationRankState(Base):
+    __tablename__ = "recommendation_rank_state"
+    
+    emotion = Column(String(20), primary_key=True)
+    recommendation_type = Column(String(20), primary_key=True)
+    recommendation_title = Column(String(255), primary_key=True)
+    clicks = Column(Float, nullable=False, default=0)
+    impressions = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RecommendationRankState {self.recommendation_type}: {self.recommendation_title} ({self.clicks}/{self.impressions})>"
@@ -6,11 +6,14 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta, datetime
 from typing import List, Optional
-from ..database import get_db
+from ..database import get_db, SessionLocal
 from ..models.admin import Admin
+from ..utils.principal_cache import principal_cache
 from ..schemas.admin import AdminLogin, AdminCreate, AdminResponse, Token
-from ..utils.helpers import hash_password, verify_password, create_access_token, decode_access_token
+from ..utils.helpers import create_access_token, decode_access_token
+from ..utils.auth import verify_password_async
 from ..config import settings
+from ..services.recommendation_catalog import catalog_reloader
 
 # Import Models
 from ..models.emotion_log import EmotionLog
@@ -22,20 +25,38 @@ router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/admin/login")
 
-def get_current_admin(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_admin(token: str = Depends(oauth2_scheme)):
     payload = decode_access_token(token)
     username = payload.get("sub")
     if username is None:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-    admin = db.query(Admin).filter(Admin.username == username).first()
+
+    # Cache hit: tidak perlu membuka session DB sama sekali
+    token_exp = payload.get("exp")
+    admin = principal_cache.get(username, token_exp)
+    if admin is not None:
+        return admin
+
+    db = SessionLocal()
+    try:
+        admin = db.query(Admin).filter(Admin.username == username).first()
+        if admin is not None:
+            db.expunge(admin)
+    finally:
+        db.close()
+
     if admin is None:
         raise HTTPException(status_code=401, detail="Admin not found")
+    if not admin.is_active:
+        raise HTTPException(status_code=401, detail="Admin is inactive")
+
+    principal_cache.put(username, token_exp, admin)
     return admin
 
 @router.post("/login", response_model=Token)
 async def login_admin(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     admin = db.query(Admin).filter(Admin.username == form_data.username).first()
-    if not admin or not verify_password(form_data.password, admin.password_hash):
+    if not admin or not await verify_password_async(form_data.password, admin.password_hash):
         raise HTTPException(status_code=401, detail="Incorrect username or password")
     
     access_token = create_access_token(data={"sub": admin.username}, expires_delta=timedelta(minutes=60))
@@ -107,4 +128,20 @@ async def get_activity_logs(
     Mengembalikan list kosong untuk menonaktifkan fitur Recent Activity 
     dan mencegah Error 500 akibat kolom timestamp yang hilang.
     """
-    return []
\ No newline at end of file
+    return []
+
+@router.post("/recommendations/reload")
+async def reload_recommendation_catalog(
+    current_admin: Admin = Depends(get_current_admin)
+):
+    """
+    Reload the recommendation catalog file now (this worker).
+    Other workers pick the change up on their next file poll.
+    """
+    try:
+        return await catalog_reloader.reload(force=True)
+    except (OSError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Catalog not reloaded: {e}"
+        )
@@ -1,11 +1,13 @@
 """
 Chat Router
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..schemas.chat import ChatRequest, ChatResponse
-from ..services.chat_service import ChatService
+from ..config import settings
+from ..schemas.chat import ChatFollowupResponse, ChatRequest, ChatResponse
+from ..services.chat_service import ChatService, crisis_followups, greeting_prefetch
 
 router = APIRouter(prefix="/api/chat", tags=["AI Chat"])
 
@@ -21,7 +23,10 @@ async def chat_with_ai(
     - **message**: User message
     - **session_id**: Browser session ID
     - **emotion_log_id**: Related emotion log ID
-    - **history**: Previous chat messages
+    - **history**: Optional; used only when the server has no turns for session_id
+    
+    On a crisis message the hotlines are returned immediately with
+    `pending: true`; fetch the AI reply from `/api/chat/followup/{followup_id}`.
     """
     
     result = await ChatService.chat(
@@ -35,6 +40,59 @@ async def chat_with_ai(
     
     return result
 
+@router.post("/stream")
+async def chat_with_ai_stream(data: ChatRequest):
+    """
+    Chat with AI companion, streamed as Server-Sent Events
+
+    Same body as `POST /api/chat/`. On a crisis message a `crisis` event
+    with `{"response", "hotlines"}` comes first. Emits `token` events with `{"text"}`
+    while Gemini generates, then one `done` event with the full
+    `{"response", "emergency", "hotlines"}` payload.
+    """
+    
+    stream = ChatService.chat_stream(
+        emotion=data.emotion,
+        user_message=data.message,
+        session_id=data.session_id,
+        emotion_log_id=data.emotion_log_id,
+        chat_history=data.history
+    )
+    
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/followup/{followup_id}", response_model=ChatFollowupResponse)
+async def get_chat_followup(followup_id: str, wait: float = 0):
+    """
+    AI reply that follows a crisis acknowledgment
+
+    - **wait**: seconds to wait for the reply if it is still pending (long-poll)
+    """
+    wait = min(max(wait, 0), settings.CRISIS_FOLLOWUP_MAX_WAIT_SECONDS)
+    result = await crisis_followups.get(followup_id, wait=wait)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Follow-up not found or expired")
+    return result
+
+@router.get("/greeting/{emotion_log_id}", response_model=ChatFollowupResponse)
+async def get_chat_greeting(emotion_log_id: str, wait: float = 0):
+    """
+    LLM opening reply started at detection time (when `greeting_pending` was true)
+
+    - **wait**: seconds to wait for the reply if it is still pending (long-poll)
+    
+    `response` is null when the LLM could not produce one.
+    """
+    wait = min(max(wait, 0), settings.CRISIS_FOLLOWUP_MAX_WAIT_SECONDS)
+    result = await greeting_prefetch.get(emotion_log_id, wait=wait)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Greeting not found or expired")
+    return result
+
 @router.get("/history/{session_id}")
 async def get_chat_history(
     session_id: str,
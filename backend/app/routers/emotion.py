@@ -4,23 +4,16 @@ Emotion Detection Router
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 from ..database import get_db
-from ..schemas.emotion import EmotionDetectRequest, EmotionDetectResponse
+from ..schemas.emotion import EmotionBootstrapResponse, EmotionDetectRequest, EmotionDetectResponse
 from ..services.emotion_service import EmotionService
+from ..services.chat_service import ChatService
+from ..services.recommendation_service import RecommendationService
+from ..services.recommendation_ranker import recommendation_ranker
 
 router = APIRouter(prefix="/api/emotion", tags=["Emotion Detection"])
 
-@router.post("/detect", response_model=EmotionDetectResponse)
-async def detect_emotion(
-    request: Request,
-    data: EmotionDetectRequest,
-    db: Session = Depends(get_db)
-):
-    """
-    Detect emotion from image
-    
-    - **image**: Base64 encoded image
-    - **session_id**: Browser session ID
-    """
+def _detect(request: Request, data: EmotionDetectRequest, db: Session) -> dict:
+    """Detection + log + (optional) speculative greeting, shared by /detect and /bootstrap"""
     
     # Get client info
     user_agent = request.headers.get("user-agent")
@@ -34,6 +27,47 @@ async def detect_emotion(
         ip_address=ip_address
     )
     
+    # Opening reply dari LLM mulai dibuat sekarang, pesan bawaan dikirim langsung
+    result["greeting_pending"] = ChatService.prefetch_greeting(
+        emotion=result["emotion"],
+        initial_message=result["initial_message"],
+        session_id=data.session_id,
+        emotion_log_id=str(result["emotion_log_id"])
+    )
+    
+    return result
+
+@router.post("/detect", response_model=EmotionDetectResponse)
+async def detect_emotion(
+    request: Request,
+    data: EmotionDetectRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Detect emotion from image
+    
+    - **image**: Base64 encoded image
+    - **session_id**: Browser session ID
+    """
+    return _detect(request, data, db)
+
+@router.post("/bootstrap", response_model=EmotionBootstrapResponse)
+async def bootstrap_session(
+    request: Request,
+    data: EmotionDetectRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Detect emotion and return everything the chat screen needs in one call:
+    the detection result, the initial message and the recommendation bundle
+    (music, food, activity) for the detected emotion.
+    
+    - **image**: Base64 encoded image
+    - **session_id**: Browser session ID
+    """
+    result = _detect(request, data, db)
+    result["recommendations"] = RecommendationService.get_bundle(result["emotion"])
+    recommendation_ranker.record_impression(result["emotion"])
     return result
 
 @router.get("/stats")
@@ -1,9 +1,10 @@
 """
 Recommendation Router (Updated)
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import Optional
+from ..config import settings
 from ..database import get_db
 from ..schemas.recommendation import (
     RecommendationRequest,
@@ -11,59 +12,88 @@ from ..schemas.recommendation import (
     RecommendationClickRequest,
     RecommendationClickResponse
 )
-from ..services.recommendation_service import RecommendationService
+from ..services.recommendation_service import CompiledBundle, RecommendationService
+from ..services.recommendation_ranker import recommendation_ranker
+from ..services.click_ingestion import click_ingestion
 
 router = APIRouter(prefix="/api/recommendations", tags=["Recommendations"])
 
+def _bundle_response(request: Request, bundle: CompiledBundle) -> Response:
+    """Pre-serialized bundle with ETag; 304 when the client already has it"""
+    headers = {
+        "ETag": bundle.etag,
+        "Cache-Control": f"public, max-age={settings.RECOMMENDATION_CACHE_MAX_AGE_SECONDS}"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or bundle.etag in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=bundle.body, media_type="application/json", headers=headers)
+
 @router.post("/", response_model=RecommendationResponse)
-async def get_recommendations(data: RecommendationRequest):
+async def get_recommendations(data: RecommendationRequest, request: Request):
     """
     Get recommendations based on emotion.
     If category is provided, return only that category.
     If not, return ALL categories (music, food, activity).
+    
+    Bodies are serialized once at startup; see also the cacheable
+    `GET /api/recommendations/bundle/{emotion}`.
     """
     
-    # Siapkan wadah hasil
-    response_data = {
-        "emotion": data.emotion,
-        "music": [],
-        "food": [],
-        "activity": []
-    }
-
     # Logika Cerdas: Ambil paket lengkap jika kategori kosong
-    if not data.category or data.category.lower() == 'all':
-        # Ambil Music
-        music_res = RecommendationService.get_recommendations(data.emotion, 'music')
-        if isinstance(music_res, dict) and 'items' in music_res:
-            response_data['music'] = music_res['items']
-            
-        # Ambil Food
-        food_res = RecommendationService.get_recommendations(data.emotion, 'food')
-        if isinstance(food_res, dict) and 'items' in food_res:
-            response_data['food'] = food_res['items']
+    category = data.category
+    if not category or category.lower() == 'all':
+        category = None
 
-        # Ambil Activity
-        act_res = RecommendationService.get_recommendations(data.emotion, 'activity')
-        if isinstance(act_res, dict) and 'items' in act_res:
-            response_data['activity'] = act_res['items']
+    recommendation_ranker.record_impression(data.emotion, category)
+    return _bundle_response(request, RecommendationService.get_bundle_json(data.emotion, category))
 
-    else:
-        # Jika user minta spesifik (jarang dipakai di UI kamu, tapi buat jaga-jaga)
-        result = RecommendationService.get_recommendations(data.emotion, data.category)
-        # Masukkan ke slot yang sesuai
-        if data.category in response_data:
-            response_data[data.category] = result.get('items', [])
+@router.get("/bundle/{emotion}", response_model=RecommendationResponse)
+async def get_recommendation_bundle(emotion: str, request: Request, category: str = None):
+    """
+    Cacheable recommendations for an emotion (optionally one category)
 
-    return response_data
+    Sends a strong `ETag` and `Cache-Control`; repeat requests with
+    `If-None-Match` get `304 Not Modified`.
+    """
+    if category and category.lower() == 'all':
+        category = None
+    if category is not None and category not in RecommendationService.CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"Unknown category: {category}")
+
+    recommendation_ranker.record_impression(emotion, category)
+    return _bundle_response(request, RecommendationService.get_bundle_json(emotion, category))
 
 @router.post("/track", response_model=RecommendationClickResponse)
 async def track_recommendation_click(
     data: RecommendationClickRequest,
     db: Session = Depends(get_db)
 ):
-    """Track when user clicks a recommendation"""
-    
+    """
+    Track when user clicks a recommendation
+
+    Clicks are queued and written in batches; the response does not wait
+    for the database. If the queue is not running yet the click is written
+    directly, if it is full the click is dropped (see /metrics).
+    """
+    recommendation_ranker.record_click(data.emotion, data.category, data.title)
+
+    click = {
+        "emotion": data.emotion,
+        "category": data.category,
+        "title": data.title,
+        "session_id": data.session_id,
+        "emotion_log_id": data.emotion_log_id
+    }
+
+    if click_ingestion.submit(click):
+        return {"status": "queued"}
+
+    if click_ingestion.is_running:
+        return {"status": "dropped"}
+
     result = RecommendationService.track_click(
         emotion=data.emotion,
         category=data.category,
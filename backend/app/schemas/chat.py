@@ -11,12 +11,24 @@ class ChatRequest(BaseModel):
     message: str = Field(..., description="User message")
     session_id: str = Field(..., description="Browser session ID")
     emotion_log_id: str = Field(..., description="Related emotion log ID")
-    history: List[Dict] = Field(default=[], description="Previous chat history")
+    history: List[Dict] = Field(
+        default=[],
+        description="Recent turns as seen by the client; used only when the server has no history for session_id"
+    )
 
 class ChatResponse(BaseModel):
     response: str
     emergency: bool = False
     hotlines: Optional[List[str]] = None
+    pending: bool = False  # True: AI reply follows via GET /api/chat/followup/{followup_id}
+    followup_id: Optional[str] = None
+
+class ChatFollowupResponse(BaseModel):
+    followup_id: str
+    status: str  # "pending" | "ready" | "cancelled" | "failed"
+    response: Optional[str] = None
+    emergency: bool = False
+    hotlines: Optional[List[str]] = None
 
 class ChatLogResponse(BaseModel):
     id: UUID
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field
 from typing import Dict, Optional
 from datetime import datetime
 from uuid import UUID
+from .recommendation import RecommendationResponse
 
 class EmotionDetectRequest(BaseModel):
     image: str = Field(..., description="Base64 encoded image")
@@ -17,6 +18,11 @@ class EmotionDetectResponse(BaseModel):
     all_probabilities: Dict[str, float]
     face_detected: bool
     emotion_log_id: UUID
+    greeting_pending: bool = False  # LLM opening reply via GET /api/chat/greeting/{emotion_log_id}
+
+class EmotionBootstrapResponse(EmotionDetectResponse):
+    """Detection + recommendation bundle + initial message in one response"""
+    recommendations: RecommendationResponse
     
 class EmotionLogResponse(BaseModel):
     id: UUID
@@ -1,110 +1,240 @@
 """
-Chat Service with Gemini AI
+Chat Service with Gemini AI (via the LLM provider layer)
 """
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from sqlalchemy.orm import Session
-from typing import Dict, List, Optional
-import google.generativeai as genai
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Set, Tuple
 from ..models.chat_log import ChatLog
 from ..config import settings
+from ..database import SessionLocal
 from ..utils.helpers import check_crisis_keywords, get_emergency_hotlines
+from ..utils.metrics import metrics
+from .llm_provider import llm_provider
+from .llm_resilience import CircuitOpenError, hedged, llm_breaker, llm_latency
+from .conversation_store import conversation_store
+from .prompt_builder import prompt_builder
 
-# Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
-# ✅ FIX: Menggunakan model yang lebih stabil/terbaru
-gemini_model = genai.GenerativeModel('gemini-2.0-flash')
+# Dikirim seketika saat krisis terdeteksi, sebelum balasan LLM selesai
+CRISIS_ACKNOWLEDGMENT = (
+    "Aku dengar kamu, dan aku sangat peduli denganmu 💙 Kamu tidak sendirian. "
+    "⚠️ Tolong hubungi bantuan profesional sekarang:"
+)
+
+# Penulisan chat log di luar event loop. Satu thread agar baris tetap
+# tersimpan sesuai urutan (pesan user krisis sebelum balasannya)
+_chat_log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-log")
+_pending_saves: Set[Future] = set()
+
+def _sse(event: str, data: Dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class BackgroundReplies:
+    """
+    LLM replies generated in the background, fetched later by key.
+
+    Used for the reply that follows a crisis acknowledgment
+    (GET /api/chat/followup/{followup_id}) and for the speculative
+    greeting started at detection time (keyed by emotion_log_id).
+    Entries are kept for CRISIS_FOLLOWUP_TTL_SECONDS (per worker).
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, Tuple[asyncio.Task, float]] = {}
+
+    def _evict_expired(self, now: float):
+        for old_key, (task, created) in list(self._tasks.items()):
+            if task.done() and now - created > settings.CRISIS_FOLLOWUP_TTL_SECONDS:
+                del self._tasks[old_key]
+
+    def start(self, reply: Awaitable[Dict], key: Optional[str] = None) -> str:
+        now = time.monotonic()
+        self._evict_expired(now)
+
+        key = key or uuid.uuid4().hex
+        self._tasks[key] = (asyncio.create_task(reply), now)
+        return key
+
+    async def get(self, key: str, wait: float = 0) -> Optional[Dict]:
+        """Status of a reply, waiting up to `wait` seconds for it to finish"""
+        # Juga saat tidak ada start() baru, agar hasil lama tidak menumpuk
+        self._evict_expired(time.monotonic())
+        entry = self._tasks.get(key)
+        if entry is None:
+            return None
+        task = entry[0]
+        if not task.done() and wait > 0:
+            await asyncio.wait({task}, timeout=wait)
+        if not task.done():
+            return {"followup_id": key, "status": "pending"}
+        if task.cancelled():
+            return {"followup_id": key, "status": "cancelled"}
+        if task.exception() is not None:
+            return {"followup_id": key, "status": "failed"}
+        return {"followup_id": key, "status": "ready", **task.result()}
+
+    def discard(self, key: str):
+        """Forget a reply, cancelling it if it is still running"""
+        entry = self._tasks.pop(key, None)
+        if entry is not None and not entry[0].done():
+            entry[0].cancel()
+
+crisis_followups = BackgroundReplies()
+greeting_prefetch = BackgroundReplies()
 
 class ChatService:
     """Service for AI chat"""
-    
+
+    # ✅ FIX: Fallback responses based on emotion
+    FALLBACK_RESPONSES = {
+        'Happiness': "Senang melihatmu bahagia! Cerita lebih banyak dong tentang apa yang membuatmu senang? 😊",
+        'Sadness': "Aku di sini untukmu. Mau cerita apa yang membuatmu sedih? 💙",
+        'Anger': "Aku dengar kamu. Apa yang membuatmu marah? Mari kita bicara. 💪",
+        'Fear': "Tidak apa-apa merasa takut. Aku di sini. Mau cerita lebih lanjut? 🌸",
+        'Surprise': "Wah! Ada apa? Ceritakan! ✨",
+        'Disgust': "Sepertinya ada yang mengganggu. Mau cerita? 🌿",
+        'Neutral': "Hai! Bagaimana harimu? Ada yang mau diceritakan? 💬"
+    }
+
     @staticmethod
-    def create_system_prompt(emotion: str) -> str:
-        """Create system prompt based on emotion"""
-        
-        base = f"""Kamu adalah AI companion yang empatik dan penuh perhatian.
-User saat ini merasakan emosi: {emotion}
-
-PERAN:
-- Pendengar yang baik dan empati
-- Berikan dukungan emosional tulus
-- Ajukan pertanyaan terbuka
-- Berikan perspektif positif tanpa abaikan perasaan
-- Bahasa Indonesia natural dan hangat
-
-GAYA:
-- Informal, ramah, hangat
-- Emoji secukupnya (1-2 per pesan)
-- Jangan formal/kaku
-- Jawaban singkat 2-4 kalimat
-- Fokus mendengar, bukan menggurui
-
-BATASAN:
-- BUKAN pengganti profesional kesehatan mental
-- Jika ada tanda krisis (bunuh diri, sakiti diri), SEGERA sarankan bantuan profesional
-- Jangan diagnosis medis
-- Jangan saran medis/terapi spesifik
+    def get_fallback_response(emotion: str) -> str:
+        """Emotion-specific reply used when the LLM fails or misses its deadline"""
+        return ChatService.FALLBACK_RESPONSES.get(
+            emotion,
+            "Maaf, aku sedang mengalami gangguan. Tapi aku tetap di sini untukmu. Coba lagi ya 🙏"
+        )
 
-"""
-        
-        emotion_guide = {
-            'Happiness': "User bahagia! Rayakan, tunjukkan antusiasme, dorong berbagi lebih.",
-            'Sadness': "User sedih. Empati mendalam, validasi perasaan, beri ruang cerita.",
-            'Anger': "User marah. Dengar sabar, validasi kemarahan, jangan perburuk.",
-            'Fear': "User takut/cemas. Beri rasa aman, validasi kekhawatiran.",
-            'Surprise': "User terkejut. Tunjukkan ketertarikan genuine, bantu proses.",
-            'Disgust': "User jijik/ga nyaman. Validasi perasaan, bantu bicara.",
-            'Neutral': "User netral. Ciptakan percakapan hangat, undang berbagi."
-        }
-        
-        return base + emotion_guide.get(emotion, emotion_guide['Neutral'])
-    
     @staticmethod
-    async def chat(
-        emotion: str,
-        user_message: str,
-        session_id: str,
-        emotion_log_id: str,
-        chat_history: List[Dict],
-        db: Session
-    ) -> Dict:
+    async def generate_reply(prompt: str) -> str:
         """
-        Chat with Gemini AI
+        Call the configured LLM provider without blocking the event loop
+
+        Goes through the circuit breaker; when LLM_HEDGE_ENABLED a second
+        request is fired once the first passes the recent p95 latency.
+
+        Raises:
+            CircuitOpenError: if the breaker is open (no LLM call made)
+            asyncio.TimeoutError: if CHAT_LLM_TIMEOUT_SECONDS passes first
         """
-        
-        # Check for crisis
-        is_crisis = check_crisis_keywords(user_message)
-        
-        # Build prompt
-        prompt = ChatService.create_system_prompt(emotion)
-        prompt += "\n\nPERCAKAPAN:\n"
-        
-        # Add history (last 5 messages for context)
-        for msg in chat_history[-5:]:
-            role = msg.get('role', 'user')
-            content = msg.get('content', '')
-            prompt += f"{role.upper()}: {content}\n"
-        
-        prompt += f"USER: {user_message}\nASSISTANT:"
-        
+        if not llm_breaker.allow_request():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        hedge_after = None
+        if settings.LLM_HEDGE_ENABLED:
+            hedge_after = llm_latency.percentile(settings.LLM_HEDGE_PERCENTILE)
+
+        start = time.perf_counter()
         try:
-            # ✅ FIX: Generate response with explicit config
-            response = gemini_model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    top_p=0.8,
-                    top_k=40,
-                    max_output_tokens=512,
-                )
+            reply = await asyncio.wait_for(
+                hedged(lambda: llm_provider.generate(prompt), hedge_after),
+                timeout=settings.CHAT_LLM_TIMEOUT_SECONDS
             )
-            ai_response = response.text.strip()
-            
-            # Add crisis resources if needed
-            hotlines = None
-            if is_crisis:
-                ai_response += "\n\n⚠️ Aku sangat peduli denganmu. Tolong hubungi bantuan profesional:"
-                hotlines = get_emergency_hotlines()
-            
-            # Save user message to DB
+        except asyncio.CancelledError:
+            llm_breaker.record_cancelled()
+            raise
+        except Exception:
+            llm_breaker.record_failure()
+            raise
+        finally:
+            metrics.observe("chat.llm_seconds", time.perf_counter() - start)
+
+        latency = time.perf_counter() - start
+        llm_breaker.record_success(latency)
+        llm_latency.add(latency)
+        return reply
+
+    @staticmethod
+    async def stream_reply(prompt: str) -> AsyncIterator[str]:
+        """
+        Yield LLM text chunks as they are generated
+
+        The whole stream shares one CHAT_LLM_TIMEOUT_SECONDS deadline.
+        The circuit breaker judges streams by their time to first token.
+
+        Raises:
+            CircuitOpenError: if the breaker is open (no LLM call made)
+            asyncio.TimeoutError: if the deadline passes mid-stream
+        """
+        if not llm_breaker.allow_request():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.CHAT_LLM_TIMEOUT_SECONDS
+        start = time.perf_counter()
+        first_token_latency = None
+        outcome = "cancelled"
+
+        chunks = llm_provider.stream(prompt)
+        try:
+            while True:
+                try:
+                    text = await asyncio.wait_for(chunks.__anext__(), deadline - loop.time())
+                except StopAsyncIteration:
+                    break
+                if first_token_latency is None:
+                    first_token_latency = time.perf_counter() - start
+                    metrics.observe("chat.llm_first_token_seconds", first_token_latency)
+                yield text
+            outcome = "success"
+        except Exception:
+            outcome = "failure"
+            raise
+        finally:
+            # Tutup stream HTTP ke provider (timeout / client disconnect)
+            await chunks.aclose()
+            if outcome == "success":
+                llm_breaker.record_success(first_token_latency or time.perf_counter() - start)
+            elif outcome == "failure":
+                llm_breaker.record_failure()
+            else:
+                llm_breaker.record_cancelled()
+
+        metrics.observe("chat.llm_seconds", time.perf_counter() - start)
+    
+    @staticmethod
+    def create_system_prompt(emotion: str) -> str:
+        """Create system prompt based on emotion (precompiled per emotion)"""
+        return prompt_builder.system_prompt(emotion)
+    
+    @staticmethod
+    def build_prompt(emotion: str, user_message: str, chat_history: List[Dict]) -> str:
+        """System prompt + recent history (within the token budget) + the new user message"""
+        return prompt_builder.build(emotion, user_message, chat_history)
+    
+    @staticmethod
+    async def start_turn(session_id: str, user_message: str, chat_history: List[Dict]) -> List[Dict]:
+        """
+        History for the prompt + record the new user message server-side
+
+        The conversation store is authoritative. The client's `chat_history`
+        is only a fallback for a session the store does not know (another
+        worker served it, or this one restarted); it then seeds the store.
+        """
+        history = await conversation_store.load_history(session_id)
+        if not history and chat_history:
+            metrics.incr("chat.client_history_used")
+            history = chat_history[-settings.CONVERSATION_MAX_TURNS:]
+            for turn in history:
+                conversation_store.append(session_id, turn.get("role", "user"), turn.get("content", ""))
+        conversation_store.append(session_id, "user", user_message)
+        return history
+    
+    @staticmethod
+    def save_exchange(
+        db: Session,
+        emotion_log_id: str,
+        session_id: str,
+        user_message: Optional[str],
+        ai_response: Optional[str],
+        is_crisis: bool
+    ):
+        """Persist the user message and/or the AI reply as ChatLog rows (None = skip)"""
+        # Save user message to DB
+        if user_message is not None:
             user_log = ChatLog(
                 # ✅ FIX: Handle empty string for UUID conversion later
                 emotion_log_id=emotion_log_id if emotion_log_id else None,
@@ -115,8 +245,9 @@ BATASAN:
                 is_crisis=is_crisis
             )
             db.add(user_log)
-            
-            # Save AI response to DB
+        
+        # Save AI response to DB
+        if ai_response is not None:
             ai_log = ChatLog(
                 # ✅ FIX: Handle empty string for UUID conversion later
                 emotion_log_id=emotion_log_id if emotion_log_id else None,
@@ -127,40 +258,323 @@ BATASAN:
                 is_crisis=is_crisis
             )
             db.add(ai_log)
+        
+        db.commit()
+    
+    @staticmethod
+    def save_exchange_detached(
+        emotion_log_id: str,
+        session_id: str,
+        user_message: Optional[str],
+        ai_response: Optional[str],
+        is_crisis: bool
+    ):
+        """save_exchange with its own DB session (for work outliving the request)"""
+        db = SessionLocal()
+        try:
+            ChatService.save_exchange(
+                db, emotion_log_id, session_id, user_message, ai_response, is_crisis
+            )
+        except Exception as e:
+            print(f"Chat save error: {e}")
+            db.rollback()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def save_exchange_background(
+        emotion_log_id: str,
+        session_id: str,
+        user_message: Optional[str],
+        ai_response: Optional[str],
+        is_crisis: bool
+    ) -> Future:
+        """
+        save_exchange_detached on the chat-log thread, without blocking the
+        event loop. The future is kept until it finishes so errors are logged.
+        """
+        future = _chat_log_executor.submit(
+            ChatService.save_exchange_detached,
+            emotion_log_id, session_id, user_message, ai_response, is_crisis
+        )
+        _pending_saves.add(future)
+        future.add_done_callback(ChatService._save_done)
+        return future
+    
+    @staticmethod
+    def _save_done(future: Future):
+        _pending_saves.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Chat save error: {future.exception()!r}")
+            metrics.incr("chat.save_failed")
+    
+    @staticmethod
+    async def _crisis_followup_reply(
+        emotion: str,
+        user_message: str,
+        session_id: str,
+        emotion_log_id: str,
+        chat_history: List[Dict]
+    ) -> Dict:
+        """Generate + persist the empathetic reply that follows a crisis acknowledgment"""
+        prompt = ChatService.build_prompt(emotion, user_message, chat_history)
+        try:
+            ai_response = await ChatService.generate_reply(prompt)
+        except Exception as e:
+            print(f"Crisis follow-up LLM error: {e!r}")
+            metrics.incr("chat.crisis_followup_fallback")
+            ai_response = ChatService.get_fallback_response(emotion)
+        
+        conversation_store.append(session_id, "assistant", ai_response)
+        ChatService.save_exchange_background(emotion_log_id, session_id, None, ai_response, True)
+        return {
+            "response": ai_response,
+            "emergency": True,
+            "hotlines": get_emergency_hotlines()
+        }
+    
+    @staticmethod
+    async def _greeting_reply(
+        emotion: str,
+        initial_message: str,
+        session_id: str,
+        emotion_log_id: str
+    ) -> Dict:
+        """Emotion-aware opening line from the LLM (None on any error)"""
+        try:
+            greeting = await ChatService.generate_reply(
+                prompt_builder.build_greeting(emotion, initial_message)
+            )
+        except Exception as e:
+            print(f"Speculative greeting error: {e!r}")
+            metrics.incr("chat.greeting_failed")
+            return {"response": None}
+        
+        metrics.incr("chat.greeting_ready")
+        conversation_store.append(session_id, "assistant", greeting)
+        # Juga ke chat_logs: riwayat dashboard dan DatabaseConversationStore memuat sapaan
+        ChatService.save_exchange_background(emotion_log_id, session_id, None, greeting, False)
+        return {"response": greeting}
+    
+    @staticmethod
+    def prefetch_greeting(
+        emotion: str,
+        initial_message: str,
+        session_id: str,
+        emotion_log_id: str
+    ) -> bool:
+        """
+        Start the opening reply in the background right after detection
+        (CHAT_SPECULATIVE_GREETING). Returns whether one was started.
+        """
+        if not settings.CHAT_SPECULATIVE_GREETING or llm_breaker.state == llm_breaker.OPEN:
+            return False
+        greeting_prefetch.start(
+            ChatService._greeting_reply(emotion, initial_message, session_id, emotion_log_id),
+            key=emotion_log_id
+        )
+        metrics.incr("chat.greeting_started")
+        return True
+    
+    @staticmethod
+    async def settle_greeting(emotion_log_id: str):
+        """
+        First chat turn of a detection: let a pending greeting finish (up to
+        CHAT_GREETING_MAX_WAIT_SECONDS) so it precedes the user turn in the
+        conversation, otherwise cancel it.
+        """
+        if not emotion_log_id:
+            return
+        result = await greeting_prefetch.get(
+            emotion_log_id, wait=settings.CHAT_GREETING_MAX_WAIT_SECONDS
+        )
+        if result is not None and result["status"] == "pending":
+            metrics.incr("chat.greeting_cancelled")
+            greeting_prefetch.discard(emotion_log_id)
+    
+    @staticmethod
+    def acknowledge_crisis(
+        emotion: str,
+        user_message: str,
+        session_id: str,
+        emotion_log_id: str,
+        chat_history: List[Dict]
+    ) -> Dict:
+        """
+        Answer a crisis message immediately with hotlines, without waiting for the LLM
+
+        The user message is queued for saving with is_crisis right away (on
+        the chat-log thread, so it lands before the reply); the LLM reply is
+        generated in the background (see BackgroundReplies).
+        """
+        metrics.incr("chat.crisis_short_circuit")
+        ChatService.save_exchange_background(emotion_log_id, session_id, user_message, None, True)
+        
+        followup_id = crisis_followups.start(
+            ChatService._crisis_followup_reply(
+                emotion, user_message, session_id, emotion_log_id, chat_history
+            )
+        )
+        return {
+            "response": CRISIS_ACKNOWLEDGMENT,
+            "emergency": True,
+            "hotlines": get_emergency_hotlines(),
+            "pending": True,
+            "followup_id": followup_id
+        }
+    
+    @staticmethod
+    async def chat(
+        emotion: str,
+        user_message: str,
+        session_id: str,
+        emotion_log_id: str,
+        chat_history: List[Dict],
+        db: Session
+    ) -> Dict:
+        """
+        Chat with Gemini AI
+        """
+        
+        await ChatService.settle_greeting(emotion_log_id)
+        chat_history = await ChatService.start_turn(session_id, user_message, chat_history)
+        
+        # Check for crisis: hotline langsung dikirim, balasan LLM menyusul
+        is_crisis = check_crisis_keywords(user_message)
+        if is_crisis:
+            return ChatService.acknowledge_crisis(
+                emotion, user_message, session_id, emotion_log_id, chat_history
+            )
+        
+        # Build prompt
+        prompt = ChatService.build_prompt(emotion, user_message, chat_history)
+        
+        fallback = True
+        try:
+            ai_response = await ChatService.generate_reply(prompt)
+            fallback = False
             
-            db.commit()
-            
-            return {
-                "response": ai_response,
-                "emergency": is_crisis,
-                "hotlines": hotlines
-            }
-            
+        except CircuitOpenError:
+            # Breaker terbuka: langsung fallback tanpa menunggu LLM
+            metrics.incr("chat.llm_short_circuited")
+            ai_response = ChatService.get_fallback_response(emotion)
+
+        except asyncio.TimeoutError:
+            print(f"Gemini timeout after {settings.CHAT_LLM_TIMEOUT_SECONDS}s")
+            metrics.incr("chat.llm_timeout")
+            ai_response = ChatService.get_fallback_response(emotion)
+
         except Exception as e:
             print(f"Gemini error: {e}")
-            db.rollback() # ✅ FIX: Rollback transaction on error
-            
-            # ✅ FIX: Fallback responses based on emotion
-            fallback_responses = {
-                'Happiness': "Senang melihatmu bahagia! Cerita lebih banyak dong tentang apa yang membuatmu senang? 😊",
-                'Sadness': "Aku di sini untukmu. Mau cerita apa yang membuatmu sedih? 💙",
-                'Anger': "Aku dengar kamu. Apa yang membuatmu marah? Mari kita bicara. 💪",
-                'Fear': "Tidak apa-apa merasa takut. Aku di sini. Mau cerita lebih lanjut? 🌸",
-                'Surprise': "Wah! Ada apa? Ceritakan! ✨",
-                'Disgust': "Sepertinya ada yang mengganggu. Mau cerita? 🌿",
-                'Neutral': "Hai! Bagaimana harimu? Ada yang mau diceritakan? 💬"
-            }
+            metrics.incr("chat.llm_error")
+            ai_response = ChatService.get_fallback_response(emotion)
+        
+        # Fallback tetap dicatat sebagai giliran assistant di conversation_store
+        # (riwayat bergantian user/assistant), tapi tidak ditulis ke chat_logs
+        conversation_store.append(session_id, "assistant", ai_response)
+        if fallback:
+            metrics.incr("chat.fallback_not_saved")
+        else:
+            try:
+                ChatService.save_exchange(
+                    db, emotion_log_id, session_id, user_message, ai_response, is_crisis
+                )
+            except Exception as e:
+                print(f"Chat save error: {e}")
+                db.rollback() # ✅ FIX: Rollback transaction on error
+        
+        return {
+            "response": ai_response,
+            "emergency": is_crisis,
+            "hotlines": get_emergency_hotlines() if is_crisis else None
+        }
+    
+    @staticmethod
+    async def chat_stream(
+        emotion: str,
+        user_message: str,
+        session_id: str,
+        emotion_log_id: str,
+        chat_history: List[Dict]
+    ) -> AsyncIterator[str]:
+        """
+        Chat with Gemini AI, streamed as Server-Sent Events
+
+        Events:
+            crisis: {"response", "hotlines"} first, only when a crisis is detected
+            token: {"text": ...} for every generated chunk
+            done:  {"response", "emergency", "hotlines"} once the reply is complete
+
+        The assembled reply is saved to ChatLog after the stream closes, on
+        the chat-log thread with its own DB session (the request session is
+        already closed). A fallback is only recorded in the conversation
+        store. A crisis message is queued for saving before anything else
+        is sent.
+        """
+        await ChatService.settle_greeting(emotion_log_id)
+        chat_history = await ChatService.start_turn(session_id, user_message, chat_history)
+        is_crisis = check_crisis_keywords(user_message)
+        prompt = ChatService.build_prompt(emotion, user_message, chat_history)
+        
+        if is_crisis:
+            # Hotline dikirim sebelum token pertama dari LLM
+            metrics.incr("chat.crisis_short_circuit")
+            ChatService.save_exchange_background(emotion_log_id, session_id, user_message, None, True)
+            yield _sse("crisis", {
+                "response": CRISIS_ACKNOWLEDGMENT,
+                "hotlines": get_emergency_hotlines()
+            })
+        
+        parts: List[str] = []
+        completed = False
+        fallback: Optional[str] = None
+        try:
+            try:
+                async for text in ChatService.stream_reply(prompt):
+                    parts.append(text)
+                    yield _sse("token", {"text": text})
+                completed = True
+            except CircuitOpenError:
+                metrics.incr("chat.llm_short_circuited")
+            except asyncio.TimeoutError:
+                print(f"Gemini stream timeout after {settings.CHAT_LLM_TIMEOUT_SECONDS}s")
+                metrics.incr("chat.llm_timeout")
+            except Exception as e:
+                print(f"Gemini stream error: {e}")
+                metrics.incr("chat.llm_error")
             
-            fallback_message = fallback_responses.get(
-                emotion, 
-                "Maaf, aku sedang mengalami gangguan. Tapi aku tetap di sini untukmu. Coba lagi ya 🙏"
-            )
+            if not parts:
+                # Belum ada token sama sekali: kirim fallback (tidak ke chat_logs, sama seperti chat())
+                fallback = ChatService.get_fallback_response(emotion)
+                yield _sse("token", {"text": fallback})
+                yield _sse("done", {
+                    "response": fallback,
+                    "emergency": is_crisis,
+                    "hotlines": get_emergency_hotlines() if is_crisis else None
+                })
+                return
             
-            return {
-                "response": fallback_message,
+            yield _sse("done", {
+                "response": "".join(parts).strip(),
                 "emergency": is_crisis,
                 "hotlines": get_emergency_hotlines() if is_crisis else None
-            }
+            })
+        finally:
+            if fallback is not None:
+                conversation_store.append(session_id, "assistant", fallback)
+                metrics.incr("chat.fallback_not_saved")
+            # Simpan juga balasan parsial kalau client sudah melihat sebagian token
+            elif parts:
+                if not completed:
+                    metrics.incr("chat.stream_incomplete")
+                ai_response = "".join(parts).strip()
+                conversation_store.append(session_id, "assistant", ai_response)
+                # Pesan user krisis sudah disimpan di awal
+                ChatService.save_exchange_background(
+                    emotion_log_id, session_id,
+                    None if is_crisis else user_message,
+                    ai_response, is_crisis
+                )
     
     @staticmethod
     def get_chat_history(
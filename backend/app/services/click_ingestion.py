@@ -0,0 +1,123 @@
+"""
+Batched Recommendation Click Ingestion
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional
+from ..config import settings
+from ..database import SessionLocal
+from ..utils.metrics import metrics
+from .recommendation_service import RecommendationService
+
+# Penanda untuk menghentikan worker setelah semua klik sebelumnya ditulis
+_STOP = object()
+
+
+class ClickIngestionQueue:
+    """
+    Bounded in-memory queue for recommendation clicks.
+
+    Clicks are acknowledged as soon as they are queued. A background worker
+    collects them per flush window (CLICK_FLUSH_INTERVAL_SECONDS or
+    CLICK_BATCH_SIZE, whichever comes first) and writes each window with a
+    single multi-row INSERT.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        """Start the flush worker (call from the startup event)"""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.CLICK_QUEUE_MAX_SIZE)
+        self._worker = asyncio.create_task(self._run())
+        print(f"✓ Click ingestion queue started (max {settings.CLICK_QUEUE_MAX_SIZE})")
+
+    async def stop(self):
+        """Drain every queued click to the database, then stop the worker"""
+        if not self.is_running:
+            return
+        await self._queue.put(_STOP)
+        await self._worker
+        self._worker = None
+        print("✓ Click ingestion queue drained")
+
+    def submit(self, click: Dict) -> bool:
+        """
+        Queue one click without waiting for the database
+
+        Returns:
+            False if the queue is not running or is full (click dropped)
+        """
+        if not self.is_running:
+            return False
+        try:
+            self._queue.put_nowait(click)
+        except asyncio.QueueFull:
+            metrics.incr("clicks.overflow")
+            return False
+        metrics.incr("clicks.queued")
+        metrics.set_gauge("clicks.queue_depth", self._queue.qsize())
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = loop.time() + settings.CLICK_FLUSH_INTERVAL_SECONDS
+            while len(batch) < settings.CLICK_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict]):
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            # Tulis di thread pool agar event loop tidak ikut menunggu DB
+            written = await loop.run_in_executor(None, self._write_batch, batch)
+            metrics.incr("clicks.written", written)
+        except Exception as e:
+            print(f"Click ingestion error ({len(batch)} clicks lost): {e}")
+            metrics.incr("clicks.failed", len(batch))
+        finally:
+            metrics.observe("clicks.flush_seconds", time.perf_counter() - start)
+            metrics.observe("clicks.batch_size", len(batch))
+            metrics.set_gauge("clicks.queue_depth", self._queue.qsize())
+
+    @staticmethod
+    def _write_batch(batch: List[Dict]) -> int:
+        db = SessionLocal()
+        try:
+            return RecommendationService.track_clicks_bulk(batch, db)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Global instance
+click_ingestion = ClickIngestionQueue()
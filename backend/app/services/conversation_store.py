@@ -0,0 +1,121 @@
+"""
+Server-side Conversation Store (recent chat turns per session_id)
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Tuple
+from ..config import settings
+from ..database import SessionLocal
+from ..models.chat_log import ChatLog
+from ..utils.metrics import metrics
+
+
+class ConversationStore:
+    """
+    In-memory ring of the last CONVERSATION_MAX_TURNS turns per session.
+
+    Sessions are evicted least-recently-used beyond CONVERSATION_MAX_SESSIONS
+    and after CONVERSATION_TTL_SECONDS without activity. State is per worker;
+    use DatabaseConversationStore when requests of one session may land on
+    different workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Tuple[Deque[Dict], float]]" = OrderedDict()
+
+    def get_history(self, session_id: str) -> List[Dict]:
+        """Recent turns as [{"role", "content"}], oldest first"""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and now - entry[1] > settings.CONVERSATION_TTL_SECONDS:
+                del self._sessions[session_id]
+                entry = None
+            if entry is None:
+                metrics.incr("conversation_store.miss")
+                return []
+            self._sessions.move_to_end(session_id)
+            metrics.incr("conversation_store.hit")
+            return list(entry[0])
+
+    async def load_history(self, session_id: str) -> List[Dict]:
+        """get_history for async callers (in memory: no I/O, called inline)"""
+        return self.get_history(session_id)
+
+    def append(self, session_id: str, role: str, content: str):
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None or now - entry[1] > settings.CONVERSATION_TTL_SECONDS:
+                turns: Deque[Dict] = deque(maxlen=settings.CONVERSATION_MAX_TURNS)
+            else:
+                turns = entry[0]
+            turns.append({"role": role, "content": content})
+            self._sessions[session_id] = (turns, now)
+
+            while len(self._sessions) > settings.CONVERSATION_MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+                metrics.incr("conversation_store.evicted")
+            metrics.set_gauge("conversation_store.sessions", len(self._sessions))
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class DatabaseConversationStore:
+    """
+    Shared backend for multi-worker deployments: recent turns are read
+    from chat_logs (already written for every exchange, indexed on
+    session_id), so every worker sees the same conversation.
+    """
+
+    def get_history(self, session_id: str) -> List[Dict]:
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(ChatLog.is_user, ChatLog.message, ChatLog.response)
+                .filter(ChatLog.session_id == session_id)
+                # Timestamp sama (satu exchange): balasan dulu, jadi setelah dibalik
+                # pesan user mendahului balasannya; id membuat urutan selalu tetap
+                .order_by(ChatLog.timestamp.desc(), ChatLog.is_user.asc(), ChatLog.id.desc())
+                .limit(settings.CONVERSATION_MAX_TURNS)
+                .all()
+            )
+        finally:
+            db.close()
+        return [
+            {"role": "user", "content": message} if is_user
+            else {"role": "assistant", "content": response}
+            for is_user, message, response in reversed(rows)
+        ]
+
+    async def load_history(self, session_id: str) -> List[Dict]:
+        """get_history on a worker thread, so the query does not block the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_history, session_id)
+
+    def append(self, session_id: str, role: str, content: str):
+        """No-op: ChatService.save_exchange already persists every turn"""
+
+    def clear(self, session_id: str):
+        """No-op: chat logs are kept for the admin dashboard"""
+
+
+BACKENDS = {
+    "memory": ConversationStore,
+    "database": DatabaseConversationStore,
+}
+
+
+def create_conversation_store(backend: str = None):
+    backend = (backend or settings.CONVERSATION_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown CONVERSATION_BACKEND '{backend}' (choose from {sorted(BACKENDS)})")
+    return BACKENDS[backend]()
+
+
+# Global instance
+conversation_store = create_conversation_store()
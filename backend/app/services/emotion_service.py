@@ -42,8 +42,8 @@ class EmotionService:
         # Detect and crop face
         face, face_detected = detect_and_crop_face(image)
         
-        # Preprocess for model
-        preprocessed = preprocess_for_model(face)
+        # Preprocess for model (resolusi input model yang dimuat)
+        preprocessed = preprocess_for_model(face, emotion_model.input_size)
         
         # Predict emotion
         emotion, confidence, probs = emotion_model.predict(preprocessed)
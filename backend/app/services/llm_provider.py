@@ -0,0 +1,214 @@
+"""
+LLM Provider Layer (Gemini REST / OpenAI-compatible)
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Optional
+import httpx
+from ..config import settings
+
+GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.8,
+    "top_k": 40,
+    "max_output_tokens": 512,
+}
+
+
+class LLMHTTPError(Exception):
+    """Non-2xx reply of an LLM backend (the message never contains the request URL)"""
+
+    def __init__(self, provider: str, status_code: int):
+        super().__init__(f"{provider} returned HTTP {status_code}")
+        self.provider = provider
+        self.status_code = status_code
+
+
+class LLMProvider(ABC):
+    """Interface every chat LLM backend implements"""
+
+    name = "base"
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: str = "",
+        timeout: float = 30.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self._timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """One persistent, pooled client per provider (keep-alive connections are reused)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self._timeout, limits=self._limits)
+        return self._client
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        """Return the full reply for a prompt"""
+
+    @abstractmethod
+    def stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield reply text chunks as they are generated (an async generator)"""
+
+    def _raise_for_status(self, response: httpx.Response):
+        # Pesan HTTPStatusError dari httpx memuat URL request, dan pesan itu dicetak ke log
+        if response.is_error:
+            raise LLMHTTPError(self.name, response.status_code)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+    """Yield the payload of every `data:` line of an SSE response"""
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            yield line[len("data:"):].strip()
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini via the generativelanguage REST API"""
+
+    name = "gemini"
+
+    def _url(self, action: str) -> str:
+        return f"{self.base_url}/v1beta/models/{self.model}:{action}"
+
+    def _headers(self) -> Dict:
+        # API key di header, bukan query string (?key=) yang ikut tercatat bersama URL
+        return {"x-goog-api-key": self.api_key}
+
+    def _body(self, prompt: str) -> Dict:
+        return {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": GENERATION_CONFIG["temperature"],
+                "topP": GENERATION_CONFIG["top_p"],
+                "topK": GENERATION_CONFIG["top_k"],
+                "maxOutputTokens": GENERATION_CONFIG["max_output_tokens"],
+            }
+        }
+
+    @staticmethod
+    def _text(payload: Dict) -> str:
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.client.post(
+            self._url("generateContent"),
+            headers=self._headers(),
+            json=self._body(prompt)
+        )
+        self._raise_for_status(response)
+        text = self._text(response.json())
+        if not text:
+            raise ValueError("Gemini returned no text (blocked or empty candidate)")
+        return text.strip()
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        async with self.client.stream(
+            "POST",
+            self._url("streamGenerateContent"),
+            params={"alt": "sse"},
+            headers=self._headers(),
+            json=self._body(prompt)
+        ) as response:
+            self._raise_for_status(response)
+            async for data in _iter_sse_data(response):
+                text = self._text(json.loads(data))
+                if text:
+                    yield text
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Any server speaking the OpenAI /v1/chat/completions API"""
+
+    name = "openai"
+
+    def _body(self, prompt: str, stream: bool) -> Dict:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": GENERATION_CONFIG["temperature"],
+            "top_p": GENERATION_CONFIG["top_p"],
+            "max_tokens": GENERATION_CONFIG["max_output_tokens"],
+            "stream": stream,
+        }
+
+    def _headers(self) -> Dict:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.client.post(
+            f"{self.base_url}/v1/chat/completions",
+            headers=self._headers(),
+            json=self._body(prompt, stream=False)
+        )
+        self._raise_for_status(response)
+        text = response.json()["choices"][0]["message"].get("content") or ""
+        if not text:
+            raise ValueError("LLM returned an empty completion")
+        return text.strip()
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        async with self.client.stream(
+            "POST",
+            f"{self.base_url}/v1/chat/completions",
+            headers=self._headers(),
+            json=self._body(prompt, stream=True)
+        ) as response:
+            self._raise_for_status(response)
+            async for data in _iter_sse_data(response):
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)["choices"][0].get("delta", {})
+                if delta.get("content"):
+                    yield delta["content"]
+
+
+PROVIDERS = {
+    GeminiProvider.name: (GeminiProvider, "https://generativelanguage.googleapis.com"),
+    OpenAICompatibleProvider.name: (OpenAICompatibleProvider, "http://localhost:8001"),
+}
+
+
+def create_llm_provider(**overrides) -> LLMProvider:
+    """Build the provider selected by LLM_PROVIDER (keyword args override settings)"""
+    name = overrides.pop("provider", settings.LLM_PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM_PROVIDER '{name}', expected one of {list(PROVIDERS)}")
+
+    provider_cls, default_url = PROVIDERS[name]
+    options = {
+        "base_url": settings.LLM_BASE_URL or default_url,
+        "model": settings.LLM_MODEL,
+        "api_key": settings.LLM_API_KEY or settings.GEMINI_API_KEY,
+        "timeout": settings.LLM_HTTP_TIMEOUT_SECONDS,
+        "max_connections": settings.LLM_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+    }
+    options.update(overrides)
+    return provider_cls(**options)
+
+
+# Global instance
+llm_provider = create_llm_provider()
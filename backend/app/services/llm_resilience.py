@@ -0,0 +1,174 @@
+"""
+LLM Resilience: Circuit Breaker + Hedged Requests
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+from ..config import settings
+from ..utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed → Open → Half-open breaker over a rolling window of calls.
+
+    Opens when, over the last LLM_BREAKER_WINDOW calls (at least
+    LLM_BREAKER_MIN_CALLS), the error ratio or the slow-call ratio
+    (latency > LLM_BREAKER_SLOW_CALL_SECONDS) reaches its threshold.
+    After LLM_BREAKER_OPEN_SECONDS it lets LLM_BREAKER_HALF_OPEN_PROBES
+    test calls through; all succeeding closes it, any failure reopens it.
+    Runs on the event loop only, so no locking.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    _STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = self.CLOSED
+        self._outcomes: Deque[tuple] = deque(maxlen=settings.LLM_BREAKER_WINDOW)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        metrics.set_gauge(f"{self.name}.state", self._STATE_GAUGE[self.state])
+
+    def _transition(self, new_state: str):
+        if new_state == self.state:
+            return
+        print(f"⚡ Circuit breaker '{self.name}': {self.state} → {new_state}")
+        metrics.incr(f"{self.name}.transition.{self.state}_to_{new_state}")
+        self.state = new_state
+        metrics.set_gauge(f"{self.name}.state", self._STATE_GAUGE[new_state])
+
+        if new_state == self.OPEN:
+            self._opened_at = time.monotonic()
+        if new_state == self.HALF_OPEN:
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+        if new_state == self.CLOSED:
+            self._outcomes.clear()
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the LLM now (reserves a probe slot when half-open)"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < settings.LLM_BREAKER_OPEN_SECONDS:
+                metrics.incr(f"{self.name}.rejected")
+                return False
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= settings.LLM_BREAKER_HALF_OPEN_PROBES:
+                metrics.incr(f"{self.name}.rejected")
+                return False
+            self._probes_in_flight += 1
+
+        return True
+
+    def record_success(self, latency: float):
+        slow = latency > settings.LLM_BREAKER_SLOW_CALL_SECONDS
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if slow:
+                self._transition(self.OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= settings.LLM_BREAKER_HALF_OPEN_PROBES:
+                self._transition(self.CLOSED)
+            return
+        self._record(failed=False, slow=slow)
+
+    def record_failure(self):
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._transition(self.OPEN)
+            return
+        self._record(failed=True, slow=False)
+
+    def record_cancelled(self):
+        """Release a half-open probe slot without counting an outcome"""
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _record(self, failed: bool, slow: bool):
+        self._outcomes.append((failed, slow))
+        if self.state != self.CLOSED or len(self._outcomes) < settings.LLM_BREAKER_MIN_CALLS:
+            return
+        calls = len(self._outcomes)
+        error_ratio = sum(1 for f, _ in self._outcomes if f) / calls
+        slow_ratio = sum(1 for _, s in self._outcomes if s) / calls
+        if (error_ratio >= settings.LLM_BREAKER_ERROR_RATIO
+                or slow_ratio >= settings.LLM_BREAKER_SLOW_CALL_RATIO):
+            self._transition(self.OPEN)
+
+
+class LatencyTracker:
+    """Rolling latency samples for percentile estimates (hedge delay)"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, latency: float):
+        self._samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if len(self._samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(pct / 100 * len(ordered)))
+        return ordered[index]
+
+
+async def hedged(call: Callable[[], Awaitable[T]], hedge_after: Optional[float]) -> T:
+    """
+    Run `call`; if it has not finished after `hedge_after` seconds, start a
+    second identical call and return whichever succeeds first.
+
+    Every call still running when this returns, raises or is cancelled
+    (caller deadline, client disconnect) is cancelled and awaited, so no
+    upstream request outlives the caller.
+    """
+    primary = asyncio.ensure_future(call())
+    tasks = [primary]
+    try:
+        if hedge_after is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        metrics.incr("llm.hedge_fired")
+        backup = asyncio.ensure_future(call())
+        tasks.append(backup)
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is backup:
+                        metrics.incr("llm.hedge_won")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        unfinished = [task for task in tasks if not task.done()]
+        for task in unfinished:
+            task.cancel()
+        if unfinished:
+            # Tunggu pembatalan selesai (koneksi httpx kembali ke pool)
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+
+# Global instances (per worker)
+llm_breaker = CircuitBreaker("llm_breaker")
+llm_latency = LatencyTracker()
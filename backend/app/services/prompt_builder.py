@@ -0,0 +1,133 @@
+"""
+Prompt Builder (precompiled per-emotion templates + token-budgeted history)
+"""
+from typing import Dict, List, Tuple
+from ..config import settings
+from ..utils.metrics import metrics
+
+SYSTEM_PROMPT_TEMPLATE = """Kamu adalah AI companion yang empatik dan penuh perhatian.
+User saat ini merasakan emosi: {emotion}
+
+PERAN:
+- Pendengar yang baik dan empati
+- Berikan dukungan emosional tulus
+- Ajukan pertanyaan terbuka
+- Berikan perspektif positif tanpa abaikan perasaan
+- Bahasa Indonesia natural dan hangat
+
+GAYA:
+- Informal, ramah, hangat
+- Emoji secukupnya (1-2 per pesan)
+- Jangan formal/kaku
+- Jawaban singkat 2-4 kalimat
+- Fokus mendengar, bukan menggurui
+
+BATASAN:
+- BUKAN pengganti profesional kesehatan mental
+- Jika ada tanda krisis (bunuh diri, sakiti diri), SEGERA sarankan bantuan profesional
+- Jangan diagnosis medis
+- Jangan saran medis/terapi spesifik
+
+{guide}"""
+
+EMOTION_GUIDE = {
+    'Happiness': "User bahagia! Rayakan, tunjukkan antusiasme, dorong berbagi lebih.",
+    'Sadness': "User sedih. Empati mendalam, validasi perasaan, beri ruang cerita.",
+    'Anger': "User marah. Dengar sabar, validasi kemarahan, jangan perburuk.",
+    'Fear': "User takut/cemas. Beri rasa aman, validasi kekhawatiran.",
+    'Surprise': "User terkejut. Tunjukkan ketertarikan genuine, bantu proses.",
+    'Disgust': "User jijik/ga nyaman. Validasi perasaan, bantu bicara.",
+    'Neutral': "User netral. Ciptakan percakapan hangat, undang berbagi."
+}
+
+CONVERSATION_HEADER = "\n\nPERCAKAPAN:\n"
+
+GREETING_INSTRUCTION = (
+    "\n\nUser baru saja memindai wajahnya dan sudah melihat pesan pembuka ini:\n"
+    "\"{initial_message}\"\n"
+    "Tulis SATU pesan lanjutan singkat (1-2 kalimat) yang hangat untuk mengajak "
+    "user bercerita. Jangan ulangi pesan pembuka.\nASSISTANT:"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token, the usual rule of thumb
+    for Gemini/GPT tokenizers). Good enough for budgeting without
+    shipping a tokenizer.
+    """
+    return (len(text) + 3) // 4
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - 1)].rstrip() + "…"
+
+
+class PromptBuilder:
+    """System prompt per emotion compiled once; history fitted to a token budget"""
+
+    def __init__(self):
+        self._system_prompts: Dict[str, Tuple[str, int]] = {}
+        for emotion, guide in EMOTION_GUIDE.items():
+            self._system_prompts[emotion] = self._compile(emotion, guide)
+
+    @staticmethod
+    def _compile(emotion: str, guide: str) -> Tuple[str, int]:
+        """(system prompt, its token count including the conversation header)"""
+        prompt = SYSTEM_PROMPT_TEMPLATE.format(emotion=emotion, guide=guide)
+        return prompt, estimate_tokens(prompt + CONVERSATION_HEADER)
+
+    def _system_prompt(self, emotion: str) -> Tuple[str, int]:
+        compiled = self._system_prompts.get(emotion)
+        if compiled is None:
+            # Emosi di luar daftar: tidak di-cache (nilainya dari client)
+            compiled = self._compile(emotion, EMOTION_GUIDE['Neutral'])
+        return compiled
+
+    def system_prompt(self, emotion: str) -> str:
+        return self._system_prompt(emotion)[0]
+
+    def build(self, emotion: str, user_message: str, chat_history: List[Dict]) -> str:
+        """
+        System prompt + as much recent history as fits CHAT_PROMPT_TOKEN_BUDGET
+        + the new user message. The oldest turns are dropped first and any
+        single history message is cut to CHAT_HISTORY_MESSAGE_MAX_TOKENS.
+        """
+        system, system_tokens = self._system_prompt(emotion)
+        closing = f"USER: {user_message}\nASSISTANT:"
+        used = system_tokens + estimate_tokens(closing)
+        budget = settings.CHAT_PROMPT_TOKEN_BUDGET - used
+
+        lines: List[str] = []
+        for msg in reversed(chat_history):
+            content = _truncate(msg.get('content', ''), settings.CHAT_HISTORY_MESSAGE_MAX_TOKENS)
+            line = f"{msg.get('role', 'user').upper()}: {content}\n"
+            cost = estimate_tokens(line)
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+            used += cost
+
+        dropped = len(chat_history) - len(lines)
+        if dropped:
+            metrics.incr("chat.prompt_history_dropped", dropped)
+        metrics.observe("chat.prompt_tokens", used)
+        metrics.observe("chat.prompt_history_turns", len(lines))
+
+        lines.reverse()
+        return "".join([system, CONVERSATION_HEADER, *lines, closing])
+
+    def build_greeting(self, emotion: str, initial_message: str) -> str:
+        """Prompt for the speculative opening reply (no history yet)"""
+        system, system_tokens = self._system_prompt(emotion)
+        instruction = GREETING_INSTRUCTION.format(initial_message=initial_message)
+        metrics.observe("chat.prompt_tokens", system_tokens + estimate_tokens(instruction))
+        return system + instruction
+
+
+# Global instance (templates compiled at import / startup)
+prompt_builder = PromptBuilder()
@@ -0,0 +1,112 @@
+"""
+Recommendation Catalog Hot Reload (file mtime poll + admin endpoint)
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+from ..config import settings
+from ..utils.metrics import metrics
+from . import recommendation_service
+from .recommendation_ranker import recommendation_ranker
+from .recommendation_service import RecommendationBundles, load_catalog
+
+
+class CatalogReloader:
+    """
+    Watches RECOMMENDATION_CATALOG_PATH and swaps in a new compiled catalog
+    when the file changes.
+
+    The file is read, validated and compiled in the thread pool; only a
+    fully built RecommendationBundles is installed (one reference swap),
+    so a request sees either the old catalog or the new one. The click
+    ranking order is applied before the swap, so a reload never falls
+    back to the curated order. A broken file is reported and the current
+    catalog stays in place.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mtime = self._current_mtime()
+        self._lock: Optional[asyncio.Lock] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _build(self) -> RecommendationBundles:
+        return RecommendationBundles(*load_catalog(self.path))
+
+    async def reload(self, force: bool = False) -> Dict:
+        """
+        Reload the catalog if the file changed (or always with force)
+
+        Raises:
+            OSError / ValueError if the file cannot be loaded (nothing is swapped)
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            mtime = self._current_mtime()
+            current = recommendation_service.current_bundles()
+            if not force and mtime == self._mtime:
+                return {"reloaded": False, "version": current.version}
+
+            start = time.perf_counter()
+            try:
+                bundles = await asyncio.get_running_loop().run_in_executor(None, self._build)
+            except Exception:
+                metrics.incr("recommendations.catalog_reload_failed")
+                # Jangan coba file yang sama terus-menerus; tunggu perubahan berikutnya
+                self._mtime = mtime
+                raise
+
+            # Urutan ranking saat ini langsung dipakai, tidak menunggu rerank berikutnya
+            bundles = recommendation_ranker.apply_order(bundles)
+            recommendation_service.install_bundles(bundles)
+            self._mtime = mtime
+            metrics.incr("recommendations.catalog_reloaded")
+            metrics.observe("recommendations.catalog_reload_seconds", time.perf_counter() - start)
+            print(f"✓ Recommendation catalog reloaded (version {bundles.version}) from {self.path}")
+            return {
+                "reloaded": True,
+                "version": bundles.version,
+                "emotions": len(bundles.catalog),
+                "items": sum(len(titles) for titles in bundles.titles.values())
+            }
+
+    async def start(self):
+        """Start polling the file (startup event)"""
+        if settings.RECOMMENDATION_CATALOG_POLL_SECONDS <= 0 or self.is_running:
+            return
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self.is_running:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.RECOMMENDATION_CATALOG_POLL_SECONDS)
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"⚠ Recommendation catalog reload failed, keeping version "
+                      f"{recommendation_service.current_bundles().version}: {e}")
+
+
+# Global instance (per worker)
+catalog_reloader = CatalogReloader(settings.RECOMMENDATION_CATALOG_PATH)
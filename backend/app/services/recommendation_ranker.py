@@ -0,0 +1,282 @@
+"""
+Click-feedback Recommendation Ranking (Thompson sampling)
+"""
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert, update
+from ..config import settings
+from ..database import SessionLocal
+from ..models.recommendation_rank_state import RecommendationRankState
+from ..utils.metrics import metrics
+from . import recommendation_service
+from .recommendation_service import RecommendationBundles, RecommendationService
+
+ItemKey = Tuple[str, str, str]  # (emotion, category, title)
+
+
+class RecommendationRanker:
+    """
+    Beta-Bernoulli bandit per (emotion, category, item).
+
+    Requests only bump in-memory counters: an impression for every item of
+    a served bundle and a click from /track. Every
+    RECOMMENDATION_RANK_INTERVAL_SECONDS items are ordered by posterior
+    mean, except RECOMMENDATION_RANK_EXPLORE_SLOTS positions after the top
+    item, which go to a Thompson draw kept for
+    RECOMMENDATION_RANK_EXPLORE_SECONDS. Only when an order actually
+    changes is the catalog compiled into new bundles and swapped in, so
+    serving stays a dict lookup of pre-serialized bytes and bundle ETags
+    stay valid between changes. Categories with fewer than
+    RECOMMENDATION_RANK_MIN_CLICKS clicks keep the curated order. Counts
+    since the last snapshot are added to recommendation_rank_state every
+    RECOMMENDATION_RANK_SNAPSHOT_SECONDS (additive, so several workers can
+    share the table) and the totals are restored on startup. Runs on the
+    event loop only, so no locking.
+    """
+
+    def __init__(self):
+        self._clicks: Dict[ItemKey, float] = {}
+        self._impressions: Dict[ItemKey, float] = {}
+        # Tambahan sejak snapshot terakhir
+        self._new_clicks: Dict[ItemKey, float] = {}
+        self._new_impressions: Dict[ItemKey, float] = {}
+        # Item eksplorasi per (emotion, category) dan kapan diundi ulang
+        self._explore: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        self._next_explore_draw = 0.0
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    # --- Request path (microseconds) ---
+
+    def record_impression(self, emotion: str, category: Optional[str] = None):
+        """Every item of the served bundle (one category or all) was shown"""
+        titles = recommendation_service.current_bundles().titles
+        categories = RecommendationService.CATEGORIES if category is None else (category,)
+        impressions, new = self._impressions, self._new_impressions
+        for name in categories:
+            for title in titles.get((emotion, name), ()):
+                key = (emotion, name, title)
+                impressions[key] = impressions.get(key, 0.0) + 1
+                new[key] = new.get(key, 0.0) + 1
+
+    def record_click(self, emotion: str, category: str, title: str):
+        # Hanya item yang ada di katalog (judul dari client)
+        if title not in recommendation_service.current_bundles().titles.get((emotion, category), ()):
+            return
+        key = (emotion, category, title)
+        self._clicks[key] = self._clicks.get(key, 0.0) + 1
+        self._new_clicks[key] = self._new_clicks.get(key, 0.0) + 1
+
+    # --- Ranking ---
+
+    def _counts(self, key: ItemKey) -> Tuple[float, float]:
+        clicks = self._clicks.get(key, 0.0)
+        return clicks, max(self._impressions.get(key, 0.0) - clicks, 0.0)
+
+    def _mean(self, key: ItemKey) -> float:
+        """Posterior mean click rate, Beta(1, 1) prior"""
+        clicks, misses = self._counts(key)
+        return (clicks + 1) / (clicks + misses + 2)
+
+    def _sample(self, key: ItemKey) -> float:
+        clicks, misses = self._counts(key)
+        return random.betavariate(clicks + 1, misses + 1)
+
+    def _order(self, emotion: str, category: str, titles: List[str], redraw: bool) -> List[str]:
+        """
+        Titles by posterior mean (ties keep the current order); the
+        exploration slots right after the top item hold the items of the
+        last Thompson draw
+        """
+        ranked = sorted(titles, key=lambda t: self._mean((emotion, category, t)), reverse=True)
+        slots = min(settings.RECOMMENDATION_RANK_EXPLORE_SLOTS, len(ranked) - 1)
+        if slots <= 0:
+            return ranked
+
+        explore = self._explore.get((emotion, category), ())
+        if redraw or not set(explore) <= set(ranked[1:]):
+            samples = {t: self._sample((emotion, category, t)) for t in ranked[1:]}
+            explore = tuple(sorted(ranked[1:], key=samples.get, reverse=True)[:slots])
+            self._explore[(emotion, category)] = explore
+        rest = [t for t in ranked[1:] if t not in explore]
+        return [ranked[0], *explore, *rest]
+
+    def _reorder(self, bundles: RecommendationBundles, redraw: bool) -> Tuple[Dict, int]:
+        """Catalog of `bundles` in ranked order + number of categories whose order changed"""
+        catalog = {}
+        reordered = 0
+
+        for emotion, categories in bundles.catalog.items():
+            catalog[emotion] = dict(categories)
+            for category in RecommendationService.CATEGORIES:
+                data = categories.get(category)
+                if not data:
+                    continue
+                titles = bundles.titles.get((emotion, category), ())
+                total_clicks = sum(self._clicks.get((emotion, category, t), 0.0) for t in titles)
+                if total_clicks < settings.RECOMMENDATION_RANK_MIN_CLICKS:
+                    continue
+                position = {t: i for i, t in enumerate(self._order(emotion, category, list(titles), redraw))}
+                items = sorted(
+                    data.get('items', []),
+                    key=lambda item: position[RecommendationService.item_title(item)]
+                )
+                if items == data.get('items', []):
+                    continue
+                catalog[emotion][category] = {**data, 'items': items}
+                reordered += 1
+        return catalog, reordered
+
+    def apply_order(self, bundles: RecommendationBundles) -> RecommendationBundles:
+        """
+        `bundles` with the current ranked order (no new exploration draw),
+        for a freshly loaded catalog that is about to be installed
+        """
+        if not settings.RECOMMENDATION_RANKING_ENABLED:
+            return bundles
+        catalog, reordered = self._reorder(bundles, redraw=False)
+        return RecommendationBundles(catalog, bundles.version) if reordered else bundles
+
+    def rerank(self) -> int:
+        """
+        Reorder the catalog and swap in new bundles if any order changed
+
+        Returns the number of categories whose order changed.
+        """
+        start = time.perf_counter()
+        bundles = recommendation_service.current_bundles()
+        now = time.monotonic()
+        redraw = now >= self._next_explore_draw
+        if redraw:
+            self._next_explore_draw = now + settings.RECOMMENDATION_RANK_EXPLORE_SECONDS
+        catalog, reordered = self._reorder(bundles, redraw)
+
+        # Bundle (dan ETag) hanya diganti kalau urutan benar-benar berubah
+        if reordered:
+            recommendation_service.install_bundles(RecommendationBundles(catalog, bundles.version))
+            metrics.incr("recommendations.rerank_changed")
+        metrics.incr("recommendations.rerank")
+        metrics.observe("recommendations.rerank_seconds", time.perf_counter() - start)
+        return reordered
+
+    # --- Persistence ---
+
+    def restore(self):
+        """Load the latest snapshot (blocking, call from a thread)"""
+        db = SessionLocal()
+        try:
+            rows = db.query(RecommendationRankState).all()
+        finally:
+            db.close()
+        for row in rows:
+            key = (row.emotion, row.recommendation_type, row.recommendation_title)
+            self._clicks[key] = row.clicks
+            self._impressions[key] = row.impressions
+        print(f"✓ Recommendation ranking restored ({len(rows)} items)")
+
+    @staticmethod
+    def _write_snapshot(rows: List[Tuple[ItemKey, float, float]]):
+        db = SessionLocal()
+        try:
+            table = RecommendationRankState.__table__
+            now = datetime.utcnow()
+            for (emotion, category, title), clicks, impressions in rows:
+                match = (
+                    (table.c.emotion == emotion)
+                    & (table.c.recommendation_type == category)
+                    & (table.c.recommendation_title == title)
+                )
+                updated = db.execute(
+                    update(table).where(match).values(
+                        clicks=table.c.clicks + clicks,
+                        impressions=table.c.impressions + impressions,
+                        updated_at=now
+                    )
+                )
+                if updated.rowcount == 0:
+                    db.execute(insert(table).values(
+                        emotion=emotion,
+                        recommendation_type=category,
+                        recommendation_title=title,
+                        clicks=clicks,
+                        impressions=impressions,
+                        updated_at=now
+                    ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def snapshot(self):
+        """Add the counts since the last snapshot to the database (in the thread pool)"""
+        if not self._new_clicks and not self._new_impressions:
+            return
+        # Ambil delta di event loop, tulis di thread pool
+        new_clicks, self._new_clicks = self._new_clicks, {}
+        new_impressions, self._new_impressions = self._new_impressions, {}
+        keys = set(new_clicks) | set(new_impressions)
+        rows = [(k, new_clicks.get(k, 0.0), new_impressions.get(k, 0.0)) for k in keys]
+        start = time.perf_counter()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_snapshot, rows)
+            metrics.incr("recommendations.rank_snapshots")
+        except Exception as e:
+            # Delta dikembalikan, dicoba lagi di snapshot berikutnya
+            for key, value in new_clicks.items():
+                self._new_clicks[key] = self._new_clicks.get(key, 0.0) + value
+            for key, value in new_impressions.items():
+                self._new_impressions[key] = self._new_impressions.get(key, 0.0) + value
+            print(f"Recommendation rank snapshot error: {e}")
+            metrics.incr("recommendations.rank_snapshot_failed")
+        finally:
+            metrics.observe("recommendations.rank_snapshot_seconds", time.perf_counter() - start)
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Restore the snapshot and start the rerank/snapshot loop (startup event)"""
+        if not settings.RECOMMENDATION_RANKING_ENABLED or self.is_running:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.restore)
+            self.rerank()
+        except Exception as e:
+            print(f"⚠ Could not restore recommendation ranking: {e}")
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the loop and write a final snapshot"""
+        if not self.is_running:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        await self.snapshot()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_snapshot = loop.time() + settings.RECOMMENDATION_RANK_SNAPSHOT_SECONDS
+        while True:
+            await asyncio.sleep(settings.RECOMMENDATION_RANK_INTERVAL_SECONDS)
+            try:
+                self.rerank()
+            except Exception as e:
+                print(f"Recommendation rerank error: {e}")
+            if loop.time() >= next_snapshot:
+                await self.snapshot()
+                next_snapshot = loop.time() + settings.RECOMMENDATION_RANK_SNAPSHOT_SECONDS
+
+
+# Global instance (per worker)
+recommendation_ranker = RecommendationRanker()
@@ -1,224 +1,28 @@
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from ..models.recommendation_click import RecommendationClick
+from ..models.emotion_log import EmotionLog
+from ..schemas.recommendation import RecommendationResponse
+from ..config import settings
+from ..utils.metrics import metrics
+import hashlib
+import json
 import uuid
 
 class RecommendationService:
     """Service for recommendations"""
     
-    # Recommendation database
-    # NOTE: Link makanan diganti ke Google Maps Search agar dinamis sesuai lokasi user
-    RECOMMENDATIONS = {
-        'Happiness': {
-            'music': {
-                'items': [
-                    {'title': 'Happy - Pharrell Williams', 'link': 'https://www.youtube.com/watch?v=ZbZSe6N_BXs', 'type': 'youtube'},
-                    {'title': 'Don\'t Stop Me Now - Queen', 'link': 'https://www.youtube.com/watch?v=HgzGwKwLmgM', 'type': 'youtube'},
-                    {'title': 'Walking on Sunshine - Katrina', 'link': 'https://www.youtube.com/watch?v=iPUmE-tne5U', 'type': 'youtube'},
-                    {'title': 'Good Vibrations - Beach Boys', 'link': 'https://www.youtube.com/watch?v=Eab_beh07HU', 'type': 'youtube'}
-                ],
-                'description': 'Musik upbeat untuk memperbesar kebahagiaanmu! 🎵'
-            },
-            'food': {
-                'items': [
-                    {'title': 'Pizza Party 🍕', 'link': 'https://www.google.com/maps/search/pizza+near+me', 'description': 'Pizza favorit di sekitarmu'},
-                    {'title': 'Sweet Desserts 🍰', 'link': 'https://www.google.com/maps/search/cake+bakery+near+me', 'description': 'Dessert manis untuk merayakan hari'},
-                    {'title': 'Fresh Smoothie 🍓', 'link': 'https://www.google.com/maps/search/smoothie+juice+bar+near+me', 'description': 'Minuman segar penuh warna'}
-                ],
-                'description': 'Makanan ceria untuk suasana hati yang ceria! 🌈'
-            },
-            'activity': {
-                'items': [
-                    'Panggil teman untuk hang out atau video call 📞',
-                    'Main game favorit atau coba game baru 🎮',
-                    'Buat konten kreatif (foto, video, gambar) 🎨',
-                    'Olahraga ringan atau dance challenge 💃',
-                    'Tulis hal-hal yang bikin kamu grateful hari ini ✍️'
-                ],
-                'description': 'Aktivitas seru untuk merayakan kebahagiaan! 🎉'
-            }
-        },
-        'Sadness': {
-            'music': {
-                'items': [
-                    {'title': 'Fix You - Coldplay', 'link': 'https://www.youtube.com/watch?v=k4V3Mo61fJM', 'type': 'youtube'},
-                    {'title': 'Someone Like You - Adele', 'link': 'https://www.youtube.com/watch?v=hLQl3WQQoQ0', 'type': 'youtube'},
-                    {'title': 'The Scientist - Coldplay', 'link': 'https://www.youtube.com/watch?v=RB-RcX5DS5A', 'type': 'youtube'}
-                ],
-                'description': 'Musik untuk pelepasan emosional yang sehat 💙'
-            },
-            'food': {
-                'items': [
-                    {'title': 'Warm Soup 🍜', 'link': 'https://www.google.com/maps/search/warm+soup+near+me', 'description': 'Sup hangat yang menenangkan hati'},
-                    {'title': 'Hot Chocolate ☕', 'link': 'https://www.google.com/maps/search/hot+chocolate+cafe+near+me', 'description': 'Coklat panas yang nyaman'},
-                    {'title': 'Comfort Food (Pasta/Rice) 🍝', 'link': 'https://www.google.com/maps/search/comfort+food+restaurant+near+me', 'description': 'Makanan yang bikin perut nyaman'}
-                ],
-                'description': 'Makanan hangat yang bikin nyaman 🤗'
-            },
-            'activity': {
-                'items': [
-                    'Journaling - tulis apa yang kamu rasakan ✍️',
-                    'Tonton film atau series comfort favoritmu 🎬',
-                    'Cuddle dengan pet atau boneka kesayangan 🧸',
-                    'Mandi air hangat dengan musik tenang 🛁',
-                    'Chat atau telpon orang yang kamu percaya 💬'
-                ],
-                'description': 'Aktivitas menenangkan untuk dirimu 🌙'
-            }
-        },
-        'Anger': {
-            'music': {
-                'items': [
-                    {'title': 'Lose Yourself - Eminem', 'link': 'https://www.youtube.com/watch?v=_Yhyp-_hX2s', 'type': 'youtube'},
-                    {'title': 'Eye of the Tiger - Survivor', 'link': 'https://www.youtube.com/watch?v=btPJPFnesV4', 'type': 'youtube'},
-                    {'title': 'Radioactive - Imagine Dragons', 'link': 'https://www.youtube.com/watch?v=ktvTqknDobU', 'type': 'youtube'}
-                ],
-                'description': 'Musik berenergi untuk release tension 💪'
-            },
-            'food': {
-                'items': [
-                    {'title': 'Spicy Wings/Food 🔥', 'link': 'https://www.google.com/maps/search/spicy+food+near+me', 'description': 'Makanan pedas untuk melepaskan emosi'},
-                    {'title': 'Juicy Burger 🍔', 'link': 'https://www.google.com/maps/search/burger+near+me', 'description': 'Burger besar yang memuaskan'},
-                    {'title': 'Cold Drink/Ice Cream 🍦', 'link': 'https://www.google.com/maps/search/ice+cream+near+me', 'description': 'Dinginkan kepalamu dengan yang dingin'}
-                ],
-                'description': 'Makanan bold yang match energimu! 🌶️'
-            },
-            'activity': {
-                'items': [
-                    'Olahraga intensif (boxing, lari, HIIT) 🥊',
-                    'Punch pillow atau stress ball 😤',
-                    'Tulis surat kemarahan (ga perlu dikirim) ✍️',
-                    'Bersih-bersih ruangan dengan energik 🧹',
-                    'Teriak di tempat sepi atau dalam bantal 📢'
-                ],
-                'description': 'Channel kemarahanmu ke hal produktif! 💥'
-            }
-        },
-        'Fear': {
-            'music': {
-                'items': [
-                    {'title': 'Brave - Sara Bareilles', 'link': 'https://www.youtube.com/watch?v=QUQsqBqxoR4', 'type': 'youtube'},
-                    {'title': 'Stronger - Kelly Clarkson', 'link': 'https://www.youtube.com/watch?v=Xn676-fLq7I', 'type': 'youtube'},
-                    {'title': 'Hall of Fame - The Script', 'link': 'https://www.youtube.com/watch?v=mk48xRzuNvA', 'type': 'youtube'}
-                ],
-                'description': 'Musik motivasi untuk boost keberanian! 💫'
-            },
-            'food': {
-                'items': [
-                    {'title': 'Herbal Tea (Chamomile) 🍵', 'link': 'https://www.google.com/maps/search/tea+house+near+me', 'description': 'Teh herbal untuk menenangkan saraf'},
-                    {'title': 'Warm Milk/Latte 🥛', 'link': 'https://www.google.com/maps/search/warm+milk+coffee+near+me', 'description': 'Minuman hangat yang gentle'},
-                    {'title': 'Healthy Smoothie 🍌', 'link': 'https://www.google.com/maps/search/healthy+smoothie+near+me', 'description': 'Nutrisi baik untuk tubuhmu'}
-                ],
-                'description': 'Makanan menenangkan untuk kurangi kecemasan 🌸'
-            },
-            'activity': {
-                'items': [
-                    'Latihan pernapasan 4-7-8 (inhale 4s, hold 7s, exhale 8s) 🧘',
-                    'Grounding technique: sebutkan 5 hal yang kamu lihat, 4 yang kamu dengar, dst 👀',
-                    'Tonton video lucu atau wholesome 😊',
-                    'Chat dengan orang yang bikin kamu merasa aman 💬',
-                    'Yoga atau stretching ringan 🧘‍♀️'
-                ],
-                'description': 'Teknik menenangkan untuk atasi ketakutan 🌈'
-            }
-        },
-        'Surprise': {
-            'music': {
-                'items': [
-                    {'title': 'Uptown Funk - Bruno Mars', 'link': 'https://www.youtube.com/watch?v=OPf0YbXqDm0', 'type': 'youtube'},
-                    {'title': 'September - Earth Wind & Fire', 'link': 'https://www.youtube.com/watch?v=Gs069dndIYk', 'type': 'youtube'},
-                    {'title': 'Mr. Blue Sky - ELO', 'link': 'https://www.youtube.com/watch?v=wuJIqmha2Hc', 'type': 'youtube'}
-                ],
-                'description': 'Musik fun yang match energi kejutanmu! ✨'
-            },
-            'food': {
-                'items': [
-                    {'title': 'Sushi / Japanese 🍱', 'link': 'https://www.google.com/maps/search/sushi+near+me', 'description': 'Makanan dengan variasi rasa unik'},
-                    {'title': 'Fusion Food 🌍', 'link': 'https://www.google.com/maps/search/fusion+restaurant+near+me', 'description': 'Coba rasa baru yang belum pernah kamu coba'},
-                    {'title': 'Unique Snacks 🍿', 'link': 'https://www.google.com/maps/search/snack+shop+near+me', 'description': 'Camilan unik untuk mood penasaran'}
-                ],
-                'description': 'Makanan adventurous untuk mood penasaranmu! 🎉'
-            },
-            'activity': {
-                'items': [
-                    'Coba resep makanan baru yang belum pernah dibuat 👨‍🍳',
-                    'Eksplorasi spot baru di kotamu 🗺️',
-                    'Mulai hobby atau skill baru 🎨',
-                    'Watch plot twist movies 🎬',
-                    'Random act of kindness ke orang lain 💝'
-                ],
-                'description': 'Embrace the unexpected dengan aktivitas baru! 🌟'
-            }
-        },
-        'Disgust': {
-            'music': {
-                'items': [
-                    {'title': 'Here Comes the Sun - Beatles', 'link': 'https://www.youtube.com/watch?v=KQetemT1sWc', 'type': 'youtube'},
-                    {'title': 'Three Little Birds - Bob Marley', 'link': 'https://www.youtube.com/watch?v=zaGUr6wzyT8', 'type': 'youtube'},
-                    {'title': 'Lovely Day - Bill Withers', 'link': 'https://www.youtube.com/watch?v=bEeaS6fuUoA', 'type': 'youtube'}
-                ],
-                'description': 'Musik refreshing untuk cleanse the mind 🌿'
-            },
-            'food': {
-                'items': [
-                    {'title': 'Fresh Juice/Mojito 🍋', 'link': 'https://www.google.com/maps/search/fresh+juice+near+me', 'description': 'Minuman segar asam manis'},
-                    {'title': 'Salad & Fruits 🥗', 'link': 'https://www.google.com/maps/search/salad+bar+near+me', 'description': 'Makanan bersih dan segar'},
-                    {'title': 'Minty/Herbal Tea 🍃', 'link': 'https://www.google.com/maps/search/tea+shop+near+me', 'description': 'Pembersih palet rasa yang efektif'}
-                ],
-                'description': 'Makanan clean & fresh untuk reset senses! 💚'
-            },
-            'activity': {
-                'items': [
-                    'Bersih-bersih dan organize ruangan 🧹',
-                    'Mandi dengan aromatherapy 🛁',
-                    'Ganti sheets dan buka jendela untuk udara segar 🪟',
-                    'Declutter - buang barang yang ga diperlukan 📦',
-                    'Tonton comedy atau konten wholesome 😄'
-                ],
-                'description': 'Aktivitas cleansing untuk refresh mind & space! ✨'
-            }
-        },
-        'Neutral': {
-            'music': {
-                'items': [
-                    {'title': 'Weightless - Marconi Union', 'link': 'https://www.youtube.com/watch?v=UfcAVejslrU', 'type': 'youtube'},
-                    {'title': 'Clair de Lune - Debussy', 'link': 'https://www.youtube.com/watch?v=CvFH_6DNRCY', 'type': 'youtube'},
-                    {'title': 'River Flows in You - Yiruma', 'link': 'https://www.youtube.com/watch?v=7maJOI3QMu0', 'type': 'youtube'}
-                ],
-                'description': 'Musik ambient untuk maintain keseimbangan 🎵'
-            },
-            'food': {
-                'items': [
-                    {'title': 'Balanced Meal (Rice/Noodles) 🍚', 'link': 'https://www.google.com/maps/search/restaurant+near+me', 'description': 'Makanan sehari-hari yang seimbang'},
-                    {'title': 'Sandwich/Toast 🥪', 'link': 'https://www.google.com/maps/search/sandwich+shop+near+me', 'description': 'Praktis dan mengenyangkan'},
-                    {'title': 'Coffee/Tea Break ☕', 'link': 'https://www.google.com/maps/search/coffee+shop+near+me', 'description': 'Temani waktu santaimu'}
-                ],
-                'description': 'Makanan seimbang untuk energi stabil 🌾'
-            },
-            'activity': {
-                'items': [
-                    'Jalan santai atau light exercise 🚶',
-                    'Baca buku atau artikel menarik 📚',
-                    'Explore hobby baru yang menarik 🎨',
-                    'Meditation atau mindfulness practice 🧘',
-                    'Organize to-do list atau planning 📝'
-                ],
-                'description': 'Aktivitas balanced untuk hari yang tenang 🌤️'
-            }
-        }
-    }
+    CATEGORIES = ('music', 'food', 'activity')
     
     @staticmethod
-    def get_recommendations(emotion: str, category: str) -> Dict:
+    def format_category(emotion: str, category: str, catalog: Dict) -> Dict:
         """
-        Get recommendations based on emotion and category
-        (Auto-formatted to match Pydantic Schema)
+        Format one category of the catalog to match the Pydantic schema
+        (done once per catalog by RecommendationBundles)
         """
         # Ambil data mentah dari dictionary
-        emotion_recs = RecommendationService.RECOMMENDATIONS.get(
-            emotion,
-            RecommendationService.RECOMMENDATIONS['Neutral']
-        )
+        emotion_recs = catalog.get(emotion, catalog['Neutral'])
         
         # Ambil kategori spesifik (music/food/activity)
         category_data = emotion_recs.get(category, emotion_recs.get('music', {}))
@@ -257,6 +61,32 @@ class RecommendationService:
             'description': category_data.get('description', '')
         }
     
+    @staticmethod
+    def item_title(item) -> str:
+        """Catalog item key (activity items are plain strings)"""
+        return item if isinstance(item, str) else item.get('title', 'Unknown')
+    
+    @staticmethod
+    def get_recommendations(emotion: str, category: str) -> Dict:
+        """
+        Get recommendations based on emotion and category
+        (Auto-formatted to match Pydantic Schema, precomputed at startup)
+        """
+        return recommendation_bundles.recommendations(emotion, category)
+    
+    @staticmethod
+    def get_bundle_json(emotion: str, category: Optional[str] = None) -> "CompiledBundle":
+        """Pre-serialized bundle + ETag from the current compiled catalog"""
+        return recommendation_bundles.bundle(emotion, category)
+    
+    @staticmethod
+    def get_bundle(emotion: str) -> Dict:
+        """All categories for an emotion in one dict (RecommendationResponse shape)"""
+        bundle = {"emotion": emotion}
+        for category in RecommendationService.CATEGORIES:
+            bundle[category] = RecommendationService.get_recommendations(emotion, category)['items']
+        return bundle
+    
     @staticmethod
     def track_click(
         emotion: str,
@@ -287,8 +117,59 @@ class RecommendationService:
         
         db.add(click)
         db.commit()
-        
+
         return {"status": "tracked"}
+
+    @staticmethod
+    def track_clicks_bulk(clicks: List[Dict], db: Session) -> int:
+        """
+        Insert many recommendation clicks with one multi-row INSERT
+
+        Args:
+            clicks: Dicts with emotion, category, title, session_id, emotion_log_id
+            db: Database session
+
+        Returns:
+            Number of rows written
+        """
+        if not clicks:
+            return 0
+
+        # Validasi UUID sekali per nilai unik, bukan per klik
+        parsed_ids = {}
+        for raw_id in {c.get('emotion_log_id') for c in clicks}:
+            parsed = None
+            if raw_id and raw_id.strip():
+                try:
+                    parsed = uuid.UUID(raw_id)
+                except (ValueError, AttributeError):
+                    print(f"Invalid UUID: {raw_id}, setting to None")
+            parsed_ids[raw_id] = parsed
+
+        # UUID yang valid tapi tidak ada di emotion_logs akan melanggar FK
+        # dan menggagalkan seluruh batch, jadi cek keberadaannya sekaligus
+        candidate_ids = {v for v in parsed_ids.values() if v is not None}
+        existing_ids = set()
+        if candidate_ids:
+            existing_ids = set(db.execute(
+                select(EmotionLog.id).where(EmotionLog.id.in_(candidate_ids))
+            ).scalars())
+
+        rows = []
+        for c in clicks:
+            log_id = parsed_ids.get(c.get('emotion_log_id'))
+            rows.append({
+                'emotion_log_id': log_id if log_id in existing_ids else None,
+                'session_id': c['session_id'],
+                'emotion': c['emotion'],
+                'recommendation_type': c['category'],
+                'recommendation_title': c['title']
+            })
+
+        db.execute(insert(RecommendationClick), rows)
+        db.commit()
+
+        return len(rows)
     
     @staticmethod
     def get_popular_recommendations(
@@ -317,4 +198,113 @@ class RecommendationService:
             RecommendationClick.emotion,
             RecommendationClick.recommendation_type,
             RecommendationClick.recommendation_title
-        ).order_by(func.count(RecommendationClick.id).desc()).limit(limit).all()
\ No newline at end of file
+        ).order_by(func.count(RecommendationClick.id).desc()).limit(limit).all()
+
+
+class CompiledBundle(NamedTuple):
+    """Pre-serialized RecommendationResponse JSON + its strong ETag"""
+    body: bytes
+    etag: str
+
+
+def _compile_bundle(payload: Dict) -> CompiledBundle:
+    body = RecommendationResponse(**payload).model_dump_json().encode("utf-8")
+    return CompiledBundle(body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+
+class RecommendationBundles:
+    """
+    The catalog compiled once: formatted items per (emotion, category) and
+    pre-serialized JSON bundles per emotion and per emotion + category.
+    Never mutated after construction; a changed catalog gets a new instance.
+    """
+
+    def __init__(self, catalog: Dict, version=None):
+        self.catalog = catalog
+        self.version = version
+        self._formatted: Dict[Tuple[str, str], Dict] = {}
+        self._bundles: Dict[Tuple[str, Optional[str]], CompiledBundle] = {}
+        # Judul item per (emotion, category), untuk ranking
+        self.titles: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+
+        for emotion in catalog:
+            for category in RecommendationService.CATEGORIES:
+                self._formatted[(emotion, category)] = RecommendationService.format_category(
+                    emotion, category, catalog
+                )
+                self.titles[(emotion, category)] = tuple(
+                    RecommendationService.item_title(item)
+                    for item in catalog[emotion].get(category, {}).get('items', [])
+                )
+        for emotion in catalog:
+            self._bundles[(emotion, None)] = _compile_bundle(self._payload(emotion, None))
+            for category in RecommendationService.CATEGORIES:
+                self._bundles[(emotion, category)] = _compile_bundle(self._payload(emotion, category))
+
+    def recommendations(self, emotion: str, category: str) -> Dict:
+        """Same result as formatting the catalog, without the per-call work"""
+        formatted = self._formatted.get((emotion if emotion in self.catalog else 'Neutral', category))
+        if formatted is None:
+            # Kategori tidak dikenal: format langsung (perilaku lama, fallback ke music)
+            return RecommendationService.format_category(emotion, category, self.catalog)
+        return {**formatted, 'emotion': emotion, 'items': list(formatted['items'])}
+
+    def _payload(self, emotion: str, category: Optional[str]) -> Dict:
+        if category is None:
+            categories = RecommendationService.CATEGORIES
+        else:
+            categories = (category,) if category in RecommendationService.CATEGORIES else ()
+        payload = {"emotion": emotion}
+        for name in categories:
+            payload[name] = self.recommendations(emotion, name)['items']
+        return payload
+
+    def bundle(self, emotion: str, category: Optional[str] = None) -> CompiledBundle:
+        """JSON body + ETag for an emotion (all categories) or one category"""
+        compiled = self._bundles.get((emotion, category))
+        if compiled is None:
+            # Emosi/kategori di luar katalog (nilai dari client): tidak di-cache
+            metrics.incr("recommendations.bundle_uncached")
+            compiled = _compile_bundle(self._payload(emotion, category))
+        return compiled
+
+
+def load_catalog(path: str) -> Tuple[Dict, object]:
+    """
+    Read and validate a catalog file: {"version": ..., "catalog": {emotion: {category: {...}}}}
+
+    Raises:
+        OSError / ValueError if the file is missing or malformed
+    """
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+
+    catalog = document.get("catalog") if isinstance(document, dict) else None
+    if not isinstance(catalog, dict) or 'Neutral' not in catalog:
+        raise ValueError(f"{path}: 'catalog' must be an object with at least a 'Neutral' entry")
+    for emotion, categories in catalog.items():
+        if not isinstance(categories, dict):
+            raise ValueError(f"{path}: catalog['{emotion}'] must be an object")
+        for category, data in categories.items():
+            if category not in RecommendationService.CATEGORIES:
+                raise ValueError(f"{path}: unknown category '{category}' under '{emotion}'")
+            if not isinstance(data, dict) or not isinstance(data.get('items'), list):
+                raise ValueError(f"{path}: catalog['{emotion}']['{category}'] needs an 'items' list")
+            for item in data['items']:
+                if not isinstance(item, (str, dict)):
+                    raise ValueError(f"{path}: items of '{emotion}/{category}' must be strings or objects")
+    return catalog, document.get("version")
+
+
+# Global instance (compiled once per worker, replaced as a whole by install_bundles)
+recommendation_bundles = RecommendationBundles(*load_catalog(settings.RECOMMENDATION_CATALOG_PATH))
+
+
+def current_bundles() -> RecommendationBundles:
+    return recommendation_bundles
+
+
+def install_bundles(bundles: RecommendationBundles):
+    """Atomically swap the compiled catalog (requests see either the old or the new one)"""
+    global recommendation_bundles
+    recommendation_bundles = bundles
@@ -1,12 +1,50 @@
+"""
+Password Hashing (bcrypt) on a Dedicated Thread Pool
+"""
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from passlib.context import CryptContext
+from ..config import settings
+from .metrics import metrics
 
 # Konfigurasi hashing password menggunakan bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Pool khusus bcrypt: jumlah worker = batas hash/verify yang berjalan bersamaan,
+# sehingga login yang mahal tidak memakan thread pool default / event loop
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+
 def verify_password(plain_password, hashed_password):
     """Memeriksa apakah password plain cocok dengan hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     """Mengubah password plain menjadi hash"""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+def _run_timed(func, submitted_at: float, *args):
+    metrics.observe("password_hash.queue_seconds", time.perf_counter() - submitted_at)
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        metrics.observe("password_hash.run_seconds", time.perf_counter() - start)
+
+def _submit(func, *args) -> Future:
+    return _password_executor.submit(_run_timed, func, time.perf_counter(), *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt pool, without blocking the event loop"""
+    return await asyncio.wrap_future(_submit(verify_password, plain_password, hashed_password))
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bcrypt pool, without blocking the event loop"""
+    return await asyncio.wrap_future(_submit(get_password_hash, password))
+
+def get_password_hash_pooled(password: str) -> str:
+    """get_password_hash on the bcrypt pool, for synchronous callers (scripts)"""
+    return _submit(get_password_hash, password).result()
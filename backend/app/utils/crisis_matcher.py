@@ -0,0 +1,144 @@
+"""
+Crisis Phrase Matcher (Aho-Corasick + Text Normalization)
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+from ..config import settings
+
+# Lexicon bawaan (bisa diganti lewat CRISIS_LEXICON_PATH)
+DEFAULT_CRISIS_LEXICON = [
+    'bunuh diri', 'ingin mati', 'mengakhiri hidup', 'suicide',
+    'potong nadi', 'menyakiti diri', 'self harm', 'tidak ingin hidup',
+    'lebih baik mati', 'ingin bunuh diri', 'pengen mati', 'mau mati'
+]
+
+# Leetspeak umum → huruf
+LEET_MAP = {
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b',
+    '@': 'a', '$': 's', '!': 'i', '|': 'i', '+': 't'
+}
+_LEET_TABLE = str.maketrans(LEET_MAP)
+_LETTERS = re.compile(r'[^\W\d_]+')
+_REPEATS = re.compile(r'(.)\1+')
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercase, map leetspeak, split into words on everything that is not a
+    letter, join runs of single-letter words and collapse repeated letters.
+    Words stay separated by one space, so phrases cannot match across words.
+
+    "B u n u h d1r1" / "bunuh-diri" / "bunuhh diriii" → "bunuh diri",
+    "b.u.n.u.h d.i.r.i" → "bunuhdiri", "lama umat ini" stays "lama umat ini"
+    """
+    words: List[str] = []
+    letters: List[str] = []  # run of single-letter words ("b u n u h")
+    for token in _LETTERS.findall(text.lower().translate(_LEET_TABLE)):
+        if len(token) == 1:
+            letters.append(token)
+            continue
+        if letters:
+            words.append(''.join(letters))
+            letters = []
+        words.append(token)
+    if letters:
+        words.append(''.join(letters))
+    return _REPEATS.sub(r'\1', ' '.join(words))
+
+
+class CrisisMatcher:
+    """Aho-Corasick automaton over normalized crisis phrases, compiled once"""
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = []
+        # Trie: transisi per state, fail link, dan index phrase yang selesai di state itu
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for phrase in phrases:
+            key = normalize(phrase)
+            if not key:
+                continue
+            self.phrases.append(phrase)
+            index = len(self.phrases) - 1
+            # Juga tanpa spasi: "b u n u h d i r i" / "bunuhdiri" → "bunuhdiri"
+            for variant in {key, normalize(key.replace(' ', ''))}:
+                self._insert(variant, index)
+        self._build_fail_links()
+
+    def _insert(self, key: str, index: int):
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(index)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _scan(self, normalized: str, first_only: bool) -> Set[int]:
+        found: Set[int] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in normalized:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+                if first_only:
+                    break
+        return found
+
+    def matches(self, text: str) -> bool:
+        """True if any crisis phrase occurs in text"""
+        return bool(self._scan(normalize(text), first_only=True))
+
+    def find_all(self, text: str) -> Set[str]:
+        """Every lexicon phrase found in text"""
+        return {self.phrases[i] for i in self._scan(normalize(text), first_only=False)}
+
+    def scan_many(self, texts: Iterable[Optional[str]]) -> List[bool]:
+        """Bulk mode: one flag per input text (None/empty → False)"""
+        scan = self._scan
+        return [bool(text) and bool(scan(normalize(text), first_only=True)) for text in texts]
+
+    @classmethod
+    def from_file(cls, path: str) -> "CrisisMatcher":
+        """Lexicon file: one phrase per line, '#' starts a comment"""
+        with open(path, encoding="utf-8") as f:
+            phrases = [line.split('#', 1)[0].strip() for line in f]
+        return cls(p for p in phrases if p)
+
+
+def load_crisis_matcher(lexicon_path: Optional[str] = None) -> CrisisMatcher:
+    """Build the matcher from a lexicon file, or the built-in lexicon"""
+    if lexicon_path:
+        try:
+            matcher = CrisisMatcher.from_file(lexicon_path)
+            print(f"✓ Crisis lexicon loaded: {len(matcher.phrases)} phrases from {lexicon_path}")
+            return matcher
+        except OSError as e:
+            print(f"⚠ Could not read crisis lexicon {lexicon_path}: {e}, using built-in list")
+    return CrisisMatcher(DEFAULT_CRISIS_LEXICON)
+
+
+# Global instance (compiled once per worker)
+crisis_matcher = load_crisis_matcher(settings.CRISIS_LEXICON_PATH)
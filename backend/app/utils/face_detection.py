@@ -5,7 +5,7 @@ Face Detection using MediaPipe (Legacy Accurate Logic + Fixed Color Consistency)
 import cv2
 import numpy as np
 import mediapipe as mp
-from typing import Tuple
+from typing import Optional, Tuple
 
 # Initialize MediaPipe Face Detection
 mp_face_detection = mp.solutions.face_detection
@@ -16,62 +16,91 @@ face_detection = mp_face_detection.FaceDetection(
 )
 
 
-def detect_and_crop_face(image: np.ndarray) -> Tuple[np.ndarray, bool]:
+# Margin di sekitar bbox MediaPipe (persis app_lama)
+FACE_MARGIN = 0.2
+
+BBox = Tuple[int, int, int, int]  # (x, y, width, height) dalam pixel
+
+
+def detect_face_bbox(image: np.ndarray) -> Optional[BBox]:
     """
-    Detect face in image and crop it.
+    Pixel bbox of the first detected face, 20% margin included and
+    clipped to the image. None if no face is found.
     Input image: BGR
-    Output face: BGR (ALWAYS)
     """
-    try:
-        # Convert BGR → RGB untuk MediaPipe processing
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    # Convert BGR → RGB untuk MediaPipe processing
+    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
 
-        # Detect faces
-        results = face_detection.process(image_rgb)
+    # Detect faces
+    results = face_detection.process(image_rgb)
+    if not results.detections:
+        return None
 
-        if results.detections:
-            detection = results.detections[0]
-            bbox = detection.location_data.relative_bounding_box
+    bbox = results.detections[0].location_data.relative_bounding_box
+    h, w = image.shape[:2]
 
-            h, w = image.shape[:2]
+    # Convert relative box ke pixel
+    x = int(bbox.xmin * w)
+    y = int(bbox.ymin * h)
+    fw = int(bbox.width * w)
+    fh = int(bbox.height * h)
 
-            # Convert relative box ke pixel
-            x = int(bbox.xmin * w)
-            y = int(bbox.ymin * h)
-            fw = int(bbox.width * w)
-            fh = int(bbox.height * h)
+    # --- LEGACY FIX: Margin 20% (persis app_lama) ---
+    margin = int(FACE_MARGIN * min(fw, fh))
 
-            # --- LEGACY FIX: Margin 20% (persis app_lama) ---
-            margin = int(0.2 * min(fw, fh))
+    x = max(0, x - margin)
+    y = max(0, y - margin)
+    fw = min(w - x, fw + 2 * margin)
+    fh = min(h - y, fh + 2 * margin)
+    return x, y, fw, fh
 
-            x = max(0, x - margin)
-            y = max(0, y - margin)
-            fw = min(w - x, fw + 2 * margin)
-            fh = min(h - y, fh + 2 * margin)
 
+def crop_face(image: np.ndarray) -> Tuple[np.ndarray, bool, BBox]:
+    """
+    Serving crop with the bbox that produced it (face or center fallback).
+    Input image: BGR
+    Output face: BGR (ALWAYS)
+    """
+    try:
+        bbox = detect_face_bbox(image)
+        if bbox is not None:
+            x, y, fw, fh = bbox
             # --- 🔥 CRITICAL FIX: Crop dari BGR original, BUKAN RGB ---
             face = image[y:y+fh, x:x+fw]
 
             if face.size > 0:
-                return face, True  # ALWAYS RETURN BGR
-
-        # Fallback: center crop (format tetap BGR)
-        return center_crop(image), False
+                return face, True, bbox  # ALWAYS RETURN BGR
 
     except Exception as e:
         print(f"[Face Detection Error] {e}")
-        return center_crop(image), False
 
+    # Fallback: center crop (format tetap BGR)
+    bbox = center_crop_bbox(image)
+    x, y, fw, fh = bbox
+    return image[y:y+fh, x:x+fw], False, bbox
 
-def center_crop(image: np.ndarray) -> np.ndarray:
+
+def detect_and_crop_face(image: np.ndarray) -> Tuple[np.ndarray, bool]:
     """
-    Fallback: center crop to square
-    Always returns BGR
+    Detect face in image and crop it.
+    Input image: BGR
+    Output face: BGR (ALWAYS)
     """
+    face, detected, _ = crop_face(image)
+    return face, detected
+
+
+def center_crop_bbox(image: np.ndarray) -> BBox:
+    """Bbox of the largest centered square"""
     h, w = image.shape[:2]
     size = min(h, w)
+    return (w - size) // 2, (h - size) // 2, size, size
 
-    start_x = (w - size) // 2
-    start_y = (h - size) // 2
 
-    return image[start_y:start_y+size, start_x:start_x+size]
\ No newline at end of file
+def center_crop(image: np.ndarray) -> np.ndarray:
+    """
+    Fallback: center crop to square
+    Always returns BGR
+    """
+    x, y, size, _ = center_crop_bbox(image)
+    return image[y:y+size, x:x+size]
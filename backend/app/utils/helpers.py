@@ -5,12 +5,10 @@ import random
 from typing import Dict, List
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from ..config import settings
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from .auth import pwd_context
+from .crisis_matcher import crisis_matcher
 
 def hash_password(password: str) -> str:
     """Hash a password"""
@@ -111,20 +109,16 @@ def check_crisis_keywords(text: str) -> bool:
     """
     Check if text contains crisis keywords
     
+    Uses the precompiled Aho-Corasick matcher, which also catches spaced
+    out, repeated-letter and leetspeak variants ("b u n u h d1r1").
+    
     Args:
         text: Text to check
     
     Returns:
         True if crisis keywords found
     """
-    keywords = [
-        'bunuh diri', 'ingin mati', 'mengakhiri hidup', 'suicide',
-        'potong nadi', 'menyakiti diri', 'self harm', 'tidak ingin hidup',
-        'lebih baik mati', 'ingin bunuh diri', 'pengen mati', 'mau mati'
-    ]
-    
-    text_lower = text.lower()
-    return any(keyword in text_lower for keyword in keywords)
+    return crisis_matcher.matches(text)
 
 def get_emergency_hotlines() -> List[str]:
     """Get emergency mental health hotlines"""
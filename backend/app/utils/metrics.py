@@ -0,0 +1,50 @@
+"""
+In-Process Metrics Registry
+"""
+import threading
+from typing import Dict
+
+
+class Metrics:
+    """Thread-safe counters, gauges and timing summaries (per worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, name: str, value: float = 1):
+        """Increase a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        """Set a gauge to its current value"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        """Record one timing/size sample (count, total, max)"""
+        with self._lock:
+            summary = self._timings.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            summary["count"] += 1
+            summary["total"] += value
+            summary["max"] = max(summary["max"], value)
+
+    def snapshot(self) -> Dict:
+        """Copy of all metrics, with averages for timings"""
+        with self._lock:
+            timings = {
+                name: {**summary, "avg": summary["total"] / summary["count"]}
+                for name, summary in self._timings.items()
+            }
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "timings": timings
+            }
+
+
+# Global instance
+metrics = Metrics()
@@ -0,0 +1,68 @@
+"""
+Authenticated Admin Principal Cache
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event, inspect
+from ..config import settings
+from ..models.admin import Admin
+from .metrics import metrics
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of admins resolved from JWTs, keyed on (sub, exp).
+
+    Entries live for ADMIN_PRINCIPAL_CACHE_TTL_SECONDS or until the token
+    expires, whichever is sooner. Any ORM update/delete of an Admin in this
+    process invalidates that admin right away; other workers pick the
+    change up when their TTL runs out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Optional[int]], Tuple[Admin, float]] = {}
+
+    def get(self, username: str, token_exp: Optional[int]) -> Optional[Admin]:
+        key = (username, token_exp)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+        metrics.incr("admin_principal_cache.hit" if entry else "admin_principal_cache.miss")
+        return entry[0] if entry else None
+
+    def put(self, username: str, token_exp: Optional[int], admin: Admin):
+        """Cache a detached Admin instance"""
+        expires_at = time.time() + settings.ADMIN_PRINCIPAL_CACHE_TTL_SECONDS
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[(username, token_exp)] = (admin, expires_at)
+
+    def invalidate(self, username: str):
+        """Drop every cached token of this admin"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == username]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(Admin, "after_update")
+@event.listens_for(Admin, "after_delete")
+def _invalidate_admin(mapper, connection, target):
+    """Invalidate on deactivation, password change, rename or delete"""
+    principal_cache.invalidate(target.username)
+    # Kalau username diganti, token lama masih memakai username sebelumnya
+    for old_username in inspect(target).attrs.username.history.deleted:
+        principal_cache.invalidate(old_username)
@@ -0,0 +1,152 @@
+"""
+Benchmark LLM Chat Path (offline, pakai llm_stub_server.py)
+
+Mode:
+    provider  -> panggil LLM provider langsung, bandingkan pooled vs tanpa keep-alive
+    chat      -> load test end-to-end ke backend (POST /api/chat/ atau /api/chat/stream)
+
+Contoh:
+    python llm_stub_server.py --latency-ms 200 --tokens-per-second 0
+    python bench_llm.py provider --base-url http://localhost:8001 -n 500 -c 50
+    python bench_llm.py chat --api http://localhost:8000 -n 200 -c 100 --stream
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+import httpx
+
+# Memastikan modul app bisa dibaca
+sys.path.append(os.getcwd())
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run_load(call: Callable[[int], Awaitable[float]], total: int, concurrency: int):
+    """Run `total` calls with at most `concurrency` in flight; returns (latencies, errors, wall)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            try:
+                latencies.append(await call(i))
+            except Exception as e:
+                errors += 1
+                if errors <= 3:
+                    print(f"   ⚠ request {i} failed: {e}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def _report(label: str, latencies: List[float], errors: int, wall: float):
+    ok = len(latencies)
+    print(f"\n📊 {label}")
+    print(f"   OK / Error : {ok} / {errors}")
+    print(f"   Throughput : {ok / wall:.1f} req/s")
+    if ok:
+        print(f"   Avg        : {sum(latencies) / ok * 1000:.1f} ms")
+        print(f"   p50        : {_percentile(latencies, 50) * 1000:.1f} ms")
+        print(f"   p95        : {_percentile(latencies, 95) * 1000:.1f} ms")
+        print(f"   p99        : {_percentile(latencies, 99) * 1000:.1f} ms")
+
+
+async def bench_provider(args):
+    from app.services.llm_provider import create_llm_provider
+
+    overrides = {"base_url": args.base_url}
+    if args.provider:
+        overrides["provider"] = args.provider
+
+    for label, keepalive in (("Pooled client (keep-alive)", args.keepalive), ("No connection reuse", 0)):
+        provider = create_llm_provider(max_keepalive_connections=keepalive, **overrides)
+
+        async def call(i: int) -> float:
+            start = time.perf_counter()
+            await provider.generate(f"USER: pesan benchmark #{i}\nASSISTANT:")
+            return time.perf_counter() - start
+
+        try:
+            # Warm-up (tidak diukur) supaya kedua run mulai dari kondisi server yang sama
+            await _run_load(call, args.concurrency, args.concurrency)
+            latencies, errors, wall = await _run_load(call, args.requests, args.concurrency)
+        finally:
+            await provider.aclose()
+        _report(label, latencies, errors, wall)
+
+
+async def bench_chat(args):
+    path = "/api/chat/stream" if args.stream else "/api/chat/"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.api, timeout=60, limits=limits) as client:
+        async def call(i: int) -> float:
+            payload = {
+                "emotion": "Sadness",
+                "message": f"Aku lagi capek banget hari ini #{i}",
+                "session_id": f"bench-{i % 50}",
+                "emotion_log_id": "",
+                "history": []
+            }
+            start = time.perf_counter()
+            if not args.stream:
+                response = await client.post(path, json=payload)
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+            # Untuk streaming yang diukur adalah time to first token
+            async with client.stream("POST", path, json=payload) as response:
+                response.raise_for_status()
+                first_token = None
+                async for line in response.aiter_lines():
+                    if first_token is None and line.startswith("event: token"):
+                        first_token = time.perf_counter() - start
+                return first_token if first_token is not None else time.perf_counter() - start
+
+        latencies, errors, wall = await _run_load(call, args.requests, args.concurrency)
+        label = f"POST {path}" + (" (time to first token)" if args.stream else "")
+        _report(label, latencies, errors, wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM chat path offline")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    p = sub.add_parser("provider", help="Call the LLM provider directly (pooled vs no reuse)")
+    p.add_argument("--base-url", default="http://localhost:8001")
+    p.add_argument("--provider", choices=["gemini", "openai"], default=None)
+    p.add_argument("--keepalive", type=int, default=20, help="Keep-alive connections for the pooled run")
+
+    c = sub.add_parser("chat", help="End-to-end load test against the backend")
+    c.add_argument("--api", default="http://localhost:8000")
+    c.add_argument("--stream", action="store_true", help="Use /api/chat/stream and measure TTFT")
+
+    for sp in (p, c):
+        sp.add_argument("-n", "--requests", type=int, default=200)
+        sp.add_argument("-c", "--concurrency", type=int, default=50)
+
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(f"⏱️  LLM BENCHMARK - mode: {args.mode}")
+    print(f"   {args.requests} requests, concurrency {args.concurrency}")
+    print("="*60)
+
+    asyncio.run(bench_provider(args) if args.mode == "provider" else bench_chat(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app.models.admin import Admin
-# Menggunakan auth.py yang baru saja dibuat
-from app.utils.auth import get_password_hash 
+# Menggunakan pool bcrypt yang sama dengan endpoint login
+from app.utils.auth import get_password_hash_pooled
 import sys
 
 # Pastikan table sudah dibuat (penting jika database masih kosong)
@@ -26,7 +26,7 @@ def create_admin_user(username, email, password):
 
         # 3. Buat user baru
         # PERBAIKAN: Menggunakan 'password_hash' sesuai model, bukan 'hashed_password'
-        hashed_pwd = get_password_hash(password)
+        hashed_pwd = get_password_hash_pooled(password)
         
         new_admin = Admin(
             username=username, 
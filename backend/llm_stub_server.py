@@ -0,0 +1,143 @@
+"""
+Local LLM Stub Server (Gemini + OpenAI compatible)
+Untuk load test chat path secara offline tanpa memanggil Gemini asli.
+
+Jalankan:
+    python llm_stub_server.py --port 8001 --latency-ms 300 --tokens-per-second 50
+
+Lalu di .env backend:
+    LLM_PROVIDER=gemini          (atau openai)
+    LLM_BASE_URL=http://localhost:8001
+"""
+import argparse
+import asyncio
+import json
+import time
+from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="LLM Stub Server")
+
+# Diisi dari argumen CLI (lihat main)
+STUB_CONFIG = {
+    "latency_ms": 300.0,        # waktu sampai token pertama
+    "tokens_per_second": 50.0,  # kecepatan token setelahnya
+    "reply_tokens": 40,         # panjang balasan
+}
+
+STATS = {"requests": 0, "started_at": time.time()}
+
+REPLY_WORDS = (
+    "Aku dengar kamu dan aku di sini untukmu. Terima kasih sudah mau cerita. "
+    "Perasaanmu itu valid kok. Mau cerita lebih lanjut tentang apa yang terjadi hari ini? 💙"
+).split()
+
+
+def _reply_tokens():
+    count = STUB_CONFIG["reply_tokens"]
+    return [REPLY_WORDS[i % len(REPLY_WORDS)] + " " for i in range(count)]
+
+
+async def _token_stream():
+    """Yield tokens with first-token latency and a fixed token rate"""
+    await asyncio.sleep(STUB_CONFIG["latency_ms"] / 1000)
+    delay = 1 / STUB_CONFIG["tokens_per_second"] if STUB_CONFIG["tokens_per_second"] > 0 else 0
+    for i, token in enumerate(_reply_tokens()):
+        if i and delay:
+            await asyncio.sleep(delay)
+        yield token
+
+
+async def _full_reply() -> str:
+    return "".join([token async for token in _token_stream()]).strip()
+
+
+def _gemini_payload(text: str) -> dict:
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+@app.post("/v1beta/models/{model_action}")
+async def gemini_generate(model_action: str, request: Request):
+    """Gemini REST: {model}:generateContent / {model}:streamGenerateContent?alt=sse"""
+    STATS["requests"] += 1
+    await request.body()
+    _, _, action = model_action.partition(":")
+
+    if action == "generateContent":
+        return _gemini_payload(await _full_reply())
+
+    if action == "streamGenerateContent":
+        async def events():
+            async for token in _token_stream():
+                yield f"data: {json.dumps(_gemini_payload(token))}\r\n\r\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    raise HTTPException(status_code=404, detail=f"Unknown action: {action}")
+
+
+@app.post("/v1/chat/completions")
+async def openai_chat_completions(request: Request):
+    """OpenAI chat completions (stream true/false)"""
+    STATS["requests"] += 1
+    body = await request.json()
+    model = body.get("model", "stub")
+
+    if not body.get("stream"):
+        return {
+            "id": "stub",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": await _full_reply()},
+                "finish_reason": "stop"
+            }]
+        }
+
+    async def events():
+        async for token in _token_stream():
+            chunk = {
+                "id": "stub",
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        yield "data: [DONE]\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats():
+    return {**STATS, **STUB_CONFIG, "uptime_seconds": time.time() - STATS["started_at"]}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Gemini/OpenAI-compatible LLM stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=STUB_CONFIG["latency_ms"],
+                        help="Delay before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=STUB_CONFIG["tokens_per_second"],
+                        help="Token rate after the first token (0 = instant)")
+    parser.add_argument("--reply-tokens", type=int, default=STUB_CONFIG["reply_tokens"],
+                        help="Tokens per reply")
+    args = parser.parse_args()
+
+    STUB_CONFIG.update(
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens
+    )
+
+    print("\n" + "="*60)
+    print("🤖 LLM STUB SERVER")
+    print("="*60)
+    print(f"Gemini : POST http://{args.host}:{args.port}/v1beta/models/<model>:generateContent")
+    print(f"OpenAI : POST http://{args.host}:{args.port}/v1/chat/completions")
+    print(f"Latency: {args.latency_ms} ms | {args.tokens_per_second} tok/s | {args.reply_tokens} tokens")
+    print("="*60 + "\n")
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,70 @@
+"""
+Scan Ulang Chat Logs dengan Crisis Matcher
+Menandai is_crisis pada pesan user lama yang cocok dengan lexicon saat ini
+(misal setelah lexicon diperbarui). Gunakan --dry-run untuk melihat hasil saja.
+"""
+import argparse
+import os
+import sys
+import time
+from sqlalchemy import select, update
+
+# Pastikan bisa import modul app
+sys.path.append(os.getcwd())
+
+from app.database import SessionLocal
+from app.models.chat_log import ChatLog
+from app.utils.crisis_matcher import crisis_matcher
+
+
+def rescan(batch_size: int, dry_run: bool):
+    print("🔎 MEMINDAI ULANG CHAT LOGS...")
+    print(f"   Lexicon: {len(crisis_matcher.phrases)} frasa")
+    db = SessionLocal()
+    start = time.perf_counter()
+    scanned = 0
+    newly_flagged = []
+
+    try:
+        rows = db.execute(
+            select(ChatLog.id, ChatLog.message)
+            .where(ChatLog.is_user == True, ChatLog.is_crisis == False)
+            .execution_options(yield_per=batch_size)
+        )
+        for batch in rows.partitions():
+            flags = crisis_matcher.scan_many(message for _, message in batch)
+            newly_flagged.extend(row_id for (row_id, _), flag in zip(batch, flags) if flag)
+            scanned += len(batch)
+
+        elapsed = time.perf_counter() - start
+        print(f"   Dipindai: {scanned} pesan dalam {elapsed:.2f}s "
+              f"({scanned / elapsed if elapsed else 0:.0f} pesan/detik)")
+        print(f"   Baru terdeteksi krisis: {len(newly_flagged)}")
+
+        if dry_run or not newly_flagged:
+            print("\nℹ️  Tidak ada perubahan yang ditulis.")
+            return
+
+        for i in range(0, len(newly_flagged), batch_size):
+            db.execute(
+                update(ChatLog)
+                .where(ChatLog.id.in_(newly_flagged[i:i + batch_size]))
+                .values(is_crisis=True)
+            )
+        db.commit()
+        print(f"\n✅ {len(newly_flagged)} pesan ditandai is_crisis=True.")
+
+    except Exception as e:
+        print(f"\n❌ Gagal memindai ulang: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-scan stored chat logs for crisis phrases")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    rescan(args.batch_size, args.dry_run)
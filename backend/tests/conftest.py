@@ -0,0 +1,15 @@
+"""
+Shared test setup: required settings and the backend package on sys.path
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Settings() butuh nilai ini saat import; DB sqlite sementara
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test")
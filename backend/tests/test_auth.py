@@ -0,0 +1,85 @@
+"""
+Password hashing on the bcrypt pool: results, worker threads and concurrency cap
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from app.utils import auth
+
+
+@pytest.fixture(autouse=True)
+def fast_bcrypt(monkeypatch):
+    # Cost minimum agar test cepat; algoritmanya tetap bcrypt
+    monkeypatch.setattr(auth, "pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+
+
+def test_hash_and_verify_round_trip():
+    async def run():
+        hashed = await auth.get_password_hash_async("rahasia")
+        return (
+            hashed,
+            await auth.verify_password_async("rahasia", hashed),
+            await auth.verify_password_async("salah", hashed),
+        )
+
+    hashed, ok, wrong = asyncio.run(run())
+    assert hashed.startswith("$2")
+    assert ok is True and wrong is False
+
+
+def test_pooled_hash_for_scripts():
+    hashed = auth.get_password_hash_pooled("rahasia")
+    assert auth.verify_password("rahasia", hashed)
+
+
+def test_verify_runs_on_bcrypt_threads(monkeypatch):
+    threads = []
+
+    def verify(plain, hashed):
+        threads.append(threading.current_thread().name)
+        return True
+
+    monkeypatch.setattr(auth, "verify_password", verify)
+    assert asyncio.run(auth.verify_password_async("a", "b")) is True
+    assert threads[0].startswith("bcrypt")
+
+
+def test_concurrency_capped_and_loop_stays_free(monkeypatch):
+    lock = threading.Lock()
+    running = peak = 0
+
+    def verify(plain, hashed):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return True
+
+    monkeypatch.setattr(auth, "verify_password", verify)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        results = await asyncio.gather(*(auth.verify_password_async("a", "b") for _ in range(6)))
+        task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+    assert all(results)
+    assert peak == auth._password_executor._max_workers
+    # Event loop tetap berjalan selama bcrypt sibuk
+    assert ticks >= 5
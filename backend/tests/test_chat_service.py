@@ -0,0 +1,373 @@
+"""
+Chat fallback turns, LLM deadline, speculative greeting and off-loop chat log writes
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import ChatLog
+from app.services import chat_service
+from app.services.chat_service import ChatService
+from app.services.conversation_store import ConversationStore
+from app.services.llm_resilience import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture(autouse=True)
+def chat_logs():
+    # Hanya tabel chat_logs: emotion_logs memakai JSONB (PostgreSQL)
+    ChatLog.__table__.create(bind=engine, checkfirst=True)
+    yield
+    ChatLog.__table__.drop(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    store = ConversationStore()
+    monkeypatch.setattr(chat_service, "conversation_store", store)
+    return store
+
+
+def failing_llm(monkeypatch, error):
+    async def generate_reply(prompt):
+        raise error
+
+    async def stream_reply(prompt):
+        raise error
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(ChatService, "generate_reply", staticmethod(generate_reply))
+    monkeypatch.setattr(ChatService, "stream_reply", staticmethod(stream_reply))
+
+
+def saved_rows(session_id):
+    db = SessionLocal()
+    try:
+        return [
+            (row.is_user, row.message or row.response)
+            for row in db.query(ChatLog).filter(ChatLog.session_id == session_id)
+            .order_by(ChatLog.timestamp).all()
+        ]
+    finally:
+        db.close()
+
+
+def test_start_turn_uses_client_history_only_for_unknown_session(store):
+    client = [{"role": "user", "content": "halo"}, {"role": "assistant", "content": "hai"}]
+
+    # Worker lain / restart: store kosong, history dari client dipakai dan disimpan
+    assert asyncio.run(ChatService.start_turn("h1", "apa kabar", client)) == client
+    assert [t["content"] for t in store.get_history("h1")] == ["halo", "hai", "apa kabar"]
+
+    # Store sudah punya riwayat: history client diabaikan
+    stale = [{"role": "user", "content": "usang"}]
+    history = asyncio.run(ChatService.start_turn("h1", "lagi", stale))
+    assert [t["content"] for t in history] == ["halo", "hai", "apa kabar"]
+
+
+def test_background_reply_failure_is_reported():
+    replies = chat_service.BackgroundReplies()
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def run():
+        key = replies.start(broken())
+        return await replies.get(key, wait=1)
+
+    assert asyncio.run(run())["status"] == "failed"
+
+
+def test_background_replies_expire_on_get(monkeypatch):
+    monkeypatch.setattr(settings, "CRISIS_FOLLOWUP_TTL_SECONDS", 0.05)
+    replies = chat_service.BackgroundReplies()
+
+    async def reply():
+        return {"response": "ok"}
+
+    async def run():
+        key = replies.start(reply())
+        first = await replies.get(key, wait=1)
+        await asyncio.sleep(0.1)
+        return first, await replies.get(key)
+
+    first, expired = asyncio.run(run())
+    assert first["status"] == "ready"
+    # Tanpa start() baru pun entri kedaluwarsa dibuang
+    assert expired is None
+    assert replies._tasks == {}
+
+
+class SlowProvider:
+    """LLM provider whose reply takes `delay` seconds (awaited, not blocking)"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def generate(self, prompt):
+        await asyncio.sleep(self.delay)
+        return "balasan"
+
+
+@pytest.fixture
+def slow_llm(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_LLM_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", False)
+    monkeypatch.setattr(chat_service, "llm_breaker", CircuitBreaker("test_breaker"))
+
+    def use(delay):
+        monkeypatch.setattr(chat_service, "llm_provider", SlowProvider(delay))
+
+    return use
+
+
+def test_generate_reply_misses_deadline(slow_llm):
+    slow_llm(5.0)
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(ChatService.generate_reply("prompt"))
+    assert time.perf_counter() - start < 2.0
+
+
+def test_chat_falls_back_after_deadline(slow_llm):
+    slow_llm(5.0)
+    db = SessionLocal()
+    try:
+        result = asyncio.run(ChatService.chat("Fear", "aku cemas", "s5", "", [], db))
+    finally:
+        db.close()
+    assert result["response"] == ChatService.get_fallback_response("Fear")
+
+
+def test_chat_saves_reply_in_time(slow_llm):
+    slow_llm(0.01)
+    db = SessionLocal()
+    try:
+        result = asyncio.run(ChatService.chat("Neutral", "hai", "s6", "", [], db))
+    finally:
+        db.close()
+    assert result["response"] == "balasan"
+    assert saved_rows("s6") == [(True, "hai"), (False, "balasan")]
+
+
+def test_llm_call_does_not_block_other_requests(slow_llm):
+    slow_llm(0.1)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        reply = await ChatService.generate_reply("prompt")
+        task.cancel()
+        return reply, ticks
+
+    reply, ticks = asyncio.run(run())
+    assert reply == "balasan"
+    # Event loop tetap melayani coroutine lain selama menunggu LLM
+    assert ticks >= 3
+
+
+@pytest.fixture
+def greeting_llm(monkeypatch):
+    """generate_reply that answers `text` after `delay` seconds (or raises `error`)"""
+    monkeypatch.setattr(settings, "CHAT_SPECULATIVE_GREETING", True)
+    monkeypatch.setattr(settings, "CHAT_GREETING_MAX_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(chat_service, "llm_breaker", CircuitBreaker("test_breaker"))
+
+    def use(text="Hai, ceritakan harimu", delay=0.0, error=None):
+        async def generate_reply(prompt):
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            return text
+
+        monkeypatch.setattr(ChatService, "generate_reply", staticmethod(generate_reply))
+
+    return use
+
+
+def test_greeting_off_by_default(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SPECULATIVE_GREETING", False)
+    assert ChatService.prefetch_greeting("Sadness", "Halo", "g0", "log0") is False
+    assert asyncio.run(chat_service.greeting_prefetch.get("log0")) is None
+
+
+def test_greeting_not_started_while_breaker_open(greeting_llm):
+    greeting_llm()
+    breaker = chat_service.llm_breaker
+    breaker.state = breaker.OPEN
+    assert ChatService.prefetch_greeting("Sadness", "Halo", "g1", "log1") is False
+
+
+@pytest.fixture
+def greeting_saves(monkeypatch):
+    saves = []
+    monkeypatch.setattr(ChatService, "save_exchange_background", staticmethod(lambda *args: saves.append(args)))
+    return saves
+
+
+def test_greeting_ready_and_recorded(greeting_llm, store, greeting_saves):
+    greeting_llm(delay=0.01)
+
+    async def run():
+        assert ChatService.prefetch_greeting("Sadness", "Halo", "g2", "log2") is True
+        return await chat_service.greeting_prefetch.get("log2", wait=1)
+
+    result = asyncio.run(run())
+    assert result["status"] == "ready"
+    assert result["response"] == "Hai, ceritakan harimu"
+    assert store.get_history("g2") == [{"role": "assistant", "content": "Hai, ceritakan harimu"}]
+    # Sapaan juga ke chat_logs (tanpa pesan user)
+    assert greeting_saves == [("log2", "g2", None, "Hai, ceritakan harimu", False)]
+
+
+def test_failed_greeting_is_not_recorded(greeting_llm, store, greeting_saves):
+    greeting_llm(error=RuntimeError("boom"))
+
+    async def run():
+        ChatService.prefetch_greeting("Sadness", "Halo", "g3", "log3")
+        return await chat_service.greeting_prefetch.get("log3", wait=1)
+
+    assert asyncio.run(run())["response"] is None
+    assert store.get_history("g3") == []
+    assert greeting_saves == []
+
+
+def test_first_turn_waits_for_greeting(greeting_llm, store, greeting_saves):
+    greeting_llm(delay=0.05)
+
+    async def run():
+        ChatService.prefetch_greeting("Sadness", "Halo", "g4", "log4")
+        await ChatService.settle_greeting("log4")
+        await ChatService.start_turn("g4", "aku sedih", [])
+
+    asyncio.run(run())
+    # Sapaan masuk sebelum giliran user
+    assert [t["role"] for t in store.get_history("g4")] == ["assistant", "user"]
+    assert greeting_saves == [("log4", "g4", None, "Hai, ceritakan harimu", False)]
+
+
+def test_slow_greeting_cancelled_after_max_wait(greeting_llm, store):
+    greeting_llm(delay=5.0)
+
+    async def run():
+        ChatService.prefetch_greeting("Sadness", "Halo", "g5", "log5")
+        start = time.perf_counter()
+        await ChatService.settle_greeting("log5")
+        waited = time.perf_counter() - start
+        return waited, await chat_service.greeting_prefetch.get("log5")
+
+    waited, result = asyncio.run(run())
+    assert waited < 1.0
+    assert result is None
+    assert store.get_history("g5") == []
+
+
+def wait_for_saves():
+    for future in list(chat_service._pending_saves):
+        future.result(timeout=5)
+
+
+@pytest.mark.parametrize("error", [CircuitOpenError("open"), asyncio.TimeoutError(), RuntimeError("boom")])
+def test_chat_fallback_is_recorded_as_assistant_turn(monkeypatch, store, error):
+    failing_llm(monkeypatch, error)
+    fallback = ChatService.get_fallback_response("Sadness")
+    db = SessionLocal()
+    try:
+        result = asyncio.run(ChatService.chat("Sadness", "hari ini berat", "s1", "", [], db))
+    finally:
+        db.close()
+
+    assert result["response"] == fallback
+    assert store.get_history("s1") == [
+        {"role": "user", "content": "hari ini berat"},
+        {"role": "assistant", "content": fallback},
+    ]
+    # Fallback bukan balasan LLM: tidak masuk chat_logs
+    assert saved_rows("s1") == []
+
+
+def test_chat_stream_fallback_is_recorded_as_assistant_turn(monkeypatch, store):
+    failing_llm(monkeypatch, asyncio.TimeoutError())
+    fallback = ChatService.get_fallback_response("Anger")
+
+    async def run():
+        return [event async for event in ChatService.chat_stream("Anger", "kesal", "s2", "", [])]
+
+    events = asyncio.run(run())
+    wait_for_saves()
+
+    assert events[-1].startswith("event: done")
+    assert [turn["role"] for turn in store.get_history("s2")] == ["user", "assistant"]
+    assert store.get_history("s2")[-1]["content"] == fallback
+    assert saved_rows("s2") == []
+
+
+def test_stream_saves_off_the_event_loop(monkeypatch):
+    threads = []
+    original = ChatService.save_exchange_detached
+
+    def record_thread(*args):
+        threads.append(threading.current_thread())
+        return original(*args)
+
+    monkeypatch.setattr(ChatService, "save_exchange_detached", staticmethod(record_thread))
+
+    async def stream_reply(prompt):
+        yield "halo"
+
+    monkeypatch.setattr(ChatService, "stream_reply", staticmethod(stream_reply))
+
+    async def run():
+        loop_thread = threading.current_thread()
+        async for _ in ChatService.chat_stream("Neutral", "hai", "s3", "", []):
+            pass
+        return loop_thread
+
+    loop_thread = asyncio.run(run())
+    wait_for_saves()
+
+    assert threads and all(thread is not loop_thread for thread in threads)
+    assert saved_rows("s3") == [(True, "hai"), (False, "halo")]
+
+
+def test_crisis_followup_saves_off_the_event_loop(monkeypatch):
+    threads = []
+    original = ChatService.save_exchange_detached
+
+    def record_thread(*args):
+        threads.append(threading.current_thread())
+        return original(*args)
+
+    monkeypatch.setattr(ChatService, "save_exchange_detached", staticmethod(record_thread))
+
+    async def generate_reply(prompt):
+        return "aku di sini"
+
+    monkeypatch.setattr(ChatService, "generate_reply", staticmethod(generate_reply))
+
+    async def run():
+        db = SessionLocal()
+        try:
+            ack = await ChatService.chat("Sadness", "aku ingin bunuh diri", "s4", "", [], db)
+        finally:
+            db.close()
+        followup = await chat_service.crisis_followups.get(ack["followup_id"], wait=5)
+        return threading.current_thread(), followup
+
+    loop_thread, followup = asyncio.run(run())
+    wait_for_saves()
+
+    assert followup["status"] == "ready"
+    # Pesan user (langsung) dan balasan (menyusul), keduanya di thread chat-log
+    assert len(threads) == 2 and all(thread is not loop_thread for thread in threads)
+    assert saved_rows("s4") == [(True, "aku ingin bunuh diri"), (False, "aku di sini")]
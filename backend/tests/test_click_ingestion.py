@@ -0,0 +1,100 @@
+"""
+Click ingestion: batching per flush window, overflow and drain on stop
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.click_ingestion import ClickIngestionQueue
+
+
+class Writer:
+    """Stands in for the multi-row INSERT, records every batch"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, batch):
+        if self.fail:
+            raise RuntimeError("db down")
+        self.batches.append([click["title"] for click in batch])
+        return len(batch)
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = Writer()
+    monkeypatch.setattr(ClickIngestionQueue, "_write_batch", staticmethod(writer))
+    monkeypatch.setattr(settings, "CLICK_QUEUE_MAX_SIZE", 5)
+    monkeypatch.setattr(settings, "CLICK_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "CLICK_FLUSH_INTERVAL_SECONDS", 0.05)
+    return writer
+
+
+def click(title):
+    return {"emotion": "Happy", "category": "music", "title": title,
+            "session_id": "s1", "emotion_log_id": None}
+
+
+def test_submit_before_start_is_rejected(writer):
+    assert ClickIngestionQueue().submit(click("a")) is False
+
+
+def test_full_windows_are_written_as_batches(writer):
+    async def run():
+        queue = ClickIngestionQueue()
+        await queue.start()
+        assert all(queue.submit(click(t)) for t in "abc")
+        # Batch ketiga menunggu batas waktu flush
+        await asyncio.sleep(0.2)
+        assert writer.batches == [["a", "b"], ["c"]]
+        await queue.stop()
+
+    asyncio.run(run())
+
+
+def test_stop_drains_queued_clicks(writer, monkeypatch):
+    monkeypatch.setattr(settings, "CLICK_FLUSH_INTERVAL_SECONDS", 60.0)
+
+    async def run():
+        queue = ClickIngestionQueue()
+        await queue.start()
+        for t in "abc":
+            queue.submit(click(t))
+        await queue.stop()
+        assert not queue.is_running
+        assert queue.submit(click("d")) is False
+
+    asyncio.run(run())
+    assert writer.batches == [["a", "b"], ["c"]]
+
+
+def test_full_queue_drops_clicks(writer):
+    async def run():
+        queue = ClickIngestionQueue()
+        await queue.start()
+        # Worker belum jalan sebelum await berikutnya, jadi antrean terisi penuh
+        accepted = [queue.submit(click(str(i))) for i in range(7)]
+        await queue.stop()
+        return accepted
+
+    accepted = asyncio.run(run())
+    assert accepted == [True] * 5 + [False] * 2
+    assert sum(len(b) for b in writer.batches) == 5
+
+
+def test_failed_batch_does_not_stop_worker(writer):
+    async def run():
+        queue = ClickIngestionQueue()
+        await queue.start()
+        writer.fail = True
+        queue.submit(click("a"))
+        await asyncio.sleep(0.1)
+        writer.fail = False
+        queue.submit(click("b"))
+        await queue.stop()
+
+    asyncio.run(run())
+    assert writer.batches == [["b"]]
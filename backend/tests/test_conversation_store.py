@@ -0,0 +1,147 @@
+"""
+Conversation store: turn ring, LRU eviction, TTL expiry and the chat_logs backend
+"""
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models import ChatLog
+from app.services import conversation_store
+from app.services.conversation_store import ConversationStore, DatabaseConversationStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(conversation_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(monkeypatch, clock):
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_TURNS", 3)
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_SESSIONS", 2)
+    monkeypatch.setattr(settings, "CONVERSATION_TTL_SECONDS", 60)
+    return ConversationStore()
+
+
+def contents(store, session_id):
+    return [turn["content"] for turn in store.get_history(session_id)]
+
+
+def test_keeps_last_turns_oldest_first(store):
+    for i in range(5):
+        store.append("s1", "user", f"m{i}")
+    assert contents(store, "s1") == ["m2", "m3", "m4"]
+    assert store.get_history("s1")[0]["role"] == "user"
+
+
+def test_unknown_session_is_empty(store):
+    assert store.get_history("nope") == []
+
+
+def test_evicts_least_recently_used_session(store):
+    store.append("s1", "user", "a")
+    store.append("s2", "user", "b")
+    # s1 dibaca, jadi s2 yang paling lama tidak dipakai
+    store.get_history("s1")
+    store.append("s3", "user", "c")
+
+    assert contents(store, "s1") == ["a"]
+    assert store.get_history("s2") == []
+    assert contents(store, "s3") == ["c"]
+
+
+def test_history_expires_after_ttl(store, clock):
+    store.append("s1", "user", "a")
+    clock.now += 60
+    assert contents(store, "s1") == ["a"]
+
+    clock.now += 61
+    assert store.get_history("s1") == []
+
+
+def test_append_after_ttl_starts_new_history(store, clock):
+    store.append("s1", "user", "lama")
+    clock.now += 61
+    store.append("s1", "user", "baru")
+    assert contents(store, "s1") == ["baru"]
+
+
+def test_append_refreshes_ttl(store, clock):
+    store.append("s1", "user", "a")
+    clock.now += 50
+    store.append("s1", "assistant", "b")
+    clock.now += 50
+    assert contents(store, "s1") == ["a", "b"]
+
+
+def test_clear(store):
+    store.append("s1", "user", "a")
+    store.clear("s1")
+    assert store.get_history("s1") == []
+
+
+@pytest.fixture
+def chat_logs(monkeypatch):
+    monkeypatch.setattr(settings, "CONVERSATION_MAX_TURNS", 3)
+    ChatLog.__table__.create(bind=engine, checkfirst=True)
+    yield
+    ChatLog.__table__.drop(bind=engine)
+
+
+def add_exchange(session_id, message, response, timestamp):
+    db = SessionLocal()
+    try:
+        # Satu exchange, timestamp identik (urutan baris di tabel tidak menjamin apa pun)
+        db.add(ChatLog(session_id=session_id, message=message, response="", is_user=True, timestamp=timestamp))
+        db.add(ChatLog(session_id=session_id, message="", response=response, is_user=False, timestamp=timestamp))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_database_store_orders_same_timestamp_exchange(chat_logs):
+    add_exchange("d1", "halo", "hai juga", datetime(2024, 1, 1, 10, 0, 0))
+    add_exchange("d1", "apa kabar", "baik", datetime(2024, 1, 1, 10, 0, 5))
+    add_exchange("lain", "x", "y", datetime(2024, 1, 1, 10, 0, 9))
+
+    history = DatabaseConversationStore().get_history("d1")
+    # Tiga giliran terakhir, terlama dulu
+    assert history == [
+        {"role": "assistant", "content": "hai juga"},
+        {"role": "user", "content": "apa kabar"},
+        {"role": "assistant", "content": "baik"},
+    ]
+
+
+def test_database_store_loads_off_the_event_loop(chat_logs, monkeypatch):
+    add_exchange("d2", "halo", "hai", datetime(2024, 1, 1, 10, 0, 0))
+    store = DatabaseConversationStore()
+    threads = []
+    original = store.get_history
+
+    def record_thread(session_id):
+        threads.append(threading.current_thread())
+        return original(session_id)
+
+    monkeypatch.setattr(store, "get_history", record_thread)
+
+    async def run():
+        return threading.current_thread(), await store.load_history("d2")
+
+    loop_thread, history = asyncio.run(run())
+    assert [turn["role"] for turn in history] == ["user", "assistant"]
+    assert threads and threads[0] is not loop_thread
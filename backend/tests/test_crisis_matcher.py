@@ -0,0 +1,61 @@
+"""
+Crisis phrase matcher: normalization, obfuscated positives, cross-word negatives
+"""
+import pytest
+
+from app.utils.crisis_matcher import DEFAULT_CRISIS_LEXICON, CrisisMatcher, normalize
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return CrisisMatcher(DEFAULT_CRISIS_LEXICON)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Bunuh Diri", "bunuh diri"),
+    ("bunuh-diri", "bunuh diri"),
+    ("bunuhh   diriii", "bunuh diri"),
+    ("B u n u h d1r1", "bunuh diri"),
+    ("b.u.n.u.h d.i.r.i", "bunuhdiri"),
+    ("lama umat ini", "lama umat ini"),
+    ("", ""),
+])
+def test_normalize(text, expected):
+    assert normalize(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "aku ingin bunuh diri",
+    "AKU MAU MATI",
+    "rasanya lebih baik mati saja",
+    "b u n u h d i r i",
+    "b.u.n.u.h d.i.r.i",
+    "bunuh-diri",
+    "bunuhdiri",
+    "bunuhhh diriii",
+    "pengen m4ti",
+    "s u i c i d e",
+    "su1c1de",
+    "self-harm",
+    "aku ingin mengakhiri hidupku",
+    "B u n u h diri",
+])
+def test_obfuscated_positives(matcher, text):
+    assert matcher.matches(text)
+
+
+@pytest.mark.parametrize("text", [
+    "lama umat ini",
+    "sudah lama umat itu menunggu",
+    "hari ini aku senang",
+    "ingin makan",
+    "potong kuku",
+    "",
+])
+def test_cross_word_negatives(matcher, text):
+    assert not matcher.matches(text)
+
+
+def test_find_all_and_scan_many(matcher):
+    assert matcher.find_all("ingin bunuh diri") == {"bunuh diri", "ingin bunuh diri"}
+    assert matcher.scan_many(["mau mati", None, "lama umat ini", ""]) == [True, False, False, False]
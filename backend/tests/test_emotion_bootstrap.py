@@ -0,0 +1,75 @@
+"""
+/api/emotion/bootstrap: detection, initial message and recommendation bundle in one response
+"""
+import uuid
+
+import pytest
+
+pytest.importorskip("mediapipe")  # emotion router -> face detection
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.routers import emotion
+from app.services.chat_service import ChatService
+from app.services.emotion_service import EmotionService
+from app.services.recommendation_service import RecommendationService
+
+LOG_ID = uuid.uuid4()
+
+
+@pytest.fixture
+def detections(monkeypatch):
+    calls = []
+
+    def detect_emotion(image_base64, session_id, db, user_agent=None, ip_address=None):
+        calls.append(session_id)
+        return {
+            "emotion": "Sadness",
+            "confidence": 0.9,
+            "initial_message": "Aku di sini untukmu",
+            "all_probabilities": {"Sadness": 0.9, "Neutral": 0.1},
+            "face_detected": True,
+            "emotion_log_id": LOG_ID,
+        }
+
+    monkeypatch.setattr(EmotionService, "detect_emotion", staticmethod(detect_emotion))
+    monkeypatch.setattr(ChatService, "prefetch_greeting", staticmethod(lambda **kwargs: True))
+    return calls
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(emotion.router)
+    app.dependency_overrides[get_db] = lambda: None
+    return TestClient(app)
+
+
+def test_bootstrap_returns_detection_and_bundle(client, detections):
+    response = client.post("/api/emotion/bootstrap", json={"image": "data", "session_id": "s1"})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert detections == ["s1"]
+    assert body["emotion"] == "Sadness"
+    assert body["initial_message"] == "Aku di sini untukmu"
+    assert body["emotion_log_id"] == str(LOG_ID)
+    assert body["greeting_pending"] is True
+    bundle = RecommendationService.get_bundle("Sadness")
+    for category in RecommendationService.CATEGORIES:
+        assert [i["title"] for i in body["recommendations"][category]] == [i["title"] for i in bundle[category]]
+
+
+def test_detect_has_no_bundle(client, detections):
+    body = client.post("/api/emotion/detect", json={"image": "data", "session_id": "s1"}).json()
+    assert body["emotion"] == "Sadness"
+    assert "recommendations" not in body
+
+
+def test_get_bundle_matches_per_category_results():
+    bundle = RecommendationService.get_bundle("Happiness")
+    assert bundle["emotion"] == "Happiness"
+    for category in RecommendationService.CATEGORIES:
+        assert bundle[category] == RecommendationService.get_recommendations("Happiness", category)["items"]
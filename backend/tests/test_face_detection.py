@@ -0,0 +1,95 @@
+"""
+Serving face crop: bbox margin, center fallback and parity with the training cache
+"""
+import os
+import sys
+import types
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from app.utils import face_detection
+from app.utils.face_detection import center_crop_bbox, crop_face, detect_face_bbox
+from app.utils.image_processing import preprocess_for_model
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_LAMA_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "app_lama")
+
+
+class FakeDetector:
+    """MediaPipe stand-in returning one relative bbox (or nothing)"""
+
+    def __init__(self, box=None):
+        self.box = box
+
+    def process(self, image):
+        if self.box is None:
+            return types.SimpleNamespace(detections=None)
+        xmin, ymin, width, height = self.box
+        bbox = types.SimpleNamespace(xmin=xmin, ymin=ymin, width=width, height=height)
+        detection = types.SimpleNamespace(location_data=types.SimpleNamespace(relative_bounding_box=bbox))
+        return types.SimpleNamespace(detections=[detection])
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    def use(box=None):
+        monkeypatch.setattr(face_detection, "face_detection", FakeDetector(box))
+    return use
+
+
+def gradient_image(h=120, w=200):
+    # Setiap pixel unik, jadi crop yang salah geser langsung ketahuan
+    ys, xs = np.mgrid[0:h, 0:w]
+    return np.stack([xs % 256, ys % 256, (xs + ys) % 256], axis=-1).astype(np.uint8)
+
+
+def test_bbox_gets_margin_and_is_clipped(detector):
+    image = gradient_image()
+    detector((0.25, 0.25, 0.5, 0.5))
+    # Wajah 100x60 di (50, 30), margin 20% dari sisi terpendek = 12
+    assert detect_face_bbox(image) == (38, 18, 124, 84)
+
+    # Di tepi kanan/bawah ukuran dipotong ke batas gambar
+    detector((0.5, 0.5, 0.5, 0.5))
+    assert detect_face_bbox(image) == (88, 48, 112, 72)
+
+
+def test_crop_face_returns_the_bbox_it_cut(detector):
+    image = gradient_image()
+    detector((0.25, 0.25, 0.5, 0.5))
+    face, detected, (x, y, w, h) = crop_face(image)
+
+    assert detected is True
+    np.testing.assert_array_equal(face, image[y:y+h, x:x+w])
+
+
+def test_no_face_falls_back_to_center_crop(detector):
+    image = gradient_image()
+    detector(None)
+    face, detected, bbox = crop_face(image)
+
+    assert detected is False
+    assert bbox == center_crop_bbox(image) == (40, 0, 120, 120)
+    np.testing.assert_array_equal(face, image[:, 40:160])
+
+
+@pytest.mark.parametrize("box", [(0.25, 0.25, 0.5, 0.5), None])
+def test_training_cache_matches_serving_preprocessing(detector, tmp_path, monkeypatch, box):
+    # Di belakang sys.path: app_lama/app.py tidak boleh menutupi paket backend `app`
+    monkeypatch.setattr(sys, "path", sys.path + [APP_LAMA_DIR])
+    dataset_cache = pytest.importorskip("dataset_cache")
+    image = gradient_image()
+    path = str(tmp_path / "face.png")
+    cv2.imwrite(path, image)
+    detector(box)
+
+    decoded, bbox, detected = dataset_cache.decode_image(path, 16, serving_dir=BACKEND_DIR)
+    face, served_detected, served_bbox = crop_face(image)
+
+    assert (bbox, detected) == (served_bbox, served_detected)
+    # Input model saat training = input model saat serving
+    np.testing.assert_allclose(decoded.astype("float32") / 255.0, preprocess_for_model(face, 16)[0])
@@ -0,0 +1,157 @@
+"""
+LLM providers: request shape and Gemini / OpenAI response + SSE parsing
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.llm_provider import (
+    GeminiProvider, LLMHTTPError, LLMProvider, OpenAICompatibleProvider, create_llm_provider
+)
+
+
+def with_transport(provider, handler):
+    """Route the provider's pooled client through an in-process handler"""
+    provider._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return provider
+
+
+def gemini(handler):
+    return with_transport(GeminiProvider("https://gemini.test/", "gemini-test", api_key="kunci"), handler)
+
+
+def openai(handler, api_key="kunci"):
+    return with_transport(OpenAICompatibleProvider("http://llm.test", "stub", api_key=api_key), handler)
+
+
+def sse(*payloads):
+    body = "".join(f"data: {p if isinstance(p, str) else json.dumps(p)}\n\n" for p in payloads)
+    return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+
+def gemini_chunk(*texts):
+    return {"candidates": [{"content": {"parts": [{"text": t} for t in texts]}}]}
+
+
+def collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def test_gemini_generate():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json=gemini_chunk(" Halo", " juga "))
+
+    reply = asyncio.run(gemini(handler).generate("hai"))
+
+    assert reply == "Halo juga"
+    request = requests[0]
+    assert request.url.path == "/v1beta/models/gemini-test:generateContent"
+    assert request.headers["x-goog-api-key"] == "kunci"
+    assert "kunci" not in str(request.url)
+    body = json.loads(request.content)
+    assert body["contents"][0]["parts"][0]["text"] == "hai"
+    assert body["generationConfig"]["maxOutputTokens"] == 512
+
+
+def test_gemini_empty_candidate_is_an_error():
+    provider = gemini(lambda request: httpx.Response(200, json={"candidates": []}))
+    with pytest.raises(ValueError):
+        asyncio.run(provider.generate("hai"))
+
+
+@pytest.mark.parametrize("call", [
+    lambda provider: asyncio.run(provider.generate("hai")),
+    lambda provider: collect(provider.stream("hai")),
+])
+def test_gemini_http_error_hides_url_and_key(call):
+    provider = gemini(lambda request: httpx.Response(429, json={"error": "quota"}))
+    with pytest.raises(LLMHTTPError) as excinfo:
+        call(provider)
+
+    assert excinfo.value.status_code == 429
+    # Pesan error dicetak oleh chat_service: tanpa URL maupun API key
+    assert "kunci" not in str(excinfo.value) and "gemini.test" not in str(excinfo.value)
+
+
+def test_gemini_stream_parses_sse():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return sse(gemini_chunk("Ha"), {"candidates": []}, gemini_chunk("lo", "!"))
+
+    assert collect(gemini(handler).stream("hai")) == ["Ha", "lo!"]
+    assert requests[0].url.path.endswith(":streamGenerateContent")
+    assert requests[0].url.params["alt"] == "sse"
+    assert "key" not in requests[0].url.params
+    assert requests[0].headers["x-goog-api-key"] == "kunci"
+
+
+def test_openai_generate():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": " siap "}}]})
+
+    assert asyncio.run(openai(handler).generate("hai")) == "siap"
+    request = requests[0]
+    assert request.url.path == "/v1/chat/completions"
+    assert request.headers["authorization"] == "Bearer kunci"
+    body = json.loads(request.content)
+    assert body["model"] == "stub" and body["stream"] is False
+    assert body["messages"] == [{"role": "user", "content": "hai"}]
+
+
+def test_openai_without_key_sends_no_auth_header():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    asyncio.run(openai(handler, api_key="").generate("hai"))
+    assert "authorization" not in requests[0].headers
+
+
+def test_openai_stream_stops_at_done():
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return sse(
+            {"choices": [{"delta": {"role": "assistant"}}]},
+            {"choices": [{"delta": {"content": "Ha"}}]},
+            {"choices": [{"delta": {"content": "lo"}}]},
+            "[DONE]",
+            {"choices": [{"delta": {"content": "diabaikan"}}]},
+        )
+
+    assert collect(openai(handler).stream("hai")) == ["Ha", "lo"]
+
+
+def test_create_llm_provider():
+    provider = create_llm_provider(provider="OpenAI", base_url="http://x/", model="m", api_key="")
+    assert isinstance(provider, OpenAICompatibleProvider)
+    assert provider.base_url == "http://x"
+
+    with pytest.raises(ValueError):
+        create_llm_provider(provider="tidak-ada")
+
+
+def test_provider_must_implement_generate_and_stream():
+    class GenerateOnly(LLMProvider):
+        name = "setengah"
+
+        async def generate(self, prompt):
+            return "ok"
+
+    with pytest.raises(TypeError):
+        LLMProvider("http://x", "m")
+    with pytest.raises(TypeError):
+        GenerateOnly("http://x", "m")
@@ -0,0 +1,199 @@
+"""
+Circuit breaker state machine and hedged LLM calls
+"""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services import llm_resilience
+from app.services.llm_resilience import CircuitBreaker, hedged
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_resilience.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(monkeypatch, clock):
+    monkeypatch.setattr(settings, "LLM_BREAKER_WINDOW", 4)
+    monkeypatch.setattr(settings, "LLM_BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(settings, "LLM_BREAKER_ERROR_RATIO", 0.5)
+    monkeypatch.setattr(settings, "LLM_BREAKER_SLOW_CALL_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "LLM_BREAKER_SLOW_CALL_RATIO", 0.75)
+    monkeypatch.setattr(settings, "LLM_BREAKER_OPEN_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "LLM_BREAKER_HALF_OPEN_PROBES", 2)
+    return CircuitBreaker("test_breaker")
+
+
+def open_breaker(breaker):
+    for _ in range(2):
+        breaker.record_success(0.1)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+def test_stays_closed_below_min_calls(breaker):
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_opens_on_error_ratio(breaker):
+    open_breaker(breaker)
+    assert not breaker.allow_request()
+
+
+def test_opens_on_slow_call_ratio(breaker):
+    breaker.record_success(0.1)
+    for _ in range(3):
+        breaker.record_success(6.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_after_open_period_limits_probes(breaker, clock):
+    open_breaker(breaker)
+    clock.now += 31
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_half_open_closes_after_successful_probes(breaker, clock):
+    open_breaker(breaker)
+    clock.now += 31
+    breaker.allow_request()
+    breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+    # Jendela dikosongkan: kegagalan lama tidak langsung membuka lagi
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_reopens_on_failed_or_slow_probe(breaker, clock):
+    open_breaker(breaker)
+    clock.now += 31
+    breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 31
+    breaker.allow_request()
+    breaker.record_success(6.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_cancelled_probe_releases_slot(breaker, clock):
+    open_breaker(breaker)
+    clock.now += 31
+    breaker.allow_request()
+    breaker.allow_request()
+    breaker.record_cancelled()
+    assert breaker.allow_request()
+
+
+# ============================================================================
+# HEDGED REQUESTS
+# ============================================================================
+
+class FakeCall:
+    """LLM call stand-in: per-call delays/errors, records cancellations"""
+
+    def __init__(self, *delays, error=None):
+        self.delays = list(delays)
+        self.error = error
+        self.started = 0
+        self.cancelled = 0
+        self.finished = 0
+
+    async def __call__(self):
+        index = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[index])
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        self.finished += 1
+        if self.error is not None:
+            raise self.error
+        return f"reply-{index}"
+
+
+def test_hedge_not_fired_when_primary_is_fast():
+    call = FakeCall(0.01, 0.01)
+    assert asyncio.run(hedged(call, hedge_after=0.5)) == "reply-0"
+    assert call.started == 1
+
+
+def test_hedge_wins_and_primary_is_cancelled():
+    call = FakeCall(5.0, 0.01)
+    async def run():
+        assert await hedged(call, hedge_after=0.02) == "reply-1"
+        assert call.started == 2
+        assert call.cancelled == 1
+
+    asyncio.run(run())
+
+
+def test_error_raised_when_both_calls_fail():
+    call = FakeCall(0.05, 0.01, error=RuntimeError("upstream"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedged(call, hedge_after=0.02))
+
+
+def test_cancel_during_hedge_delay_cancels_primary():
+    call = FakeCall(5.0, 5.0)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedged(call, hedge_after=1.0), timeout=0.05)
+        # Dicek sebelum asyncio.run membatalkan sisa task saat shutdown
+        assert call.started == 1
+        assert call.cancelled == 1
+
+    asyncio.run(run())
+
+
+def test_cancel_after_hedge_cancels_both_calls():
+    call = FakeCall(5.0, 5.0)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedged(call, hedge_after=0.02), timeout=0.1)
+        assert call.started == 2
+        assert call.cancelled == 2
+
+    asyncio.run(run())
+
+
+def test_cancel_without_hedging_cancels_call():
+    call = FakeCall(5.0)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedged(call, hedge_after=None), timeout=0.05)
+        assert call.cancelled == 1
+
+    asyncio.run(run())
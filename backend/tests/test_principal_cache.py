@@ -0,0 +1,123 @@
+"""
+Admin principal cache: TTL, token expiry and invalidation on ORM changes
+"""
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.admin import Admin
+from app.routers.admin import get_current_admin
+from app.utils import principal_cache as principal_cache_module
+from app.utils.helpers import create_access_token
+from app.utils.principal_cache import PrincipalCache, principal_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(principal_cache_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def admin():
+    Admin.__table__.create(bind=engine, checkfirst=True)
+    principal_cache.clear()
+    db = SessionLocal()
+    try:
+        db.add(Admin(username="admin", password_hash="x", email="admin@example.com"))
+        db.commit()
+    finally:
+        db.close()
+    yield
+    principal_cache.clear()
+    db = SessionLocal()
+    try:
+        db.query(Admin).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def update_admin(current, **values):
+    """ORM update, the way the admin endpoints change an admin"""
+    db = SessionLocal()
+    try:
+        row = db.query(Admin).filter(Admin.username == current).one()
+        for name, value in values.items():
+            setattr(row, name, value)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_entry_lives_for_ttl(monkeypatch, clock):
+    monkeypatch.setattr(settings, "ADMIN_PRINCIPAL_CACHE_TTL_SECONDS", 30)
+    cache = PrincipalCache()
+    cache.put("admin", None, "principal")
+
+    clock.now += 29
+    assert cache.get("admin", None) == "principal"
+    clock.now += 2
+    assert cache.get("admin", None) is None
+
+
+def test_entry_never_outlives_token(monkeypatch, clock):
+    monkeypatch.setattr(settings, "ADMIN_PRINCIPAL_CACHE_TTL_SECONDS", 30)
+    cache = PrincipalCache()
+    exp = int(clock.now) + 10
+    cache.put("admin", exp, "principal")
+
+    clock.now += 9
+    assert cache.get("admin", exp) == "principal"
+    clock.now += 2
+    assert cache.get("admin", exp) is None
+
+
+def test_invalidate_drops_every_token_of_admin(clock):
+    exp1, exp2 = int(clock.now) + 60, int(clock.now) + 120
+    cache = PrincipalCache()
+    cache.put("admin", exp1, "a")
+    cache.put("admin", exp2, "b")
+    cache.put("other", exp1, "c")
+
+    cache.invalidate("admin")
+    assert cache.get("admin", exp1) is None and cache.get("admin", exp2) is None
+    assert cache.get("other", exp1) == "c"
+
+
+def test_second_request_is_served_from_cache(admin):
+    token = create_access_token({"sub": "admin"}, expires_delta=timedelta(minutes=5))
+    first = get_current_admin(token)
+    assert get_current_admin(token) is first
+
+
+def test_deactivation_invalidates_cached_admin(admin):
+    token = create_access_token({"sub": "admin"}, expires_delta=timedelta(minutes=5))
+    get_current_admin(token)
+
+    update_admin("admin", is_active=False)
+    with pytest.raises(HTTPException) as exc:
+        get_current_admin(token)
+    assert exc.value.status_code == 401
+
+
+def test_rename_invalidates_old_username(admin):
+    token = create_access_token({"sub": "admin"}, expires_delta=timedelta(minutes=5))
+    get_current_admin(token)
+
+    update_admin("admin", username="admin2")
+    with pytest.raises(HTTPException) as exc:
+        get_current_admin(token)
+    assert exc.value.detail == "Admin not found"
@@ -0,0 +1,69 @@
+"""
+Prompt builder: compiled system prompts and token-budgeted history
+"""
+import pytest
+
+from app.config import settings
+from app.services.prompt_builder import PromptBuilder, estimate_tokens
+
+
+@pytest.fixture
+def builder(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_PROMPT_TOKEN_BUDGET", 2000)
+    monkeypatch.setattr(settings, "CHAT_HISTORY_MESSAGE_MAX_TOKENS", 50)
+    return PromptBuilder()
+
+
+def history(count, length=40):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn{i:02d} " + "x" * length}
+        for i in range(count)
+    ]
+
+
+def test_system_prompt_per_emotion(builder):
+    assert "emosi: Sadness" in builder.system_prompt("Sadness")
+    # Emosi tidak dikenal memakai panduan Neutral
+    unknown = builder.system_prompt("Bingung")
+    assert "emosi: Bingung" in unknown
+    assert "User netral" in unknown
+
+
+def test_full_history_when_it_fits(builder):
+    prompt = builder.build("Neutral", "halo", history(4))
+    for i in range(4):
+        assert f"turn{i:02d}" in prompt
+    assert prompt.index("turn00") < prompt.index("turn03")
+    assert prompt.endswith("USER: halo\nASSISTANT:")
+
+
+def test_oldest_turns_dropped_to_fit_budget(builder, monkeypatch):
+    system_tokens = estimate_tokens(builder.build("Neutral", "halo", []))
+    # Cukup untuk kira-kira tiga baris riwayat
+    monkeypatch.setattr(settings, "CHAT_PROMPT_TOKEN_BUDGET", system_tokens + 3 * 16)
+
+    prompt = builder.build("Neutral", "halo", history(10))
+    assert estimate_tokens(prompt) <= settings.CHAT_PROMPT_TOKEN_BUDGET
+    assert "turn09" in prompt and "turn08" in prompt
+    assert "turn00" not in prompt and "turn05" not in prompt
+
+
+def test_no_history_when_budget_is_used_up(builder, monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_PROMPT_TOKEN_BUDGET", 10)
+    prompt = builder.build("Neutral", "halo", history(3))
+    assert "turn" not in prompt
+    assert prompt.endswith("USER: halo\nASSISTANT:")
+
+
+def test_long_message_is_truncated(builder):
+    prompt = builder.build("Neutral", "halo", [{"role": "user", "content": "y" * 1000}])
+    line = next(l for l in prompt.splitlines() if l.startswith("USER: y"))
+    assert line.endswith("…")
+    assert estimate_tokens(line[len("USER: "):]) <= settings.CHAT_HISTORY_MESSAGE_MAX_TOKENS
+
+
+def test_greeting_quotes_initial_message(builder):
+    prompt = builder.build_greeting("Happiness", "Hai, senang melihatmu!")
+    assert prompt.startswith(builder.system_prompt("Happiness"))
+    assert '"Hai, senang melihatmu!"' in prompt
+    assert prompt.endswith("ASSISTANT:")
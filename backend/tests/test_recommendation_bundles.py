@@ -0,0 +1,88 @@
+"""
+Recommendation bundles: ETag, Cache-Control and 304 on a matching If-None-Match
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import recommendation
+from app.services import recommendation_service
+from app.services.recommendation_service import RecommendationBundles
+
+CATALOG = {
+    "Neutral": {
+        "music": {"description": "Musik tenang", "items": [{"title": "Lagu A"}, {"title": "Lagu B"}]},
+        "food": {"items": [{"title": "Teh hangat"}]},
+        "activity": {"items": ["Jalan santai"]},
+    }
+}
+
+
+def use_catalog(monkeypatch, catalog):
+    bundles = RecommendationBundles(catalog)
+    monkeypatch.setattr(recommendation_service, "recommendation_bundles", bundles)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    use_catalog(monkeypatch, CATALOG)
+    app = FastAPI()
+    app.include_router(recommendation.router)
+    return TestClient(app)
+
+
+def test_bundle_sends_etag_and_cache_control(client):
+    response = client.get("/api/recommendations/bundle/Neutral")
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert "max-age=" in response.headers["cache-control"]
+    assert [item["title"] for item in response.json()["music"]] == ["Lagu A", "Lagu B"]
+
+
+def test_matching_etag_gets_304(client):
+    etag = client.get("/api/recommendations/bundle/Neutral").headers["etag"]
+
+    response = client.get("/api/recommendations/bundle/Neutral", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("header", ['"lain", {etag}', "W/{etag}", "*"])
+def test_if_none_match_lists_and_weak_tags(client, header):
+    etag = client.get("/api/recommendations/bundle/Neutral").headers["etag"]
+    response = client.get(
+        "/api/recommendations/bundle/Neutral",
+        headers={"If-None-Match": header.format(etag=etag)}
+    )
+    assert response.status_code == 304
+
+
+def test_stale_etag_gets_full_body(client):
+    response = client.get("/api/recommendations/bundle/Neutral", headers={"If-None-Match": '"usang"'})
+    assert response.status_code == 200
+    assert response.json()["emotion"] == "Neutral"
+
+
+def test_category_has_its_own_etag(client):
+    full = client.get("/api/recommendations/bundle/Neutral").headers["etag"]
+    music = client.get("/api/recommendations/bundle/Neutral", params={"category": "music"})
+    assert music.headers["etag"] != full
+    assert set(music.json()) >= {"emotion", "music"}
+
+    response = client.get(
+        "/api/recommendations/bundle/Neutral",
+        params={"category": "music"},
+        headers={"If-None-Match": full}
+    )
+    assert response.status_code == 200
+
+
+def test_etag_changes_with_catalog(client):
+    etag = client.get("/api/recommendations/bundle/Neutral").headers["etag"]
+
+    changed = {"Neutral": {**CATALOG["Neutral"], "activity": {"items": ["Tidur siang"]}}}
+    recommendation_service.install_bundles(RecommendationBundles(changed))
+    response = client.get("/api/recommendations/bundle/Neutral", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
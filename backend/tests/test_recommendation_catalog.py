@@ -0,0 +1,147 @@
+"""
+Recommendation catalog: file validation and hot reload swap
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.config import settings
+from app.services import recommendation_catalog, recommendation_service
+from app.services.recommendation_catalog import CatalogReloader
+from app.services.recommendation_ranker import RecommendationRanker
+from app.services.recommendation_service import RecommendationBundles, load_catalog
+
+CATALOG = {
+    "Neutral": {
+        "music": {"description": "Musik", "items": [{"title": "Lagu A"}]},
+        "activity": {"items": ["Jalan santai"]},
+    }
+}
+
+
+def write_catalog(path, document, mtime_ns=None):
+    path.write_text(json.dumps(document), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    path = tmp_path / "recommendations.json"
+    write_catalog(path, {"version": 1, "catalog": CATALOG}, mtime_ns=1_000_000_000)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def bundles(monkeypatch):
+    monkeypatch.setattr(recommendation_service, "recommendation_bundles", RecommendationBundles(CATALOG, 1))
+
+
+@pytest.fixture(autouse=True)
+def ranker(monkeypatch):
+    ranker = RecommendationRanker()
+    monkeypatch.setattr(recommendation_catalog, "recommendation_ranker", ranker)
+    return ranker
+
+
+def test_load_catalog(catalog_file):
+    catalog, version = load_catalog(str(catalog_file))
+    assert catalog == CATALOG
+    assert version == 1
+
+
+def test_shipped_catalog_is_valid():
+    catalog, _ = load_catalog(settings.RECOMMENDATION_CATALOG_PATH)
+    assert "Neutral" in catalog
+
+
+@pytest.mark.parametrize("document", [
+    [],
+    {"catalog": {"Happiness": {}}},
+    {"catalog": {"Neutral": []}},
+    {"catalog": {"Neutral": {"movies": {"items": []}}}},
+    {"catalog": {"Neutral": {"music": {"items": "Lagu A"}}}},
+    {"catalog": {"Neutral": {"music": {"items": [42]}}}},
+])
+def test_invalid_catalog_rejected(tmp_path, document):
+    path = tmp_path / "bad.json"
+    write_catalog(path, document)
+    with pytest.raises(ValueError):
+        load_catalog(str(path))
+
+
+def test_malformed_json_and_missing_file(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text("{not json", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_catalog(str(path))
+    with pytest.raises(OSError):
+        load_catalog(str(tmp_path / "missing.json"))
+
+
+def test_reload_swaps_only_when_file_changes(catalog_file):
+    reloader = CatalogReloader(str(catalog_file))
+    before = recommendation_service.current_bundles()
+
+    result = asyncio.run(reloader.reload())
+    assert result == {"reloaded": False, "version": 1}
+    assert recommendation_service.current_bundles() is before
+
+    changed = {"Neutral": {**CATALOG["Neutral"], "food": {"items": [{"title": "Teh"}]}}}
+    write_catalog(catalog_file, {"version": 2, "catalog": changed}, mtime_ns=2_000_000_000)
+    result = asyncio.run(reloader.reload())
+
+    assert result["reloaded"] is True and result["version"] == 2
+    current = recommendation_service.current_bundles()
+    assert current is not before
+    assert current.titles[("Neutral", "food")] == ("Teh",)
+
+
+def test_broken_file_keeps_current_catalog(catalog_file):
+    reloader = CatalogReloader(str(catalog_file))
+    before = recommendation_service.current_bundles()
+
+    catalog_file.write_text("{rusak", encoding="utf-8")
+    os.utime(catalog_file, ns=(3_000_000_000, 3_000_000_000))
+    with pytest.raises(ValueError):
+        asyncio.run(reloader.reload())
+    assert recommendation_service.current_bundles() is before
+
+    # File yang sama tidak dicoba ulang sampai berubah lagi
+    assert asyncio.run(reloader.reload())["reloaded"] is False
+
+
+def test_forced_reload(catalog_file):
+    reloader = CatalogReloader(str(catalog_file))
+    before = recommendation_service.current_bundles()
+
+    result = asyncio.run(reloader.reload(force=True))
+    assert result["reloaded"] is True
+    assert result["emotions"] == 1 and result["items"] == 2
+    assert recommendation_service.current_bundles() is not before
+
+
+def test_reload_keeps_ranked_order(catalog_file, ranker, monkeypatch):
+    reloader = CatalogReloader(str(catalog_file))
+    monkeypatch.setattr(settings, "RECOMMENDATION_RANK_MIN_CLICKS", 5)
+    monkeypatch.setattr(settings, "RECOMMENDATION_RANK_EXPLORE_SLOTS", 0)
+    activities = {"items": ["Jalan santai", "Yoga", "Menulis jurnal"]}
+    recommendation_service.install_bundles(
+        RecommendationBundles({"Neutral": {**CATALOG["Neutral"], "activity": activities}}, 1)
+    )
+    for _ in range(50):
+        ranker.record_impression("Neutral", "activity")
+    for _ in range(20):
+        ranker.record_click("Neutral", "activity", "Menulis jurnal")
+    ranker.rerank()
+
+    changed = {"Neutral": {**CATALOG["Neutral"], "activity": activities}}
+    write_catalog(catalog_file, {"version": 2, "catalog": changed}, mtime_ns=4_000_000_000)
+    asyncio.run(reloader.reload())
+
+    current = recommendation_service.current_bundles()
+    assert current.version == 2
+    # Bukan kembali ke urutan kurasi sampai rerank berikutnya
+    assert current.catalog["Neutral"]["activity"]["items"][0] == "Menulis jurnal"
@@ -0,0 +1,99 @@
+"""
+Recommendation ranking: stable order between intervals, bundles only replaced on change
+"""
+import pytest
+
+from app.config import settings
+from app.services import recommendation_service
+from app.services.recommendation_ranker import RecommendationRanker
+from app.services.recommendation_service import RecommendationBundles, RecommendationService
+
+CATALOG = {
+    "Neutral": {
+        "music": {"title": "Musik", "items": ["A", "B", "C", "D"]},
+    }
+}
+
+
+@pytest.fixture(autouse=True)
+def bundles(monkeypatch):
+    monkeypatch.setattr(recommendation_service, "recommendation_bundles", RecommendationBundles(CATALOG, 1))
+    monkeypatch.setattr(settings, "RECOMMENDATION_RANK_MIN_CLICKS", 5)
+    monkeypatch.setattr(settings, "RECOMMENDATION_RANK_EXPLORE_SLOTS", 1)
+    monkeypatch.setattr(settings, "RECOMMENDATION_RANK_EXPLORE_SECONDS", 900.0)
+
+
+def installed_order():
+    catalog = recommendation_service.current_bundles().catalog
+    return [RecommendationService.item_title(item) for item in catalog["Neutral"]["music"]["items"]]
+
+
+def traffic(ranker, clicks):
+    """100 impressions of the bundle, then clicks per title"""
+    for _ in range(100):
+        ranker.record_impression("Neutral", "music")
+    for title, count in clicks.items():
+        for _ in range(count):
+            ranker.record_click("Neutral", "music", title)
+
+
+def test_curated_order_kept_below_min_clicks():
+    ranker = RecommendationRanker()
+    traffic(ranker, {"D": 2})
+    before = recommendation_service.current_bundles()
+    assert ranker.rerank() == 0
+    assert recommendation_service.current_bundles() is before
+
+
+def test_best_item_first_and_bundles_reinstalled_once():
+    ranker = RecommendationRanker()
+    traffic(ranker, {"D": 40, "C": 10})
+    assert ranker.rerank() == 1
+    assert installed_order()[0] == "D"
+
+    # Tanpa data baru: urutan, objek bundle dan ETag tetap sama di setiap interval
+    installed = recommendation_service.current_bundles()
+    etag = installed.bundle("Neutral").etag
+    for _ in range(20):
+        assert ranker.rerank() == 0
+    assert recommendation_service.current_bundles() is installed
+    assert recommendation_service.current_bundles().bundle("Neutral").etag == etag
+
+
+def test_exploration_slot_redrawn_only_after_explore_period():
+    ranker = RecommendationRanker()
+    traffic(ranker, {"A": 10, "B": 10, "C": 10, "D": 10})
+    ranker.rerank()
+    order = installed_order()
+    for _ in range(20):
+        ranker.rerank()
+        assert installed_order() == order
+
+    # Periode eksplorasi habis: undian baru boleh mengubah slot eksplorasi
+    seen = set()
+    for _ in range(50):
+        ranker._next_explore_draw = 0.0
+        ranker.rerank()
+        seen.add(installed_order()[1])
+    assert len(seen) > 1
+
+
+def test_reloaded_catalog_keeps_ranked_order():
+    ranker = RecommendationRanker()
+    traffic(ranker, {"D": 40, "C": 10})
+    ranker.rerank()
+    ranked = installed_order()
+
+    # Katalog baru dari file dengan urutan kurasi lain: urutan ranking dan slot eksplorasi tetap
+    reloaded = RecommendationBundles({"Neutral": {"music": {"title": "Lagu", "items": ["B", "A", "D", "C"]}}}, 2)
+    ordered = ranker.apply_order(reloaded)
+
+    titles = [RecommendationService.item_title(i) for i in ordered.catalog["Neutral"]["music"]["items"]]
+    assert ordered.version == 2
+    assert ordered.catalog["Neutral"]["music"]["title"] == "Lagu"
+    assert titles[:2] == ranked[:2]
+
+
+def test_apply_order_without_clicks_returns_same_bundles():
+    reloaded = RecommendationBundles(CATALOG, 2)
+    assert RecommendationRanker().apply_order(reloaded) is reloaded
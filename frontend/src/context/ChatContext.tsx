@@ -7,6 +7,7 @@
 import React, { createContext, useContext, useState, ReactNode } from 'react';
 import {
   sendChatMessage as apiSendMessage,
+  getChatFollowup,
   ChatRequest,
   ChatResponse,
 } from '../services/chatApi';
@@ -34,6 +35,9 @@ interface ChatContextType {
   clearChat: () => void;
 }
 
+// Sama dengan CONVERSATION_MAX_TURNS di backend
+const HISTORY_FALLBACK_TURNS = 10;
+
 const ChatContext = createContext<ChatContextType | undefined>(undefined);
 
 export const ChatProvider: React.FC<{ children: ReactNode }> = ({ children }) => {
@@ -66,10 +70,12 @@ export const ChatProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
     };
     setMessages((prev) => [...prev, userMessage]);
 
+    let followupId: string | undefined;
     setSending(true);
     try {
-      // Build history for context
-      const history = messages.map((msg) => ({
+      // History utama disimpan di server per session_id; giliran terakhir tetap
+      // dikirim sebagai cadangan (worker lain / server restart)
+      const history = messages.slice(-HISTORY_FALLBACK_TURNS).map((msg) => ({
         role: msg.isUser ? 'user' : 'assistant',
         content: msg.content,
       }));
@@ -95,6 +101,11 @@ export const ChatProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
         hotlines: response.hotlines,
       };
       setMessages((prev) => [...prev, aiResponse]);
+
+      // Crisis: hotline sudah tampil, balasan AI menyusul
+      if (response.pending && response.followup_id) {
+        followupId = response.followup_id;
+      }
     } catch (error) {
       console.error('Failed to send message:', error);
 
@@ -109,6 +120,21 @@ export const ChatProvider: React.FC<{ children: ReactNode }> = ({ children }) =>
     } finally {
       setSending(false);
     }
+
+    // Long-poll di luar lock `sending`: user tetap bisa mengetik selama balasan menyusul
+    if (followupId) {
+      try {
+        let followup = await getChatFollowup(followupId);
+        for (let attempt = 0; followup.status === 'pending' && attempt < 3; attempt++) {
+          followup = await getChatFollowup(followupId);
+        }
+        if (followup.status === 'ready' && followup.response) {
+          addAiMessage(followup.response);
+        }
+      } catch (error) {
+        console.error('Failed to fetch follow-up reply:', error);
+      }
+    }
   };
 
   const clearChat = () => {
@@ -5,7 +5,7 @@
 import React, { createContext, useContext, useState, ReactNode } from 'react';
 import { v4 as uuidv4 } from 'uuid';
 import {
-  detectEmotion as apiDetectEmotion,
+  bootstrapSession,
   EmotionDetectionResponse,
 } from '../services/emotionApi';
 
@@ -37,7 +37,8 @@ export const EmotionProvider: React.FC<{ children: ReactNode }> = ({ children })
   const detectEmotion = async (imageData: string): Promise<EmotionDetectionResponse> => {
     setDetecting(true);
     try {
-      const result = await apiDetectEmotion(imageData, sessionId);
+      // Satu request: deteksi + rekomendasi + pesan pembuka
+      const result = await bootstrapSession(imageData, sessionId);
       setCurrentEmotion(result);
       setEmotionHistory(prev => [...prev, result]);
       return result;
@@ -11,6 +11,7 @@ import ChatBubble from '@/components/ChatBubble';
 import { useEmotion } from '@/context/EmotionContext';
 import { useChat } from '@/context/ChatContext';
 import { getRecommendations, trackRecommendationClick, Recommendation } from '@/services/recommendationApi';
+import { getChatGreeting } from '@/services/chatApi';
 
 const EMOTION_COLORS: Record<string, string> = {
   Happiness: 'bg-yellow-500',
@@ -43,7 +44,10 @@ export default function Detect() {
 
   // Load recommendations when emotion detected
   useEffect(() => {
-    if (currentEmotion?.emotion) {
+    if (currentEmotion?.recommendations) {
+      // Sudah ikut dikirim oleh /api/emotion/bootstrap
+      setRecommendations(currentEmotion.recommendations);
+    } else if (currentEmotion?.emotion) {
       loadRecommendations(currentEmotion.emotion);
     }
   }, [currentEmotion]);
@@ -102,6 +106,17 @@ export default function Detect() {
         addAiMessage(result.initial_message);
       }
 
+      // Opening reply dari LLM sudah dibuat sejak deteksi, tampilkan begitu siap
+      if (result.greeting_pending && result.emotion_log_id) {
+        getChatGreeting(result.emotion_log_id)
+          .then((greeting) => {
+            if (greeting.status === 'ready' && greeting.response) {
+              addAiMessage(greeting.response);
+            }
+          })
+          .catch((error) => console.error('Greeting fetch failed:', error));
+      }
+
     } catch (error: any) {
       console.error('Detection failed:', error);
       toast({
@@ -121,7 +136,7 @@ export default function Detect() {
     setChatInput('');
 
     // Send user message to backend
-    await sendMessage(message, currentEmotion.emotion, sessionId);
+    await sendMessage(message, currentEmotion.emotion, sessionId, currentEmotion.emotion_log_id);
   };
 
   const handleRecommendationClick = async (
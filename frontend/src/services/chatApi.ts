@@ -22,7 +22,7 @@ export interface ChatRequest {
   message: string;
   session_id: string;
   emotion_log_id: string; // ✅ FIXED: Changed to REQUIRED (not optional)
-  history?: Array<{ role: string; content: string }>;
+  history?: Array<{ role: string; content: string }>; // fallback: only used when the server has no history for session_id
 }
 
 export interface ChatResponse {
@@ -30,6 +30,16 @@ export interface ChatResponse {
   emergency?: boolean;
   hotlines?: string[];
   message_id?: string;
+  pending?: boolean; // crisis: AI reply follows via getChatFollowup
+  followup_id?: string;
+}
+
+export interface ChatFollowupResponse {
+  followup_id: string;
+  status: 'pending' | 'ready' | 'cancelled' | 'failed';
+  response?: string;
+  emergency?: boolean;
+  hotlines?: string[];
 }
 
 /**
@@ -42,13 +52,40 @@ export const sendChatMessage = async (
   const payload = {
     ...request,
     emotion_log_id: request.emotion_log_id || '',
-    history: request.history || [],
   };
 
   const response = await api.post<ChatResponse>('/api/chat/', payload);
   return response.data;
 };
 
+/**
+ * Fetch the AI reply that follows a crisis acknowledgment (long-poll)
+ */
+export const getChatFollowup = async (
+  followupId: string,
+  wait = 20
+): Promise<ChatFollowupResponse> => {
+  const response = await api.get<ChatFollowupResponse>(
+    `/api/chat/followup/${followupId}`,
+    { params: { wait } }
+  );
+  return response.data;
+};
+
+/**
+ * Fetch the LLM opening reply started at detection time (long-poll)
+ */
+export const getChatGreeting = async (
+  emotionLogId: string,
+  wait = 10
+): Promise<ChatFollowupResponse> => {
+  const response = await api.get<ChatFollowupResponse>(
+    `/api/chat/greeting/${emotionLogId}`,
+    { params: { wait } }
+  );
+  return response.data;
+};
+
 /**
  * Get chat history for a session
  */
@@ -3,6 +3,7 @@
  */
 
 import api from './api';
+import { RecommendationResponse } from './recommendationApi';
 
 export interface EmotionDetectionRequest {
   image: string; // Base64 encoded image
@@ -16,6 +17,9 @@ export interface EmotionDetectionResponse {
   session_id: string;
   initial_message: string;
   face_detected: boolean;
+  emotion_log_id?: string;
+  greeting_pending?: boolean; // LLM opening reply via getChatGreeting
+  recommendations?: RecommendationResponse; // only from bootstrapSession
   timestamp?: string;
 }
 
@@ -48,6 +52,21 @@ export const detectEmotion = async (
   return response.data;
 };
 
+/**
+ * Detect emotion + recommendations + initial message in one round trip
+ * Endpoint: POST /api/emotion/bootstrap
+ */
+export const bootstrapSession = async (
+  imageData: string,
+  sessionId?: string
+): Promise<EmotionDetectionResponse> => {
+  const response = await api.post<EmotionDetectionResponse>('/api/emotion/bootstrap', {
+    image: imageData,
+    session_id: sessionId,
+  });
+  return response.data;
+};
+
 /**
  * Get emotion history for a session
  * Endpoint: GET /api/emotion/history/{session_id}
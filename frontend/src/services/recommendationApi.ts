@@ -36,10 +36,9 @@ export interface RecommendationClickRequest {
 export const getRecommendations = async (
   emotion: string
 ): Promise<RecommendationResponse> => {
-  // ✅ FIXED: Send as POST with body (sesuai backend router)
-  const response = await api.post<RecommendationResponse>(
-    '/api/recommendations/',
-    { emotion }
+  // GET supaya bisa di-cache browser (ETag / 304)
+  const response = await api.get<RecommendationResponse>(
+    `/api/recommendations/bundle/${encodeURIComponent(emotion)}`
   );
   return response.data;
 };